@@ -5,10 +5,45 @@ Modulo "Affari Storici" per identificare opportunità di mean reversion
 quando il prezzo corrente è significativamente sotto le medie storiche.
 """
 
+import os
+import sys
+import concurrent.futures
+from collections import namedtuple
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional, Tuple
-from scoring import velocity_index
+from dataclasses import dataclass, fields
+from typing import Dict, Any, Optional, Tuple, Union
+from scoring import safe_numeric, velocity_index, velocity_index_arrays, competition_index_arrays
+
+# Numba opzionale: kernel compilati per lo scoring su dataset molto grandi
+try:
+    from numba import njit, prange, guvectorize
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Fallback senza numba: restituisce la funzione Python invariata"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# numexpr opzionale: espressioni elementwise valutate a blocchi senza array temporanei
+try:
+    import numexpr
+    HAS_NUMEXPR = True
+except ImportError:
+    HAS_NUMEXPR = False
+
+# Sotto questa dimensione l'overhead di numexpr supera il guadagno
+NUMEXPR_MIN_ROWS = 100_000
+
+
+# Metriche storiche di un singolo prodotto (tupla immutabile, niente dict per riga)
+HistoricMetrics = namedtuple(
+    'HistoricMetrics', 'current avg_30d avg_90d avg_180d dev_30d dev_90d dev_180d lowest highest'
+)
 
 
 def calculate_historic_metrics(row: pd.Series) -> Dict[str, float]:
@@ -21,6 +56,13 @@ def calculate_historic_metrics(row: pd.Series) -> Dict[str, float]:
     Returns:
         Dict con metriche storiche e deviazioni
     """
+    return _historic_metrics_record(row)._asdict()
+
+
+def _historic_metrics_record(row: pd.Series) -> HistoricMetrics:
+    """
+    Metriche storiche come HistoricMetrics, usate internamente dalle funzioni per riga
+    """
     # Prezzi storici
     current_price = row.get('Buy Box 🚚: Current', 0)
     avg_30d = row.get('Buy Box 🚚: 30 days avg.', current_price)
@@ -48,17 +90,241 @@ def calculate_historic_metrics(row: pd.Series) -> Dict[str, float]:
     dev_90d = (current_price - avg_90d) / avg_90d if avg_90d > 0 else 0.0
     dev_180d = (current_price - avg_180d) / avg_180d if avg_180d > 0 else 0.0
     
-    return {
-        'current': float(current_price),
-        'avg_30d': float(avg_30d),
-        'avg_90d': float(avg_90d),
-        'avg_180d': float(avg_180d),
-        'dev_30d': float(dev_30d),
-        'dev_90d': float(dev_90d),
-        'dev_180d': float(dev_180d),
-        'lowest': float(lowest_180d),
-        'highest': float(highest_180d)
-    }
+    return HistoricMetrics(
+        current=float(current_price),
+        avg_30d=float(avg_30d),
+        avg_90d=float(avg_90d),
+        avg_180d=float(avg_180d),
+        dev_30d=float(dev_30d),
+        dev_90d=float(dev_90d),
+        dev_180d=float(dev_180d),
+        lowest=float(lowest_180d),
+        highest=float(highest_180d)
+    )
+
+
+def _numeric_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """
+    Estrae una colonna come array float64 (NaN per valori non numerici o colonna mancante)
+    """
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    
+    return _numeric_values(df[column])
+
+
+def _numeric_values(series: pd.Series) -> np.ndarray:
+    """
+    Valori di una Series come array float64 contiguo (NaN per valori non numerici)
+    """
+    if not pd.api.types.is_numeric_dtype(series):
+        # Stringhe tipo "1.234,56" o "€ 12": stessa pulizia di safe_numeric
+        series = series.map(lambda value: safe_numeric(value, np.nan))
+    
+    # Array a passo unitario anche se il DataFrame nasce da una matrice 2D row-major
+    return np.ascontiguousarray(series.to_numpy(dtype=np.float64, na_value=np.nan))
+
+
+def _mask_by_unique(series: pd.Series, test, missing: bool = False) -> np.ndarray:
+    """
+    Applica `test` ai soli valori distinti della Series e riporta il risultato sulle righe
+    
+    Args:
+        series: Colonna testuale o categorica (es. Brand)
+        test: Funzione Series -> maschera booleana, valutata sui valori distinti
+        missing: Valore della maschera per i valori mancanti
+        
+    Returns:
+        np.ndarray: Maschera booleana allineata alle righe
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    
+    # Codice -1 (valore mancante) -> ultimo elemento della tabella
+    unique_mask = np.append(np.asarray(test(pd.Series(uniques)), dtype=bool), missing)
+    return unique_mask[codes]
+
+
+def _deviation(current: np.ndarray, average: np.ndarray) -> np.ndarray:
+    """
+    Deviazione percentuale (current - avg) / avg, 0 dove la media non è valida
+    """
+    if HAS_NUMEXPR and len(average) >= NUMEXPR_MIN_ROWS:
+        return numexpr.evaluate('where(average > 0, (current - average) / average, 0.0)',
+                                local_dict={'current': current, 'average': average})
+    return np.divide(current - average, average, out=np.zeros_like(average), where=average > 0)
+
+
+# Colonne Keepa usate dalle funzioni vettorizzate (campo DealColumns -> colonna)
+DEAL_COLUMNS = {
+    'current': 'Buy Box 🚚: Current',
+    'avg_30d': 'Buy Box 🚚: 30 days avg.',
+    'avg_90d': 'Buy Box 🚚: 90 days avg.',
+    'avg_180d': 'Buy Box 🚚: 180 days avg.',
+    'lowest': 'Buy Box 🚚: Lowest',
+    'highest': 'Buy Box 🚚: Highest',
+    'std_dev_30d': 'Buy Box: Standard Deviation 30 days',
+    'amazon_share_90d': 'Buy Box: % Amazon 90 days',
+    'buybox_oos_90d': 'Buy Box: 90 days OOS',
+    'winner_count': 'Buy Box: Winner Count',
+    'winner_count_30d': 'Buy Box: Winner Count 30 days',
+    'amazon_oos_90d': 'Amazon: 90 days OOS',
+    'amazon_oos_count_90d': 'Amazon: OOS Count 90 days',
+    'drop_30d': 'Buy Box 🚚: 30 days drop %',
+    'sales_rank': 'Sales Rank: Current',
+    'sales_rank_30d': 'Sales Rank: 30 days avg.',
+    'bought_month': 'Bought in past month',
+    'rating': 'Reviews: Rating',
+    'rating_count': 'Reviews: Rating Count',
+    'review_count': 'Reviews: Count',
+    'return_rate': 'Return Rate',
+    'fba_fee': 'FBA Pick&Pack Fee'
+}
+
+_DEAL_COLUMN_LABELS = pd.Index(list(DEAL_COLUMNS.values()))
+
+
+def _is_unknown_brand(brands: pd.Series) -> pd.Series:
+    """
+    Brand sconosciuto: vuoto, 'unknown' o 'generic' (senza distinzione maiuscole)
+    """
+    brands = brands.astype(str)
+    return (brands == '') | brands.str.lower().isin(['unknown', 'generic'])
+
+
+@dataclass
+class DealColumns:
+    """
+    Colonne del DataFrame estratte una sola volta in array numpy (layout SoA)
+    
+    I campi numerici sono float64 allineati alle righe, con NaN per valori mancanti
+    o colonne assenti; `available` contiene i campi presenti nel DataFrame.
+    """
+    index: pd.Index
+    available: frozenset
+    unknown_brand: np.ndarray
+    current: np.ndarray
+    avg_30d: np.ndarray
+    avg_90d: np.ndarray
+    avg_180d: np.ndarray
+    lowest: np.ndarray
+    highest: np.ndarray
+    std_dev_30d: np.ndarray
+    amazon_share_90d: np.ndarray
+    buybox_oos_90d: np.ndarray
+    winner_count: np.ndarray
+    winner_count_30d: np.ndarray
+    amazon_oos_90d: np.ndarray
+    amazon_oos_count_90d: np.ndarray
+    drop_30d: np.ndarray
+    sales_rank: np.ndarray
+    sales_rank_30d: np.ndarray
+    bought_month: np.ndarray
+    rating: np.ndarray
+    rating_count: np.ndarray
+    review_count: np.ndarray
+    return_rate: np.ndarray
+    fba_fee: np.ndarray
+    
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> 'DealColumns':
+        """
+        Estrae tutte le colonne necessarie dal DataFrame
+        """
+        # Brand sconosciuto: vuoto, NaN, 'unknown' o 'generic' (testato sui soli brand distinti)
+        if 'Brand' in df.columns:
+            unknown_brand = _mask_by_unique(df['Brand'], _is_unknown_brand, missing=True)
+        else:
+            unknown_brand = np.ones(len(df), dtype=bool)
+        
+        if not df.columns.is_unique:
+            return cls(
+                index=df.index,
+                available=frozenset(name for name, column in DEAL_COLUMNS.items() if column in df.columns),
+                unknown_brand=unknown_brand,
+                **{name: _numeric_column(df, column) for name, column in DEAL_COLUMNS.items()}
+            )
+        
+        # Posizioni delle colonne risolte una sola volta, poi solo accesso per intero
+        positions = dict(zip(DEAL_COLUMNS, df.columns.get_indexer(_DEAL_COLUMN_LABELS)))
+        present = {name: pos for name, pos in positions.items() if pos >= 0}
+        dtypes = df.dtypes.to_numpy()
+        numeric = {name: pos for name, pos in present.items()
+                   if pd.api.types.is_numeric_dtype(dtypes[pos])}
+        
+        arrays = {name: np.full(len(df), np.nan) for name in DEAL_COLUMNS if name not in present}
+        if numeric:
+            # Colonne numeriche estratte in un unico blocco, trasposto per avere righe contigue
+            block = df.iloc[:, list(numeric.values())].to_numpy(dtype=np.float64, na_value=np.nan)
+            block = np.ascontiguousarray(block.T)
+            arrays.update(zip(numeric, block))
+        for name, pos in present.items():
+            if name not in numeric:
+                arrays[name] = _numeric_values(df.iloc[:, pos])
+        
+        return cls(
+            index=df.index,
+            available=frozenset(present),
+            unknown_brand=unknown_brand,
+            **arrays
+        )
+    
+    def get(self, name: str, missing: float = np.nan) -> np.ndarray:
+        """
+        Campo `name`, oppure un array costante `missing` se la colonna non esiste
+        """
+        if name in self.available:
+            return getattr(self, name)
+        return np.full(len(self.index), missing, dtype=np.float64)
+    
+    def subset(self, mask: np.ndarray) -> 'DealColumns':
+        """
+        Righe selezionate da una maschera booleana
+        """
+        arrays = {f.name: getattr(self, f.name)[mask] for f in fields(self)
+                  if f.name not in ('index', 'available')}
+        return DealColumns(index=self.index[mask], available=self.available, **arrays)
+
+
+def _as_deal_columns(data: Union[pd.DataFrame, DealColumns]) -> DealColumns:
+    """
+    Accetta un DataFrame o colonne già estratte
+    """
+    return data if isinstance(data, DealColumns) else DealColumns.from_df(data)
+
+
+def calculate_historic_metrics_vec(data: Union[pd.DataFrame, DealColumns]) -> pd.DataFrame:
+    """
+    Versione vettorizzata di calculate_historic_metrics sull'intero DataFrame
+    
+    Args:
+        data: DataFrame con i dati dei prodotti (o DealColumns già estratte)
+        
+    Returns:
+        DataFrame allineato all'indice originale con le stesse chiavi del dict scalare
+    """
+    cols = _as_deal_columns(data)
+    current = np.where(np.isnan(cols.current) | (cols.current <= 0), 0.0, cols.current)
+    
+    # Stessa catena di fallback della versione scalare: valore mancante/non valido -> prezzo corrente
+    fallback = {}
+    for key in ('avg_30d', 'avg_90d', 'avg_180d', 'lowest', 'highest'):
+        values = getattr(cols, key)
+        fallback[key] = np.where(np.isnan(values) | (values <= 0), current, values)
+    
+    return pd.DataFrame({
+        'current': current,
+        'avg_30d': fallback['avg_30d'],
+        'avg_90d': fallback['avg_90d'],
+        'avg_180d': fallback['avg_180d'],
+        'dev_30d': _deviation(current, fallback['avg_30d']),
+        'dev_90d': _deviation(current, fallback['avg_90d']),
+        'dev_180d': _deviation(current, fallback['avg_180d']),
+        'lowest': fallback['lowest'],
+        'highest': fallback['highest']
+    }, index=cols.index)
 
 
 def is_historic_deal(row: pd.Series, thresholds: Dict[str, float] = None) -> bool:
@@ -72,17 +338,19 @@ def is_historic_deal(row: pd.Series, thresholds: Dict[str, float] = None) -> boo
     Returns:
         bool: True se è un affare storico
     """
+    return _is_historic_deal_from_metrics(row, _historic_metrics_record(row), velocity_index(row), thresholds)
+
+
+def _is_historic_deal_from_metrics(row: pd.Series, metrics: HistoricMetrics, velocity: float,
+                                   thresholds: Dict[str, float] = None) -> bool:
+    """
+    Criteri di is_historic_deal su metriche e velocity già calcolate
+    """
     if thresholds is None:
         thresholds = {'dev_90d': -0.10, 'velocity_min': 40}
     
-    # Calcola metriche storiche
-    metrics = calculate_historic_metrics(row)
-    
-    # Calcola velocity score
-    velocity = velocity_index(row)
-    
     # Condizione 1: Prezzo corrente ≤ 90% della media 90d
-    is_low_price = metrics['dev_90d'] <= thresholds['dev_90d']
+    is_low_price = metrics.dev_90d <= thresholds['dev_90d']
     
     # Condizione 2: Buona liquidità (velocity minima)
     good_velocity = velocity >= thresholds['velocity_min']
@@ -100,12 +368,69 @@ def is_historic_deal(row: pd.Series, thresholds: Dict[str, float] = None) -> boo
     reasonable_oos = oos_90d <= 30  # max 30% OOS
     
     # Condizione 5: Prezzo corrente deve essere valido
-    valid_price = metrics['current'] > 0
+    valid_price = metrics.current > 0
     
     return (is_low_price and good_velocity and low_amazon and 
             reasonable_oos and valid_price)
 
 
+def _velocity_vec(cols: DealColumns) -> np.ndarray:
+    """
+    velocity_index calcolato sulle colonne già estratte
+    """
+    return velocity_index_arrays(
+        np.nan_to_num(cols.get('sales_rank', missing=999999), nan=0.0),
+        np.nan_to_num(cols.rating, nan=0.0),
+        np.nan_to_num(cols.bought_month, nan=0.0)
+    )
+
+
+def _competition_vec(cols: DealColumns) -> np.ndarray:
+    """
+    competition_index calcolato sulle colonne già estratte
+    """
+    return competition_index_arrays(
+        np.nan_to_num(cols.get('amazon_share_90d', missing=50), nan=0.0),
+        np.nan_to_num(cols.get('winner_count', missing=5), nan=0.0),
+        np.nan_to_num(cols.buybox_oos_90d, nan=0.0)
+    )
+
+
+def is_historic_deal_vec(data: Union[pd.DataFrame, DealColumns], thresholds: Dict[str, float] = None,
+                         metrics: Optional[pd.DataFrame] = None,
+                         velocity: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Versione vettorizzata di is_historic_deal: maschera booleana per riga
+    
+    Args:
+        data: DataFrame con i dati dei prodotti (o DealColumns già estratte)
+        thresholds: Soglie per i criteri di selezione
+        metrics: Metriche storiche già calcolate (calculate_historic_metrics_vec)
+        velocity: Velocity score già calcolati
+        
+    Returns:
+        np.ndarray: True per gli affari storici
+    """
+    if thresholds is None:
+        thresholds = {'dev_90d': -0.10, 'velocity_min': 40}
+    cols = _as_deal_columns(data)
+    if metrics is None:
+        metrics = calculate_historic_metrics_vec(cols)
+    if velocity is None:
+        velocity = _velocity_vec(cols)
+    
+    amazon_share = np.nan_to_num(cols.amazon_share_90d, nan=100.0)
+    oos_90d = np.nan_to_num(cols.buybox_oos_90d, nan=0.0)
+    
+    return (
+        (metrics['dev_90d'].to_numpy() <= thresholds['dev_90d']) &
+        (np.asarray(velocity) >= thresholds['velocity_min']) &
+        (amazon_share <= 80) &
+        (oos_90d <= 30) &
+        (metrics['current'].to_numpy() > 0)
+    )
+
+
 def momentum_index(row: pd.Series) -> float:
     """
     Score momentum/trend (0-100) per pricing storico
@@ -116,36 +441,56 @@ def momentum_index(row: pd.Series) -> float:
     Returns:
         float: Punteggio momentum 0-100
     """
-    metrics = calculate_historic_metrics(row)
-    
+    return _momentum_from_metrics(_historic_metrics_record(row))
+
+
+# Bonus sconto vs media 90d per numero di scalini superati (>10%, >15%, >20% sotto media)
+_MOMENTUM_DISCOUNT_LUT = np.array([0.0, 0.0, 5.0, 10.0])
+_QUALITY_DISCOUNT_LUT = np.array([0.0, 5.0, 10.0, 15.0])
+
+# Pesi quality score: momentum, risk, velocity, score base (50)
+_QUALITY_WEIGHTS = np.array([0.25, 0.25, 0.25, 0.25])
+
+
+def _discount_step(dev_90d):
+    """
+    Scalini di sconto superati da dev_90d (0-3), per scalari o array; indice delle tabelle bonus
+    """
+    return (dev_90d < -0.10) * 1 + (dev_90d < -0.15) + (dev_90d < -0.20)
+
+
+def _momentum_from_metrics(metrics: HistoricMetrics) -> float:
+    """
+    Calcolo di momentum_index su metriche storiche già calcolate
+    """
     # Controlla validità dei dati
-    if metrics['current'] <= 0:
+    if metrics.current <= 0:
         return 0.0
     
     base_score = 50.0
     
     # Bonus se prezzo è vicino ai minimi storici (entro 10%)
-    if metrics['lowest'] > 0:
-        near_low_bonus = 20 if metrics['current'] <= metrics['lowest'] * 1.1 else 0
+    if metrics.lowest > 0:
+        near_low_bonus = 20 if metrics.current <= metrics.lowest * 1.1 else 0
     else:
         near_low_bonus = 0
     
     # Bonus se trend positivo recente (prezzo sale da minimo)
     # Se dev_30d > dev_90d significa che il prezzo recente è più vicino alla media
-    trend_bonus = 15 if metrics['dev_30d'] > metrics['dev_90d'] else 0
+    trend_bonus = 15 if metrics.dev_30d > metrics.dev_90d else 0
     
     # Penalità se volatile (spread alto tra min/max)
-    if metrics['highest'] > 0 and metrics['lowest'] > 0:
-        volatility = (metrics['highest'] - metrics['lowest']) / metrics['highest']
+    if metrics.highest > 0 and metrics.lowest > 0:
+        volatility = (metrics.highest - metrics.lowest) / metrics.highest
         volatility_penalty = -10 if volatility > 0.5 else 0
     else:
         volatility_penalty = 0
     
     # Bonus se molto sotto media 90d (opportunità maggiore)
     deep_discount_bonus = 0
-    if metrics['dev_90d'] < -0.20:  # >20% sotto media
+    if metrics.dev_90d < -0.20:  # >20% sotto media
         deep_discount_bonus = 10
-    elif metrics['dev_90d'] < -0.15:  # >15% sotto media
+    elif metrics.dev_90d < -0.15:  # >15% sotto media
         deep_discount_bonus = 5
     
     final_score = base_score + near_low_bonus + trend_bonus + volatility_penalty + deep_discount_bonus
@@ -202,6 +547,224 @@ def risk_index(row: pd.Series) -> float:
     return max(0.0, min(100.0, final_score))
 
 
+def momentum_index_vec(data: Union[pd.DataFrame, DealColumns], metrics: Optional[pd.DataFrame] = None) -> np.ndarray:
+    """
+    Versione vettorizzata di momentum_index sull'intero DataFrame
+    
+    Args:
+        data: DataFrame con i dati dei prodotti (o DealColumns già estratte)
+        metrics: Metriche storiche già calcolate (calculate_historic_metrics_vec)
+        
+    Returns:
+        np.ndarray: Punteggi momentum 0-100
+    """
+    if metrics is None:
+        metrics = calculate_historic_metrics_vec(data)
+    
+    current = metrics['current'].to_numpy()
+    lowest = metrics['lowest'].to_numpy()
+    highest = metrics['highest'].to_numpy()
+    dev_30d = metrics['dev_30d'].to_numpy()
+    dev_90d = metrics['dev_90d'].to_numpy()
+    
+    # Bonus/penalità senza branch: aritmetica sulle maschere booleane
+    near_low_bonus = 20.0 * ((lowest > 0) & (current <= lowest * 1.1))
+    trend_bonus = 15.0 * (dev_30d > dev_90d)
+    
+    volatility = np.divide(highest - lowest, highest, out=np.zeros_like(highest),
+                           where=(highest > 0) & (lowest > 0))
+    volatility_penalty = -10.0 * (volatility > 0.5)
+    
+    # Scalini di sconto: >15% sotto media +5, >20% sotto media +10 (lookup per scalino)
+    deep_discount_bonus = _MOMENTUM_DISCOUNT_LUT[_discount_step(dev_90d)]
+    
+    # Score limitati a 0-100: float32 basta e dimezza la memoria trasferita
+    final_score = (50.0 + near_low_bonus + trend_bonus + volatility_penalty + deep_discount_bonus).astype(np.float32)
+    np.clip(final_score, 0.0, 100.0, out=final_score)
+    
+    # Dati non validi (prezzo corrente assente) -> 0
+    final_score[current <= 0] = 0.0
+    return final_score
+
+
+def _risk_inputs(cols: DealColumns) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Colonne usate da risk_index con gli stessi default della versione per riga
+    
+    Returns:
+        Tuple (return_rate, rating, fba_fee, review_count, unknown_brand)
+    """
+    return (
+        np.nan_to_num(cols.return_rate, nan=0.0),
+        np.nan_to_num(cols.rating, nan=4.0),
+        np.nan_to_num(cols.fba_fee, nan=2.0),
+        np.nan_to_num(cols.review_count, nan=0.0),
+        cols.unknown_brand
+    )
+
+
+# Tabelle a scalini di risk_index: (soglie crescenti, valore per ciascun intervallo)
+_RETURN_RATE_STEPS = (np.array([10.0, 15.0]), np.array([0.0, -10.0, -20.0]))  # oltre soglia
+_RATING_STEPS = (np.array([3.5, 4.0]), np.array([-15.0, -5.0, 0.0]))  # sotto soglia
+_FBA_FEE_STEPS = (np.array([3.5, 5.0]), np.array([0.0, -5.0, -10.0]))  # oltre soglia
+_REVIEW_COUNT_STEPS = (np.array([100.0, 1000.0]), np.array([0.0, 5.0, 10.0]))  # oltre soglia
+
+
+def _step_lookup(values: np.ndarray, steps: Tuple[np.ndarray, np.ndarray], side: str = 'left') -> np.ndarray:
+    """
+    Valore a scalini tramite np.searchsorted sulle soglie
+    
+    side='left' conta le soglie superate strettamente (value > soglia),
+    side='right' include l'uguaglianza (value >= soglia)
+    """
+    thresholds, table = steps
+    return table[np.searchsorted(thresholds, values, side=side)]
+
+
+def risk_index_vec(data: Union[pd.DataFrame, DealColumns]) -> np.ndarray:
+    """
+    Versione vettorizzata di risk_index sull'intero DataFrame
+    
+    Args:
+        data: DataFrame con i dati dei prodotti (o DealColumns già estratte)
+        
+    Returns:
+        np.ndarray: Punteggi rischio 0-100 (alto = sicuro)
+    """
+    return_rate, rating, fba_fee, review_count, unknown_brand = _risk_inputs(_as_deal_columns(data))
+    
+    # Scalini come lookup senza branch (es. return rate: >10% -10, >15% -20)
+    return_penalty = _step_lookup(return_rate, _RETURN_RATE_STEPS)
+    rating_penalty = _step_lookup(rating, _RATING_STEPS, side='right')
+    size_penalty = _step_lookup(fba_fee, _FBA_FEE_STEPS)
+    review_bonus = _step_lookup(review_count, _REVIEW_COUNT_STEPS)
+    brand_penalty = -8.0 * unknown_brand
+    
+    final_score = (70.0 + return_penalty + rating_penalty +
+                   size_penalty + review_bonus + brand_penalty).astype(np.float32)
+    
+    return np.clip(final_score, 0.0, 100.0, out=final_score)
+
+
+@njit(parallel=True, cache=True)
+def _historic_scores_kernel(current, lowest, highest, dev_30d, dev_90d,
+                            return_rate, rating, fba_fee, review_count, unknown_brand):
+    """
+    Kernel fuso momentum + risk: una sola passata sulle righe (stessa logica di
+    momentum_index_vec e risk_index_vec, con bonus/penalità senza branch)
+    """
+    n = current.shape[0]
+    momentum = np.empty(n, dtype=np.float32)
+    risk = np.empty(n, dtype=np.float32)
+    
+    for i in prange(n):
+        # Momentum
+        volatility = (highest[i] - lowest[i]) / highest[i] if highest[i] > 0 and lowest[i] > 0 else 0.0
+        score = 50.0
+        score += 20.0 * ((lowest[i] > 0) & (current[i] <= lowest[i] * 1.1))
+        score += 15.0 * (dev_30d[i] > dev_90d[i])
+        score -= 10.0 * (volatility > 0.5)
+        score += _MOMENTUM_DISCOUNT_LUT[int(dev_90d[i] < -0.10) + int(dev_90d[i] < -0.15) + int(dev_90d[i] < -0.20)]
+        momentum[i] = min(100.0, max(0.0, score)) * (current[i] > 0)
+        
+        # Risk
+        score = 70.0
+        score -= 10.0 * (return_rate[i] > 10) + 10.0 * (return_rate[i] > 15)
+        score -= 5.0 * (rating[i] < 4.0) + 10.0 * (rating[i] < 3.5)
+        score -= 5.0 * (fba_fee[i] > 3.5) + 5.0 * (fba_fee[i] > 5.0)
+        score += 5.0 * (review_count[i] > 100) + 5.0 * (review_count[i] > 1000)
+        score -= 8.0 * unknown_brand[i]
+        risk[i] = min(100.0, max(0.0, score))
+    
+    return momentum, risk
+
+
+def historic_scores_vec(data: Union[pd.DataFrame, DealColumns],
+                        metrics: Optional[pd.DataFrame] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcola momentum e risk score insieme (kernel numba fuso se disponibile)
+    
+    Args:
+        data: DataFrame con i dati dei prodotti (o DealColumns già estratte)
+        metrics: Metriche storiche già calcolate (calculate_historic_metrics_vec)
+        
+    Returns:
+        Tuple (momentum, risk) di array 0-100
+    """
+    cols = _as_deal_columns(data)
+    if metrics is None:
+        metrics = calculate_historic_metrics_vec(cols)
+    
+    if not HAS_NUMBA:
+        return momentum_index_vec(cols, metrics), risk_index_vec(cols)
+    
+    return _historic_scores_kernel(
+        metrics['current'].to_numpy(), metrics['lowest'].to_numpy(), metrics['highest'].to_numpy(),
+        metrics['dev_30d'].to_numpy(), metrics['dev_90d'].to_numpy(), *_risk_inputs(cols)
+    )
+
+
+
+def calculate_deal_scores_vec(df: pd.DataFrame, metrics: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Velocity, risk, momentum e flag affare storico per tutte le righe in un solo passaggio
+    
+    Args:
+        df: DataFrame con i dati dei prodotti
+        metrics: Metriche storiche già calcolate (calculate_historic_metrics_vec)
+        
+    Returns:
+        DataFrame allineato all'indice di df con velocity_score, risk_score,
+        momentum_score e is_historic_deal (metriche storiche calcolate una volta)
+    """
+    columns = DealColumns.from_df(df)
+    if metrics is None:
+        metrics = calculate_historic_metrics_vec(columns)
+    momentum, risk = historic_scores_vec(columns, metrics)
+    
+    return pd.DataFrame({
+        'velocity_score': _velocity_vec(columns),
+        'risk_score': risk,
+        'momentum_score': momentum,
+        'is_historic_deal': is_historic_deal_vec(columns, metrics=metrics)
+    }, index=df.index)
+
+
+# Pesi opportunity score degli affari storici: velocity, momentum, risk, competition
+HISTORIC_OPPORTUNITY_WEIGHTS = np.array([0.3, 0.3, 0.2, 0.2])
+
+
+if HAS_NUMBA:
+    @guvectorize(['void(f8[:], f8[:], f8[:], f8[:], f8[:], f8, f8[:])'], '(n),(n),(n),(n),(k),()->(n)',
+                 nopython=True, cache=True)
+    def _weighted_scores_kernel(first, second, third, fourth, weights, bias, out):
+        """
+        Somma pesata di quattro score in un unico ciclo (nessun array temporaneo)
+        """
+        for i in range(first.shape[0]):
+            out[i] = first[i] * weights[0] + second[i] * weights[1] + third[i] * weights[2] + fourth[i] * weights[3] + bias
+
+
+def _weighted_scores(first: np.ndarray, second: np.ndarray, third: np.ndarray, fourth: np.ndarray,
+                     weights: np.ndarray, bias: float = 0.0) -> np.ndarray:
+    """
+    Somma pesata di quattro array di score, sommati nell'ordine indicato
+    
+    Args:
+        first, second, third, fourth: Score allineati per riga
+        weights: Quattro pesi, uno per array
+        bias: Costante aggiunta in coda
+        
+    Returns:
+        np.ndarray: Score float64 combinati
+    """
+    scores = [np.ascontiguousarray(values, dtype=np.float64) for values in (first, second, third, fourth)]
+    weights = np.ascontiguousarray(weights, dtype=np.float64)
+    if HAS_NUMBA:
+        return _weighted_scores_kernel(*scores, weights, float(bias))
+    return scores[0] * weights[0] + scores[1] * weights[1] + scores[2] * weights[2] + scores[3] * weights[3] + bias
+
+
 def find_historic_deals(df: pd.DataFrame, params: Dict[str, float] = None) -> pd.DataFrame:
     """
     Trova tutti gli affari storici nel dataset
@@ -219,47 +782,47 @@ def find_historic_deals(df: pd.DataFrame, params: Dict[str, float] = None) -> pd
     if df.empty:
         return pd.DataFrame()
     
-    # Crea una copia per evitare modifiche al DataFrame originale
-    df_copy = df.copy()
+    # Colonne estratte una sola volta; metriche e maschera in sola lettura sul DataFrame originale
+    columns = DealColumns.from_df(df)
+    historic_metrics = calculate_historic_metrics_vec(columns)
+    deal_mask = is_historic_deal_vec(columns, params, historic_metrics)
     
-    # Applica le funzioni di analytics
-    df_copy['is_historic_deal'] = df_copy.apply(
-        lambda row: is_historic_deal(row, params), axis=1
-    )
-    df_copy['momentum_score'] = df_copy.apply(momentum_index, axis=1)
-    df_copy['risk_score'] = df_copy.apply(risk_index, axis=1)
+    # Solo le righe selezionate: take() le materializza una volta sola, senza la copia
+    # aggiuntiva di .loc[mask].copy(), e gli score vengono calcolati sul sottoinsieme
+    historic_deals = df.take(np.flatnonzero(deal_mask))
+    deal_metrics = historic_metrics.loc[deal_mask]
     
-    # Aggiungi metriche storiche per debugging/analysis
-    historic_metrics = df_copy.apply(calculate_historic_metrics, axis=1)
-    df_copy['price_deviation_90d'] = historic_metrics.apply(lambda x: x['dev_90d'])
-    df_copy['current_vs_avg_90d'] = historic_metrics.apply(
-        lambda x: f"{x['current']:.2f} vs {x['avg_90d']:.2f}" if x['avg_90d'] > 0 else "N/A"
+    deal_columns = columns.subset(deal_mask)
+    
+    historic_deals['is_historic_deal'] = True
+    historic_deals['momentum_score'], historic_deals['risk_score'] = historic_scores_vec(
+        deal_columns, deal_metrics
     )
     
-    # Filtra solo gli affari storici
-    historic_deals = df_copy[df_copy['is_historic_deal'] == True].copy()
+    # Aggiungi metriche storiche per debugging/analysis
+    historic_deals['price_deviation_90d'] = deal_metrics['dev_90d'].to_numpy()
+    deal_avg_90d = deal_metrics['avg_90d'].to_numpy()
+    price_text = np.char.add(np.char.mod('%.2f vs ', deal_metrics['current'].to_numpy()),
+                             np.char.mod('%.2f', deal_avg_90d))
+    historic_deals['current_vs_avg_90d'] = np.where(deal_avg_90d > 0, price_text, 'N/A').astype(object)
     
     if historic_deals.empty:
         return historic_deals
     
     # Calcola opportunity score se non presente
     if 'opportunity_score' not in historic_deals.columns:
-        # Import scoring functions se necessario
-        from scoring import profit_score, competition_index
-        
         # Calcola un opportunity score semplificato
-        historic_deals['velocity_score'] = historic_deals.apply(velocity_index, axis=1)
-        historic_deals['competition_score'] = historic_deals.apply(competition_index, axis=1)
+        historic_deals['velocity_score'] = _velocity_vec(deal_columns)
+        historic_deals['competition_score'] = _competition_vec(deal_columns)
         
         # Usa metriche esistenti per calcolare profit score approssimativo
         historic_deals['estimated_profit_score'] = 60  # placeholder
         
-        # Opportunity score semplificato
-        historic_deals['opportunity_score'] = (
-            historic_deals['velocity_score'] * 0.3 +
-            historic_deals['momentum_score'] * 0.3 +
-            historic_deals['risk_score'] * 0.2 +
-            historic_deals['competition_score'] * 0.2
+        # Opportunity score semplificato: una sola somma pesata fusa sugli score
+        historic_deals['opportunity_score'] = _weighted_scores(
+            *(historic_deals[column].to_numpy() for column in
+              ('velocity_score', 'momentum_score', 'risk_score', 'competition_score')),
+            HISTORIC_OPPORTUNITY_WEIGHTS
         )
     
     # Ordina per opportunity score decrescente
@@ -268,6 +831,42 @@ def find_historic_deals(df: pd.DataFrame, params: Dict[str, float] = None) -> pd
     return historic_deals
 
 
+def find_historic_deals_parallel(df: pd.DataFrame, params: Dict[str, float] = None,
+                                npartitions: Optional[int] = None) -> pd.DataFrame:
+    """
+    Variante di find_historic_deals per cataloghi molto grandi
+    
+    Le righe vengono divise in partizioni elaborate in parallelo da un pool di
+    thread: la pipeline è interamente vettorizzata, quindi il lavoro avviene
+    dentro numpy senza lambda Python per riga.
+    
+    Args:
+        df: DataFrame con i dati dei prodotti
+        params: Parametri per i criteri di selezione
+        npartitions: Numero di partizioni (default: numero di CPU)
+        
+    Returns:
+        DataFrame con gli affari storici ordinati per opportunity score
+    """
+    if npartitions is None:
+        npartitions = os.cpu_count() or 1
+    npartitions = max(1, min(npartitions, len(df)))
+    
+    if npartitions == 1:
+        return find_historic_deals(df, params)
+    
+    partitions = [df.iloc[rows] for rows in np.array_split(np.arange(len(df)), npartitions)]
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=npartitions) as executor:
+        results = list(executor.map(lambda partition: find_historic_deals(partition, params), partitions))
+    
+    non_empty = [result for result in results if not result.empty]
+    if not non_empty:
+        return results[0]
+    
+    return pd.concat(non_empty).sort_values('opportunity_score', ascending=False)
+
+
 def validate_historic_data(row: pd.Series) -> Dict[str, bool]:
     """
     Valida la presenza e qualità dei dati storici
@@ -300,12 +899,13 @@ def validate_historic_data(row: pd.Series) -> Dict[str, bool]:
     return validation_results
 
 
-def analyze_price_trends(df: pd.DataFrame) -> Dict[str, Any]:
+def analyze_price_trends(df: pd.DataFrame, metrics: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
     """
     Analizza i trend di prezzo nel dataset
     
     Args:
         df: DataFrame con i dati dei prodotti
+        metrics: Metriche storiche già calcolate (calculate_historic_metrics_vec)
         
     Returns:
         Dict con statistiche sui trend
@@ -313,36 +913,29 @@ def analyze_price_trends(df: pd.DataFrame) -> Dict[str, Any]:
     if df.empty:
         return {'products_analyzed': 0}
     
-    trends_data = []
+    if metrics is None:
+        metrics = calculate_historic_metrics_vec(df)
+    valid = metrics['current'].to_numpy() > 0
     
-    for _, row in df.iterrows():
-        metrics = calculate_historic_metrics(row)
-        
-        if metrics['current'] > 0:
-            trends_data.append({
-                'asin': row.get('ASIN', ''),
-                'current_price': metrics['current'],
-                'dev_30d': metrics['dev_30d'],
-                'dev_90d': metrics['dev_90d'],
-                'dev_180d': metrics['dev_180d'],
-                'price_range': metrics['highest'] - metrics['lowest'] if metrics['highest'] > metrics['lowest'] else 0
-            })
-    
-    if not trends_data:
+    if not valid.any():
         return {'products_analyzed': 0}
     
-    trends_df = pd.DataFrame(trends_data)
+    current = metrics['current'].to_numpy()[valid]
+    dev_30d = metrics['dev_30d'].to_numpy()[valid]
+    dev_90d = metrics['dev_90d'].to_numpy()[valid]
+    dev_180d = metrics['dev_180d'].to_numpy()[valid]
+    price_range = np.maximum(metrics['highest'].to_numpy()[valid] - metrics['lowest'].to_numpy()[valid], 0)
     
     # Statistiche sui trend
     analysis = {
-        'products_analyzed': len(trends_df),
-        'avg_deviation_30d': trends_df['dev_30d'].mean(),
-        'avg_deviation_90d': trends_df['dev_90d'].mean(),
-        'avg_deviation_180d': trends_df['dev_180d'].mean(),
-        'products_below_90d_avg': len(trends_df[trends_df['dev_90d'] < 0]),
-        'products_significantly_below': len(trends_df[trends_df['dev_90d'] < -0.10]),
-        'avg_price_range': trends_df['price_range'].mean(),
-        'median_current_price': trends_df['current_price'].median()
+        'products_analyzed': int(valid.sum()),
+        'avg_deviation_30d': float(dev_30d.mean()),
+        'avg_deviation_90d': float(dev_90d.mean()),
+        'avg_deviation_180d': float(dev_180d.mean()),
+        'products_below_90d_avg': int((dev_90d < 0).sum()),
+        'products_significantly_below': int((dev_90d < -0.10).sum()),
+        'avg_price_range': float(price_range.mean()),
+        'median_current_price': float(np.median(current))
     }
     
     # Percentuali
@@ -367,25 +960,19 @@ def get_deal_quality_score(row: pd.Series) -> float:
     Returns:
         float: Punteggio qualità 0-100
     """
-    if not is_historic_deal(row):
+    # Metriche storiche e velocity calcolate una sola volta e riusate
+    metrics = _historic_metrics_record(row)
+    velocity = velocity_index(row)
+    
+    if not _is_historic_deal_from_metrics(row, metrics, velocity):
         return 0.0
     
     # Componenti del punteggio
-    momentum = momentum_index(row)
+    momentum = _momentum_from_metrics(metrics)
     risk = risk_index(row)
-    velocity = velocity_index(row)
-    
-    # Metriche storiche
-    metrics = calculate_historic_metrics(row)
     
-    # Bonus per sconto profondo
-    discount_bonus = 0
-    if metrics['dev_90d'] < -0.20:
-        discount_bonus = 15
-    elif metrics['dev_90d'] < -0.15:
-        discount_bonus = 10
-    elif metrics['dev_90d'] < -0.10:
-        discount_bonus = 5
+    # Bonus per sconto profondo (>10% +5, >15% +10, >20% +15)
+    discount_bonus = float(_QUALITY_DISCOUNT_LUT[_discount_step(metrics.dev_90d)])
     
     # Punteggio finale pesato
     quality_score = (
@@ -398,101 +985,242 @@ def get_deal_quality_score(row: pd.Series) -> float:
     return max(0.0, min(100.0, quality_score))
 
 
-def detect_historic_deals(df):
-    """
-    Identifica opportunità eccezionali basate su pattern storici
+def get_deal_quality_score_df(df: pd.DataFrame, metrics: Optional[pd.DataFrame] = None,
+                              velocity: Optional[np.ndarray] = None, momentum: Optional[np.ndarray] = None,
+                              risk: Optional[np.ndarray] = None) -> pd.Series:
     """
-    historic_deals = []
+    Versione vettorizzata di get_deal_quality_score sull'intero DataFrame
     
-    for _, row in df.iterrows():
-        signals = 0
-        deal_info = {
-            'asin': row.get('ASIN', ''),
-            'title': row.get('Title', ''),
-            'signals': [],
-            'signal_count': 0
-        }
-        
-        # Signal 1: Prezzo al minimo storico
-        current_price = row.get('Buy Box 🚚: Current', 0)
-        lowest_price = row.get('Buy Box 🚚: Lowest', 0)
-        if current_price > 0 and lowest_price > 0 and current_price <= lowest_price * 1.05:
-            signals += 2
-            deal_info['signals'].append('Near historic low price')
-            
-        # Signal 2: Amazon fuori stock
-        amazon_oos = row.get('Amazon: 90 days OOS', 0)
-        if pd.notna(amazon_oos) and amazon_oos > 50:
-            signals += 2
-            deal_info['signals'].append('Amazon frequently out of stock')
-            
-        # Signal 3: Alta stabilità prezzi (bassa volatilità)
-        std_dev = row.get('Buy Box: Standard Deviation 30 days', 0)
-        avg_30d = row.get('Buy Box 🚚: 30 days avg.', 1)
-        if std_dev > 0 and avg_30d > 0 and std_dev < avg_30d * 0.05:
-            signals += 1
-            deal_info['signals'].append('Low price volatility')
-            
-        # Signal 4: Rank in miglioramento
-        current_rank = row.get('Sales Rank: Current', 999999)
-        avg_rank_30d = row.get('Sales Rank: 30 days avg.', current_rank)
-        if current_rank > 0 and avg_rank_30d > 0 and current_rank < avg_rank_30d * 0.8:
-            signals += 1
-            deal_info['signals'].append('Improving sales rank')
-            
-        # Signal 5: Pochi competitor
-        winner_count = row.get('Buy Box: Winner Count 30 days', row.get('Buy Box: Winner Count', 10))
-        if pd.notna(winner_count) and winner_count < 5:
-            signals += 1
-            deal_info['signals'].append('Low competition')
-            
-        # Signal 6: Prezzo sotto media 90d significativo
-        avg_90d = row.get('Buy Box 🚚: 90 days avg.', current_price)
-        if current_price > 0 and avg_90d > 0:
-            discount_pct = (avg_90d - current_price) / avg_90d
-            if discount_pct > 0.15:  # >15% sotto media
-                signals += 2
-                deal_info['signals'].append(f'Significant discount vs 90d avg ({discount_pct:.1%})')
-            elif discount_pct > 0.10:  # >10% sotto media
-                signals += 1
-                deal_info['signals'].append(f'Good discount vs 90d avg ({discount_pct:.1%})')
-        
-        # Signal 7: Alta qualità prodotto
-        rating = row.get('Reviews: Rating', 0)
-        review_count = row.get('Reviews: Rating Count', 0)
-        if rating >= 4.0 and review_count >= 100:
-            signals += 1
-            deal_info['signals'].append('High quality product')
+    Args:
+        df: DataFrame con i dati dei prodotti
+        metrics: Metriche storiche già calcolate (calculate_historic_metrics_vec)
+        velocity: Velocity score già calcolati
+        momentum: Momentum score già calcolati
+        risk: Risk score già calcolati
         
-        # Signal 8: Bassa dominanza Amazon
-        amazon_share = row.get('Buy Box: % Amazon 90 days', 100)
-        if pd.notna(amazon_share) and amazon_share < 60:
-            signals += 1
-            deal_info['signals'].append('Low Amazon dominance')
+    Returns:
+        pd.Series: Punteggio qualità 0-100 allineato all'indice di df (0 se non è un affare storico)
+    """
+    # Componenti mancanti calcolati una sola volta per tutto il DataFrame
+    columns = DealColumns.from_df(df)
+    if metrics is None:
+        metrics = calculate_historic_metrics_vec(columns)
+    if velocity is None:
+        velocity = _velocity_vec(columns)
+    if momentum is None or risk is None:
+        fused_momentum, fused_risk = historic_scores_vec(columns, metrics)
+        momentum = fused_momentum if momentum is None else momentum
+        risk = fused_risk if risk is None else risk
+    
+    dev_90d = metrics['dev_90d'].to_numpy()
+    deal_mask = is_historic_deal_vec(columns, metrics=metrics, velocity=velocity)
+    
+    # Stesso ordine delle somme della versione per riga
+    quality_score = _weighted_scores(
+        momentum, risk, velocity, np.full(len(dev_90d), 50.0), _QUALITY_WEIGHTS
+    ) + _QUALITY_DISCOUNT_LUT[_discount_step(dev_90d)]
+    
+    quality_score = np.where(deal_mask, np.clip(quality_score, 0.0, 100.0), 0.0)
+    return pd.Series(quality_score, index=df.index, name='deal_quality_score')
+
+
+# Segnali di detect_historic_deals come bit di una maschera uint16 (ordine di presentazione)
+SIGNAL_NEAR_LOW = 1 << 0
+SIGNAL_AMAZON_OOS = 1 << 1
+SIGNAL_LOW_VOLATILITY = 1 << 2
+SIGNAL_IMPROVING_RANK = 1 << 3
+SIGNAL_LOW_COMPETITION = 1 << 4
+SIGNAL_SIGNIFICANT_DISCOUNT = 1 << 5
+SIGNAL_GOOD_DISCOUNT = 1 << 6
+SIGNAL_HIGH_QUALITY = 1 << 7
+SIGNAL_LOW_AMAZON = 1 << 8
+
+SIGNAL_LABELS = {
+    SIGNAL_NEAR_LOW: 'Near historic low price',
+    SIGNAL_AMAZON_OOS: 'Amazon frequently out of stock',
+    SIGNAL_LOW_VOLATILITY: 'Low price volatility',
+    SIGNAL_IMPROVING_RANK: 'Improving sales rank',
+    SIGNAL_LOW_COMPETITION: 'Low competition',
+    SIGNAL_SIGNIFICANT_DISCOUNT: 'Significant discount vs 90d avg',
+    SIGNAL_GOOD_DISCOUNT: 'Good discount vs 90d avg',
+    SIGNAL_HIGH_QUALITY: 'High quality product',
+    SIGNAL_LOW_AMAZON: 'Low Amazon dominance'
+}
+NUM_SIGNALS = len(SIGNAL_LABELS)
+
+# Valore di bit e peso nel conteggio di ogni segnale, nell'ordine di SIGNAL_LABELS
+_SIGNAL_BIT_VALUES = np.array(list(SIGNAL_LABELS), dtype=np.uint16)
+_SIGNAL_WEIGHTS = np.array([2, 2, 1, 1, 1, 2, 1, 1, 1], dtype=np.int16)
+
+_DISCOUNT_SIGNALS = SIGNAL_SIGNIFICANT_DISCOUNT | SIGNAL_GOOD_DISCOUNT
+
+
+def decode_signals(bits: int, discount: Optional[float] = None) -> list:
+    """
+    Converte una maschera di segnali nelle descrizioni testuali
+    
+    Args:
+        bits: Maschera di bit (colonna signal_bits)
+        discount: Sconto vs media 90 giorni da riportare nei segnali di sconto
         
-        # Soglia per considerare un "historic deal"
-        if signals >= 4:
-            deal_info['signal_count'] = signals
-            deal_info['current_price'] = current_price
-            deal_info['avg_90d_price'] = avg_90d
-            deal_info['lowest_price'] = lowest_price
-            deal_info['discount_vs_90d'] = (avg_90d - current_price) / avg_90d if avg_90d > 0 else 0
-            deal_info['sales_rank'] = current_rank
-            deal_info['rating'] = rating
-            deal_info['review_count'] = review_count
-            
-            # Calcola score qualità
-            deal_info['quality_score'] = min(100, signals * 15)  # Max 100
-            
-            historic_deals.append(deal_info)
+    Returns:
+        list: Descrizioni dei segnali attivi, in ordine di presentazione
+    """
+    labels = []
+    for bit, label in SIGNAL_LABELS.items():
+        if bits & bit:
+            if bit & _DISCOUNT_SIGNALS and discount is not None:
+                label = f'{label} ({discount:.1%})'
+            labels.append(label)
+    return labels
+
+
+def _signal_arrays(current_price, lowest_price, amazon_oos, std_dev, avg_30d, current_rank,
+                   avg_rank_30d, winner_count, avg_90d, rating, review_count, amazon_share):
+    """
+    Maschera di bit e conteggio pesato dei segnali di detect_historic_deals (versione numpy)
+    
+    Returns:
+        Tuple (signal_bits uint16, signal_count int16)
+    """
+    # Segnali come maschere booleane (i confronti con NaN sono sempre False)
+    near_low = (current_price > 0) & (lowest_price > 0) & (current_price <= lowest_price * 1.05)
+    amazon_oos_high = amazon_oos > 50
+    low_volatility = (std_dev > 0) & (avg_30d > 0) & (std_dev < avg_30d * 0.05)
+    improving_rank = (current_rank > 0) & (avg_rank_30d > 0) & (current_rank < avg_rank_30d * 0.8)
+    low_competition = winner_count < 5
+    
+    valid_discount = (current_price > 0) & (avg_90d > 0)
+    discount_pct = np.divide(avg_90d - current_price, avg_90d,
+                             out=np.zeros_like(avg_90d), where=valid_discount)
+    significant_discount = valid_discount & (discount_pct > 0.15)
+    good_discount = valid_discount & (discount_pct > 0.10) & ~significant_discount
+    
+    high_quality = (rating >= 4.0) & (review_count >= 100)
+    low_amazon = amazon_share < 60
+    
+    # Matrice righe x segnali (ordine di SIGNAL_LABELS): maschera di bit e conteggio
+    # pesato (max 11) sono due prodotti matrice-vettore sulla stessa matrice
+    conditions = np.column_stack([
+        near_low, amazon_oos_high, low_volatility, improving_rank, low_competition,
+        significant_discount, good_discount, high_quality, low_amazon
+    ])
+    return conditions.astype(np.uint16) @ _SIGNAL_BIT_VALUES, conditions.astype(np.int16) @ _SIGNAL_WEIGHTS
+
+
+@njit(parallel=True, cache=True)
+def _signal_kernel(current_price, lowest_price, amazon_oos, std_dev, avg_30d, current_rank,
+                   avg_rank_30d, winner_count, avg_90d, rating, review_count, amazon_share):
+    """
+    Kernel numba di _signal_arrays: una passata per riga senza maschere intermedie
+    (niente fastmath, i confronti con NaN devono restare False)
+    """
+    n = current_price.shape[0]
+    signal_bits = np.zeros(n, dtype=np.uint16)
+    signal_count = np.zeros(n, dtype=np.int16)
+    
+    for i in prange(n):
+        bits = 0
+        count = 0
+        if current_price[i] > 0 and lowest_price[i] > 0 and current_price[i] <= lowest_price[i] * 1.05:
+            bits |= SIGNAL_NEAR_LOW
+            count += 2
+        if amazon_oos[i] > 50:
+            bits |= SIGNAL_AMAZON_OOS
+            count += 2
+        if std_dev[i] > 0 and avg_30d[i] > 0 and std_dev[i] < avg_30d[i] * 0.05:
+            bits |= SIGNAL_LOW_VOLATILITY
+            count += 1
+        if current_rank[i] > 0 and avg_rank_30d[i] > 0 and current_rank[i] < avg_rank_30d[i] * 0.8:
+            bits |= SIGNAL_IMPROVING_RANK
+            count += 1
+        if winner_count[i] < 5:
+            bits |= SIGNAL_LOW_COMPETITION
+            count += 1
+        if current_price[i] > 0 and avg_90d[i] > 0:
+            discount = (avg_90d[i] - current_price[i]) / avg_90d[i]
+            if discount > 0.15:
+                bits |= SIGNAL_SIGNIFICANT_DISCOUNT
+                count += 2
+            elif discount > 0.10:
+                bits |= SIGNAL_GOOD_DISCOUNT
+                count += 1
+        if rating[i] >= 4.0 and review_count[i] >= 100:
+            bits |= SIGNAL_HIGH_QUALITY
+            count += 1
+        if amazon_share[i] < 60:
+            bits |= SIGNAL_LOW_AMAZON
+            count += 1
+        signal_bits[i] = bits
+        signal_count[i] = count
+    
+    return signal_bits, signal_count
+
+
+def detect_historic_deals(df):
+    """
+    Identifica opportunità eccezionali basate su pattern storici
+    """
+    if df.empty:
+        return pd.DataFrame()
     
-    # Converte in DataFrame e ordina per signal count e quality score
-    if historic_deals:
-        deals_df = pd.DataFrame(historic_deals)
-        deals_df = deals_df.sort_values(['signal_count', 'quality_score'], ascending=[False, False])
-        return deals_df
+    # Colonne estratte una sola volta (stessi default di row.get nella logica originale)
+    columns = DealColumns.from_df(df)
+    current_price = columns.get('current', missing=0)
+    lowest_price = columns.get('lowest', missing=0)
+    amazon_oos = columns.get('amazon_oos_90d', missing=0)
+    std_dev = columns.get('std_dev_30d', missing=0)
+    avg_30d = columns.get('avg_30d', missing=1)
+    current_rank = columns.get('sales_rank', missing=999999)
+    avg_rank_30d = columns.sales_rank_30d if 'sales_rank_30d' in columns.available else current_rank
+    winner_count = (columns.winner_count_30d if 'winner_count_30d' in columns.available
+                    else columns.get('winner_count', missing=10))
+    avg_90d = columns.avg_90d if 'avg_90d' in columns.available else current_price
+    rating = columns.get('rating', missing=0)
+    review_count = columns.get('rating_count', missing=0)
+    amazon_share = columns.get('amazon_share_90d', missing=100)
+    
+    signal_inputs = (current_price, lowest_price, amazon_oos, std_dev, avg_30d, current_rank,
+                     avg_rank_30d, winner_count, avg_90d, rating, review_count, amazon_share)
+    if HAS_NUMBA:
+        signal_bits, signal_count = _signal_kernel(*signal_inputs)
     else:
+        signal_bits, signal_count = _signal_arrays(*signal_inputs)
+    
+    # Soglia per considerare un "historic deal"
+    selected = np.flatnonzero(signal_count >= 4)
+    if selected.size == 0:
         return pd.DataFrame()
+    
+    selected_bits = signal_bits[selected]
+    selected_count = signal_count[selected]
+    selected_avg_90d = avg_90d[selected]
+    selected_current = current_price[selected]
+    selected_discount = np.divide(selected_avg_90d - selected_current, selected_avg_90d,
+                                  out=np.zeros_like(selected_avg_90d), where=selected_avg_90d > 0)
+    
+    # Descrizioni testuali solo per le righe selezionate
+    signal_labels = [decode_signals(bits, discount)
+                     for bits, discount in zip(selected_bits.tolist(), selected_discount.tolist())]
+    
+    deals_df = pd.DataFrame({
+        'asin': df['ASIN'].to_numpy()[selected] if 'ASIN' in df.columns else '',
+        'title': df['Title'].to_numpy()[selected] if 'Title' in df.columns else '',
+        'signals': signal_labels,
+        'signal_count': selected_count,
+        'signal_bits': selected_bits,
+        'current_price': selected_current,
+        'avg_90d_price': selected_avg_90d,
+        'lowest_price': lowest_price[selected],
+        'discount_vs_90d': selected_discount,
+        'sales_rank': current_rank[selected],
+        'rating': rating[selected],
+        'review_count': review_count[selected],
+        'quality_score': np.minimum(100, selected_count * 15).astype(np.int16)  # Max 100
+    })
+    
+    # Ordina per signal count e quality score
+    return deals_df.sort_values(['signal_count', 'quality_score'], ascending=[False, False])
 
 
 def analyze_deal_patterns(df):
@@ -512,12 +1240,9 @@ def analyze_deal_patterns(df):
     patterns = {}
     
     # Pattern 1: Distribuzione segnali
-    signal_distribution = {}
-    for _, deal in deals.iterrows():
-        for signal in deal['signals']:
-            signal_distribution[signal] = signal_distribution.get(signal, 0) + 1
+    signal_distribution = deals['signals'].explode().dropna().value_counts(sort=False)
     
-    patterns['signal_frequency'] = signal_distribution
+    patterns['signal_frequency'] = signal_distribution.to_dict()
     
     # Pattern 2: Range di prezzi
     patterns['price_stats'] = {
@@ -545,17 +1270,20 @@ def analyze_deal_patterns(df):
     }
 
 
+# Raccomandazioni per livello di rischio Amazon
+_RECS = {
+    'CRITICAL': "⛔ AVOID - Amazon domina completamente questo mercato. Rischio altissimo di price war.",
+    'HIGH': "⚠️ CAUTION - Alta probabilità di competizione Amazon. Considera solo con margini molto alti.",
+    'MEDIUM': "🟡 MONITOR - Competizione Amazon moderata. Monitora attentamente i prezzi Amazon.",
+    'LOW': "✅ PROCEED - Bassa presenza Amazon. Buona opportunità di arbitraggio."
+}
+
+
 def generate_risk_recommendation(risk_level):
     """
     Genera raccomandazioni basate sul livello di rischio Amazon
     """
-    recommendations = {
-        'CRITICAL': "⛔ AVOID - Amazon domina completamente questo mercato. Rischio altissimo di price war.",
-        'HIGH': "⚠️ CAUTION - Alta probabilità di competizione Amazon. Considera solo con margini molto alti.",
-        'MEDIUM': "🟡 MONITOR - Competizione Amazon moderata. Monitora attentamente i prezzi Amazon.",
-        'LOW': "✅ PROCEED - Bassa presenza Amazon. Buona opportunità di arbitraggio."
-    }
-    return recommendations.get(risk_level, "Unknown risk level")
+    return _RECS.get(risk_level, "Unknown risk level")
 
 
 def assess_amazon_competition_risk(row):
@@ -611,6 +1339,70 @@ def assess_amazon_competition_risk(row):
     }
 
 
+def _first_numeric_column(df: pd.DataFrame, columns: Tuple[str, ...], default: float) -> np.ndarray:
+    """
+    Prima colonna presente tra quelle indicate (stesso fallback di row.get annidati), NaN -> default
+    """
+    for column in columns:
+        if column in df.columns:
+            values = _numeric_column(df, column)
+            return np.where(np.isnan(values), default, values)
+    return np.full(len(df), default, dtype=np.float64)
+
+
+RISK_LEVELS = np.array(['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])
+_RISK_RECOMMENDATIONS = np.array([_RECS[level] for level in RISK_LEVELS], dtype=object)
+
+# Fattori di rischio Amazon nell'ordine dei bit di factors_mask
+RISK_FACTORS = ('amazon_dominance', 'frequent_restocks', 'price_matching', 'prime_exclusive')
+_RISK_FACTOR_BITS = np.array([1 << i for i in range(len(RISK_FACTORS))], dtype=np.uint8)
+
+
+def assess_amazon_competition_risk_batch(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Versione vettorizzata di assess_amazon_competition_risk per un intero DataFrame
+    
+    Args:
+        df: DataFrame con i dati dei prodotti
+        
+    Returns:
+        DataFrame allineato all'indice di df con fattori di rischio, factors_mask
+        (bit in ordine RISK_FACTORS), score, level, recommendation e
+        price_difference (NaN dove non calcolabile)
+    """
+    amazon_dominance = _first_numeric_column(df, ('Buy Box: % Amazon 365 days', 'Buy Box: % Amazon 90 days'), 0)
+    amazon_oos_count = _first_numeric_column(df, ('Amazon: OOS Count 90 days',), 0)
+    amazon_avg_price = _first_numeric_column(df, ('Amazon: 365 days avg.', 'Amazon: Current'), 999999)
+    current_buybox = _first_numeric_column(df, ('Buy Box 🚚: Current',), 0)
+    if 'Prime Eligible (Buy Box)' in df.columns:
+        prime_eligible = _mask_by_unique(df['Prime Eligible (Buy Box)'], lambda values: values == 'Yes')
+    else:
+        prime_eligible = np.zeros(len(df), dtype=bool)
+    
+    valid_price = (amazon_avg_price < 999999) & (current_buybox > 0)
+    price_difference = np.where(valid_price, np.abs(amazon_avg_price - current_buybox), np.nan)
+    
+    factors = pd.DataFrame(dict(zip(RISK_FACTORS, (
+        amazon_dominance > 60,
+        amazon_oos_count < 5,
+        valid_price & (price_difference < 10),
+        prime_eligible & (amazon_dominance > 40)
+    ))), index=df.index)
+    
+    # Numero di fattori attivi (0-4) -> livello, score 0-100
+    factor_matrix = factors.to_numpy()
+    active = factor_matrix.sum(axis=1)
+    level_codes = active.clip(max=3)
+    
+    factors['factors_mask'] = factor_matrix.astype(np.uint8) @ _RISK_FACTOR_BITS
+    factors['score'] = (active * 25).astype(np.int64)
+    # Livello e raccomandazione indicizzati per codice (4 valori distinti, nessun lookup per riga)
+    factors['level'] = RISK_LEVELS[level_codes]
+    factors['recommendation'] = _RISK_RECOMMENDATIONS[level_codes]
+    factors['price_difference'] = price_difference
+    return factors
+
+
 def detect_stockout_opportunities(df: pd.DataFrame) -> pd.DataFrame:
     """
     Identifica prodotti con pattern di stock-out ricorrenti
@@ -621,60 +1413,96 @@ def detect_stockout_opportunities(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame con le opportunità di stock-out ordinate per punteggio
     """
+    if df.empty:
+        return pd.DataFrame()
+    
+    # Colonne estratte una sola volta, NaN/colonne mancanti -> 0
+    columns = DealColumns.from_df(df)
+    amazon_oos_90d = np.nan_to_num(columns.amazon_oos_90d, nan=0.0)
+    amazon_oos_count = np.nan_to_num(columns.amazon_oos_count_90d, nan=0.0)
+    price_drop_30d = np.nan_to_num(columns.drop_30d, nan=0.0)
     
-    opportunities = []
+    # High OOS + price stability = opportunity
+    opportunity_mask = (amazon_oos_90d > 30) & (price_drop_30d < 10)
+    if not opportunity_mask.any():
+        return pd.DataFrame()
+    
+    selected = np.flatnonzero(opportunity_mask)
+    oos_pct = amazon_oos_90d[selected]
+    oos_count = amazon_oos_count[selected]
+    price_drop = price_drop_30d[selected]
+    
+    # Calculate opportunity score
+    stability_bonus = np.maximum(0, (10 - price_drop) * 2)  # Price stability bonus
+    frequency_bonus = np.minimum(20, oos_count * 2)  # OOS frequency bonus
+    opportunity_score = np.minimum(100, oos_pct + stability_bonus + frequency_bonus)
+    
+    selected_columns = columns.subset(opportunity_mask)
+    result_df = pd.DataFrame({
+        'asin': df['ASIN'].to_numpy()[selected] if 'ASIN' in df.columns else '',
+        'title': df['Title'].to_numpy()[selected] if 'Title' in df.columns else '',
+        'amazon_oos_pct': oos_pct,
+        'oos_frequency': oos_count,
+        'price_stability': 100 - price_drop,
+        'stockout_opportunity_score': opportunity_score,
+        'recommendation': generate_stockout_strategy_vec(oos_pct, oos_count),
+        'current_price': selected_columns.get('current', missing=0),
+        'sales_rank': selected_columns.get('sales_rank', missing=999999),
+        'rating': selected_columns.get('rating', missing=0),
+        'velocity_score': _velocity_vec(selected_columns),
+        'price_drop_pct': price_drop
+    })
+    
+    return result_df.sort_values('stockout_opportunity_score', ascending=False)
+
+
+# Strategie stock-out, dalla più aggressiva alla più prudente
+_STOCKOUT_STRATEGIES_EMOJI = [
+    "🔥 AGGRESSIVE: Amazon chronically out of stock. Stock heavy and price competitively.",
+    "💰 MODERATE+: Frequent Amazon stockouts. Maintain steady inventory with competitive pricing.",
+    "💰 MODERATE: Regular Amazon stockouts. Maintain steady inventory.",
+    "👀 MONITOR+: Occasional stockouts with potential. Watch for patterns and stock lightly.",
+    "👀 MONITOR: Occasional stockouts. Watch for patterns."
+]
+_STOCKOUT_STRATEGIES_PLAIN = [strategy.split(' ', 1)[1] for strategy in _STOCKOUT_STRATEGIES_EMOJI]
+
+
+def _supports_emoji() -> bool:
+    """
+    Verifica una sola volta se l'output corrente sa codificare le emoji
+    """
+    encoding = getattr(sys.stdout, 'encoding', None) or 'utf-8'
+    try:
+        '🔥💰👀'.encode(encoding)
+        return True
+    except (UnicodeEncodeError, LookupError):
+        return False
+
+
+# Tabella scelta all'import (per ambienti che non gestiscono le emoji)
+_SUPPORTS_EMOJI = _supports_emoji()
+_STOCKOUT_STRATEGIES = _STOCKOUT_STRATEGIES_EMOJI if _SUPPORTS_EMOJI else _STOCKOUT_STRATEGIES_PLAIN
+_STAR_PREFIX = '⭐ ' if _SUPPORTS_EMOJI else 'STAR: '
+
+
+def generate_stockout_strategy_vec(oos_pct: np.ndarray, oos_count: np.ndarray) -> np.ndarray:
+    """
+    Versione vettorizzata di generate_stockout_strategy
     
-    for _, row in df.iterrows():
-        # Check Amazon OOS pattern
-        amazon_oos_90d = row.get('Amazon: 90 days OOS', 0)
-        amazon_oos_count = row.get('Amazon: OOS Count 90 days', 0)
+    Args:
+        oos_pct: Percentuali di tempo in cui Amazon era out of stock
+        oos_count: Numero di stock-out di Amazon
         
-        # Gestione valori NaN
-        if pd.isna(amazon_oos_90d):
-            amazon_oos_90d = 0
-        if pd.isna(amazon_oos_count):
-            amazon_oos_count = 0
-            
-        # Check price drops during OOS
-        price_drop_30d = row.get('Buy Box 🚚: 30 days drop %', 0)
-        if pd.isna(price_drop_30d):
-            price_drop_30d = 0
-            
-        # High OOS + price stability = opportunity
-        if amazon_oos_90d > 30 and price_drop_30d < 10:
-            # Calculate opportunity score
-            base_score = amazon_oos_90d  # Base score from OOS percentage
-            stability_bonus = max(0, (10 - price_drop_30d) * 2)  # Price stability bonus
-            frequency_bonus = min(20, amazon_oos_count * 2)  # OOS frequency bonus
-            
-            opportunity_score = min(100, base_score + stability_bonus + frequency_bonus)
-            
-            # Additional metrics for better analysis
-            current_price = row.get('Buy Box 🚚: Current', 0)
-            sales_rank = row.get('Sales Rank: Current', 999999)
-            rating = row.get('Reviews: Rating', 0)
-            velocity_score = velocity_index(row) if callable(globals().get('velocity_index')) else 50
-            
-            opportunities.append({
-                'asin': row.get('ASIN', ''),
-                'title': row.get('Title', ''),
-                'amazon_oos_pct': amazon_oos_90d,
-                'oos_frequency': amazon_oos_count,
-                'price_stability': 100 - price_drop_30d,
-                'stockout_opportunity_score': opportunity_score,
-                'recommendation': generate_stockout_strategy(amazon_oos_90d, amazon_oos_count),
-                'current_price': current_price,
-                'sales_rank': sales_rank,
-                'rating': rating,
-                'velocity_score': velocity_score,
-                'price_drop_pct': price_drop_30d
-            })
-    
-    result_df = pd.DataFrame(opportunities)
-    if not result_df.empty:
-        result_df = result_df.sort_values('stockout_opportunity_score', ascending=False)
-    
-    return result_df
+    Returns:
+        np.ndarray: Raccomandazione strategica per ogni prodotto
+    """
+    conditions = [
+        (oos_pct > 50) & (oos_count > 10),
+        (oos_pct > 40) & (oos_count > 8),
+        oos_pct > 30,
+        oos_pct > 20
+    ]
+    return np.select(conditions, _STOCKOUT_STRATEGIES[:-1], default=_STOCKOUT_STRATEGIES[-1]).astype(object)
 
 
 def generate_stockout_strategy(oos_pct: float, oos_count: int) -> str:
@@ -689,29 +1517,16 @@ def generate_stockout_strategy(oos_pct: float, oos_count: int) -> str:
         str: Strategic recommendation
     """
     
-    try:
-        if oos_pct > 50 and oos_count > 10:
-            return "🔥 AGGRESSIVE: Amazon chronically out of stock. Stock heavy and price competitively."
-        elif oos_pct > 40 and oos_count > 8:
-            return "💰 MODERATE+: Frequent Amazon stockouts. Maintain steady inventory with competitive pricing."
-        elif oos_pct > 30:
-            return "💰 MODERATE: Regular Amazon stockouts. Maintain steady inventory."
-        elif oos_pct > 20:
-            return "👀 MONITOR+: Occasional stockouts with potential. Watch for patterns and stock lightly."
-        else:
-            return "👀 MONITOR: Occasional stockouts. Watch for patterns."
-    except UnicodeEncodeError:
-        # Fallback for environments that can't handle emojis
-        if oos_pct > 50 and oos_count > 10:
-            return "AGGRESSIVE: Amazon chronically out of stock. Stock heavy and price competitively."
-        elif oos_pct > 40 and oos_count > 8:
-            return "MODERATE+: Frequent Amazon stockouts. Maintain steady inventory with competitive pricing."
-        elif oos_pct > 30:
-            return "MODERATE: Regular Amazon stockouts. Maintain steady inventory."
-        elif oos_pct > 20:
-            return "MONITOR+: Occasional stockouts with potential. Watch for patterns and stock lightly."
-        else:
-            return "MONITOR: Occasional stockouts. Watch for patterns."
+    if oos_pct > 50 and oos_count > 10:
+        return _STOCKOUT_STRATEGIES[0]
+    elif oos_pct > 40 and oos_count > 8:
+        return _STOCKOUT_STRATEGIES[1]
+    elif oos_pct > 30:
+        return _STOCKOUT_STRATEGIES[2]
+    elif oos_pct > 20:
+        return _STOCKOUT_STRATEGIES[3]
+    else:
+        return _STOCKOUT_STRATEGIES[4]
 
 
 def analyze_stockout_patterns(df: pd.DataFrame) -> Dict[str, Any]:
@@ -728,60 +1543,36 @@ def analyze_stockout_patterns(df: pd.DataFrame) -> Dict[str, Any]:
     if df.empty:
         return {'products_analyzed': 0}
     
-    stockout_data = []
+    # Colonne estratte una sola volta, NaN/colonne mancanti -> 0
+    columns = DealColumns.from_df(df)
+    amazon_oos_pct = np.nan_to_num(columns.amazon_oos_90d, nan=0.0)
+    oos_count = np.nan_to_num(columns.amazon_oos_count_90d, nan=0.0)
+    price_drop = np.nan_to_num(columns.drop_30d, nan=0.0)
     
-    for _, row in df.iterrows():
-        amazon_oos_90d = row.get('Amazon: 90 days OOS', 0)
-        amazon_oos_count = row.get('Amazon: OOS Count 90 days', 0)
-        price_drop_30d = row.get('Buy Box 🚚: 30 days drop %', 0)
-        
-        # Gestione valori NaN
-        if pd.isna(amazon_oos_90d):
-            amazon_oos_90d = 0
-        if pd.isna(amazon_oos_count):
-            amazon_oos_count = 0
-        if pd.isna(price_drop_30d):
-            price_drop_30d = 0
-            
-        stockout_data.append({
-            'asin': row.get('ASIN', ''),
-            'amazon_oos_pct': amazon_oos_90d,
-            'oos_count': amazon_oos_count,
-            'price_drop': price_drop_30d,
-            'has_significant_oos': amazon_oos_90d > 30,
-            'is_opportunity': amazon_oos_90d > 30 and price_drop_30d < 10
-        })
-    
-    if not stockout_data:
-        return {'products_analyzed': 0}
-    
-    stockout_df = pd.DataFrame(stockout_data)
+    has_significant_oos = amazon_oos_pct > 30
+    is_opportunity = has_significant_oos & (price_drop < 10)
     
     # Statistiche sui pattern
     analysis = {
-        'products_analyzed': len(stockout_df),
-        'products_with_significant_oos': len(stockout_df[stockout_df['has_significant_oos']]),
-        'stockout_opportunities': len(stockout_df[stockout_df['is_opportunity']]),
-        'avg_amazon_oos_pct': stockout_df['amazon_oos_pct'].mean(),
-        'avg_oos_count': stockout_df['oos_count'].mean(),
-        'avg_price_drop': stockout_df['price_drop'].mean()
+        'products_analyzed': len(df),
+        'products_with_significant_oos': int(has_significant_oos.sum()),
+        'stockout_opportunities': int(is_opportunity.sum()),
+        'avg_amazon_oos_pct': float(amazon_oos_pct.mean()),
+        'avg_oos_count': float(oos_count.mean()),
+        'avg_price_drop': float(price_drop.mean())
     }
     
     # Percentuali
     total = analysis['products_analyzed']
-    if total > 0:
-        analysis['pct_significant_oos'] = analysis['products_with_significant_oos'] / total * 100
-        analysis['pct_opportunities'] = analysis['stockout_opportunities'] / total * 100
-    else:
-        analysis['pct_significant_oos'] = 0
-        analysis['pct_opportunities'] = 0
+    analysis['pct_significant_oos'] = analysis['products_with_significant_oos'] / total * 100
+    analysis['pct_opportunities'] = analysis['stockout_opportunities'] / total * 100
     
     # Pattern di distribuzione
     oos_distribution = {
-        'low_oos (0-20%)': len(stockout_df[(stockout_df['amazon_oos_pct'] >= 0) & (stockout_df['amazon_oos_pct'] <= 20)]),
-        'medium_oos (20-40%)': len(stockout_df[(stockout_df['amazon_oos_pct'] > 20) & (stockout_df['amazon_oos_pct'] <= 40)]),
-        'high_oos (40-60%)': len(stockout_df[(stockout_df['amazon_oos_pct'] > 40) & (stockout_df['amazon_oos_pct'] <= 60)]),
-        'critical_oos (>60%)': len(stockout_df[stockout_df['amazon_oos_pct'] > 60])
+        'low_oos (0-20%)': int(((amazon_oos_pct >= 0) & (amazon_oos_pct <= 20)).sum()),
+        'medium_oos (20-40%)': int(((amazon_oos_pct > 20) & (amazon_oos_pct <= 40)).sum()),
+        'high_oos (40-60%)': int(((amazon_oos_pct > 40) & (amazon_oos_pct <= 60)).sum()),
+        'critical_oos (>60%)': int((amazon_oos_pct > 60).sum())
     }
     
     analysis['oos_distribution'] = oos_distribution
@@ -812,38 +1603,49 @@ def get_stockout_insights(stockout_df: pd.DataFrame) -> list:
     # Insight generale
     insights.append(f"Found {total_opportunities} stock-out opportunities with average score {avg_score:.1f}")
     
-    # Analisi per categoria di opportunità
-    aggressive_ops = len(stockout_df[stockout_df['amazon_oos_pct'] > 50])
+    # Analisi per categoria di opportunità (conteggi sulle maschere, senza DataFrame filtrati)
+    amazon_oos_pct = stockout_df['amazon_oos_pct'].to_numpy()
+    aggressive_ops = int(np.count_nonzero(amazon_oos_pct > 50))
     if aggressive_ops > 0:
         insights.append(f"{aggressive_ops} AGGRESSIVE opportunities: Amazon frequently out of stock (>50%)")
     
-    moderate_ops = len(stockout_df[(stockout_df['amazon_oos_pct'] > 30) & (stockout_df['amazon_oos_pct'] <= 50)])
+    moderate_ops = int(np.count_nonzero((amazon_oos_pct > 30) & (amazon_oos_pct <= 50)))
     if moderate_ops > 0:
         insights.append(f"{moderate_ops} MODERATE opportunities: Regular Amazon stockouts (30-50%)")
     
     # Analisi stabilità prezzi
-    stable_price_ops = len(stockout_df[stockout_df['price_drop_pct'] < 5])
+    stable_price_ops = int((stockout_df['price_drop_pct'] < 5).sum())
     if stable_price_ops > 0:
         pct_stable = stable_price_ops / total_opportunities * 100
         insights.append(f"{stable_price_ops} opportunities ({pct_stable:.0f}%) have very stable prices (<5% drop)")
     
-    # Top opportunities
-    top_ops = stockout_df.head(3)
-    if not top_ops.empty:
-        top_score = top_ops.iloc[0]['stockout_opportunity_score']
-        insights.append(f"Top opportunity scores {top_score:.0f} with {top_ops.iloc[0]['amazon_oos_pct']:.0f}% Amazon OOS")
+    # Top opportunity: selezione parziale, senza dipendere dall'ordinamento del DataFrame
+    top_op = stockout_df.nlargest(1, 'stockout_opportunity_score').iloc[0]
+    insights.append(f"Top opportunity scores {top_op['stockout_opportunity_score']:.0f} with {top_op['amazon_oos_pct']:.0f}% Amazon OOS")
     
     # Raccomandazione generale
-    high_score_ops = len(stockout_df[stockout_df['stockout_opportunity_score'] > 80])
+    high_score_ops = int((stockout_df['stockout_opportunity_score'] > 80).sum())
     if high_score_ops > 0:
-        try:
-            insights.append(f"⭐ {high_score_ops} high-score opportunities (>80) - prioritize these for inventory")
-        except UnicodeEncodeError:
-            insights.append(f"STAR: {high_score_ops} high-score opportunities (>80) - prioritize these for inventory")
+        insights.append(f"{_STAR_PREFIX}{high_score_ops} high-score opportunities (>80) - prioritize these for inventory")
     
     return insights
 
 
+# Prefissi emoji dei testi stagionali (vuoti se l'output non sa codificarle)
+_PEAK_PREFIX, _OFF_PREFIX, _TRANSITION_PREFIX = ('📈 ', '📉 ', '🔄 ') if _SUPPORTS_EMOJI else ('', '', '')
+_BUY_PREFIX, _SELL_PREFIX, _TIMING_PREFIX, _MONITOR_PREFIX = (
+    ('🛒 ', '💰 ', '⏰ ', '📊 ') if _SUPPORTS_EMOJI else ('', '', '', '')
+)
+
+# Testi di raccomandazione per pattern (formattazione %: percentuale o direzione del trend)
+_SEASONAL_REC_TEMPLATES = {
+    'peak_season': f'{_PEAK_PREFIX}PEAK SEASON: Prices %.0f%% above average. Good time to sell.',
+    'off_season': f'{_OFF_PREFIX}OFF SEASON: Prices %.0f%% below average. Good time to buy and hold.',
+    'transitioning': f'{_TRANSITION_PREFIX}TRANSITIONING: Price trend changing %s. Monitor closely.',
+    'stable': 'Stable pricing pattern. No significant seasonal variation detected.'
+}
+
+
 def detect_seasonality(row: pd.Series) -> Dict[str, Any]:
     """
     Detecta pattern stagionali confrontando medie storiche
@@ -885,117 +1687,190 @@ def detect_seasonality(row: pd.Series) -> Dict[str, Any]:
     quarter_vs_year = avg_90d / avg_365d if avg_365d > 0 else 1.0
     half_year_vs_year = avg_180d / avg_365d if avg_365d > 0 else 1.0
     
+    # Detect patterns: pattern e valore da inserire nel testo di raccomandazione
+    if current_vs_year >= 1.20:  # 20% above yearly average
+        pattern, text_value = 'peak_season', (current_vs_year - 1) * 100
+    elif current_vs_year <= 0.80:  # 20% below yearly average
+        pattern, text_value = 'off_season', (1 - current_vs_year) * 100
+    elif abs(current_vs_year - quarter_vs_year) > 0.15:
+        pattern, text_value = 'transitioning', 'upward' if current_vs_year > quarter_vs_year else 'downward'
+    else:
+        pattern, text_value = 'stable', ()
+    
     seasonality_data = {
-        'has_seasonality': False,
+        'has_seasonality': pattern != 'stable',
         'seasonal_index': current_vs_year,
         'quarter_index': quarter_vs_year,
         'half_year_index': half_year_vs_year,
-        'pattern': 'stable',
-        'recommendation': '',
+        'pattern': pattern,
+        'recommendation': _SEASONAL_REC_TEMPLATES[pattern] % text_value,
         'data_quality': 'good',
-        'trend_strength': 0.0
+        'trend_strength': abs(current_vs_year - 1.0)
     }
     
-    # Calculate trend strength
-    trend_strength = abs(current_vs_year - 1.0)
-    seasonality_data['trend_strength'] = trend_strength
+    return seasonality_data
+
+
+# Medie Buy Box che determinano il pattern stagionale (30d, 90d, 365d)
+_SEASONAL_COLUMNS = ('Buy Box 🚚: 30 days avg.', 'Buy Box 🚚: 90 days avg.', 'Buy Box 🚚: 365 days avg.')
+
+# Pattern stagionali per codice (0 = stable) e score base corrispondente
+SEASONAL_PATTERNS = np.array(['stable', 'peak_season', 'off_season', 'transitioning'])
+_SEASONAL_BASE_SCORES = np.array([50.0, 70.0, 80.0, 60.0])
+
+# Valori possibili di data_quality in detect_seasonality
+_DATA_QUALITY_LEVELS = ['good', 'poor', 'error']
+
+
+def _year_ratio(average: np.ndarray, avg_365d: np.ndarray) -> np.ndarray:
+    """
+    Indice media / media annuale (media NaN o <= 0 -> 0), 1.0 dove la media annuale non è valida
+    """
+    if HAS_NUMEXPR and len(avg_365d) >= NUMEXPR_MIN_ROWS:
+        return numexpr.evaluate('where(year > 0, where(average > 0, average, 0.0) / year, 1.0)',
+                                local_dict={'average': average, 'year': avg_365d})
+    return np.divide(np.where(average > 0, average, 0.0), avg_365d, out=np.ones_like(avg_365d), where=avg_365d > 0)
+
+
+def _seasonal_arrays(avg_30d: np.ndarray, avg_90d: np.ndarray,
+                     avg_365d: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Classificazione stagionale vettorizzata (stesse soglie di detect_seasonality)
     
-    try:
-        # Detect patterns with fallback for Unicode issues
-        if current_vs_year >= 1.20:  # 20% above yearly average
-            seasonality_data['has_seasonality'] = True
-            seasonality_data['pattern'] = 'peak_season'
-            try:
-                seasonality_data['recommendation'] = f'📈 PEAK SEASON: Prices {(current_vs_year-1)*100:.0f}% above average. Good time to sell.'
-            except UnicodeEncodeError:
-                seasonality_data['recommendation'] = f'PEAK SEASON: Prices {(current_vs_year-1)*100:.0f}% above average. Good time to sell.'
-                
-        elif current_vs_year <= 0.80:  # 20% below yearly average
-            seasonality_data['has_seasonality'] = True
-            seasonality_data['pattern'] = 'off_season'
-            try:
-                seasonality_data['recommendation'] = f'📉 OFF SEASON: Prices {(1-current_vs_year)*100:.0f}% below average. Good time to buy and hold.'
-            except UnicodeEncodeError:
-                seasonality_data['recommendation'] = f'OFF SEASON: Prices {(1-current_vs_year)*100:.0f}% below average. Good time to buy and hold.'
-                
-        elif abs(current_vs_year - quarter_vs_year) > 0.15:
-            seasonality_data['has_seasonality'] = True
-            seasonality_data['pattern'] = 'transitioning'
-            direction = "upward" if current_vs_year > quarter_vs_year else "downward"
-            try:
-                seasonality_data['recommendation'] = f'🔄 TRANSITIONING: Price trend changing {direction}. Monitor closely.'
-            except UnicodeEncodeError:
-                seasonality_data['recommendation'] = f'TRANSITIONING: Price trend changing {direction}. Monitor closely.'
+    Args:
+        avg_30d: Media Buy Box 30 giorni
+        avg_90d: Media Buy Box 90 giorni
+        avg_365d: Media Buy Box 365 giorni
         
-        else:
-            # Stable pattern
-            seasonality_data['pattern'] = 'stable'
-            seasonality_data['recommendation'] = 'Stable pricing pattern. No significant seasonal variation detected.'
-    
-    except Exception as e:
-        # Fallback for any calculation errors
-        seasonality_data['pattern'] = 'error'
-        seasonality_data['recommendation'] = 'Error in seasonality calculation'
-        seasonality_data['data_quality'] = 'error'
-    
-    return seasonality_data
+    Returns:
+        Tuple (codici pattern int8 su SEASONAL_PATTERNS, indice corrente vs anno, indice trimestre vs anno);
+        le righe senza media annuale valida hanno codice 0 e indici 1.0
+    """
+    current_vs_year = _year_ratio(avg_30d, avg_365d)
+    quarter_vs_year = _year_ratio(avg_90d, avg_365d)
+    
+    pattern_codes = np.select(
+        [current_vs_year >= 1.20, current_vs_year <= 0.80, np.abs(current_vs_year - quarter_vs_year) > 0.15],
+        [1, 2, 3],
+        default=0
+    ).astype(np.int8)
+    return pattern_codes, current_vs_year, quarter_vs_year
+
+
+@njit(parallel=True, cache=True)
+def _seasonal_kernel(avg_30d, avg_90d, avg_365d):
+    """
+    Kernel numba di _seasonal_arrays: classificazione in una passata per riga
+    """
+    n = avg_365d.shape[0]
+    pattern_codes = np.zeros(n, dtype=np.int8)
+    current_vs_year = np.ones(n)
+    quarter_vs_year = np.ones(n)
+    
+    for i in prange(n):
+        year = avg_365d[i]
+        if not year > 0:
+            continue
+        current = avg_30d[i] if avg_30d[i] > 0 else 0.0
+        quarter = avg_90d[i] if avg_90d[i] > 0 else 0.0
+        current_vs_year[i] = current / year
+        quarter_vs_year[i] = quarter / year
+        
+        if current_vs_year[i] >= 1.20:
+            pattern_codes[i] = 1
+        elif current_vs_year[i] <= 0.80:
+            pattern_codes[i] = 2
+        elif abs(current_vs_year[i] - quarter_vs_year[i]) > 0.15:
+            pattern_codes[i] = 3
+    
+    return pattern_codes, current_vs_year, quarter_vs_year
+
 
+def _seasonal_recommendations(pattern_codes: np.ndarray, current_vs_year: np.ndarray,
+                              quarter_vs_year: np.ndarray) -> np.ndarray:
+    """
+    Testi di raccomandazione di detect_seasonality per righe già classificate
+    """
+    recommendations = np.full(len(pattern_codes), _SEASONAL_REC_TEMPLATES['stable'], dtype=object)
+    
+    peak = pattern_codes == 1
+    recommendations[peak] = np.char.mod(_SEASONAL_REC_TEMPLATES['peak_season'], (current_vs_year[peak] - 1) * 100)
+    off = pattern_codes == 2
+    recommendations[off] = np.char.mod(_SEASONAL_REC_TEMPLATES['off_season'], (1 - current_vs_year[off]) * 100)
+    transitioning = pattern_codes == 3
+    recommendations[transitioning] = np.char.mod(
+        _SEASONAL_REC_TEMPLATES['transitioning'],
+        np.where(current_vs_year[transitioning] > quarter_vs_year[transitioning], 'upward', 'downward')
+    )
+    return recommendations
 
-def analyze_seasonal_opportunities(df: pd.DataFrame) -> pd.DataFrame:
+
+def analyze_seasonal_opportunities(df: pd.DataFrame, top_k: Optional[int] = None) -> pd.DataFrame:
     """
     Analizza le opportunità stagionali nell'intero dataset
     
     Args:
         df: DataFrame con i dati dei prodotti
+        top_k: Se indicato, restituisce solo le top_k opportunità (testi generati solo per queste)
         
     Returns:
         DataFrame con le opportunità stagionali
     """
     
-    seasonal_opportunities = []
+    if df.empty:
+        return pd.DataFrame()
+    
+    avg_30d, avg_90d, avg_365d = (_numeric_column(df, column) for column in _SEASONAL_COLUMNS)
+    if HAS_NUMBA:
+        pattern_codes, current_vs_year, quarter_vs_year = _seasonal_kernel(avg_30d, avg_90d, avg_365d)
+    else:
+        pattern_codes, current_vs_year, quarter_vs_year = _seasonal_arrays(avg_30d, avg_90d, avg_365d)
     
-    for _, row in df.iterrows():
-        seasonality = detect_seasonality(row)
-        
-        # Only include products with detected seasonality
-        if seasonality['has_seasonality']:
-            # Additional metrics for analysis
-            current_price = row.get('Buy Box 🚚: Current', 0)
-            sales_rank = row.get('Sales Rank: Current', 999999)
-            rating = row.get('Reviews: Rating', 0)
-            
-            # Calculate opportunity score based on seasonality
-            base_score = 50
-            if seasonality['pattern'] == 'off_season':
-                base_score = 80  # High opportunity to buy
-            elif seasonality['pattern'] == 'peak_season':
-                base_score = 70  # Good opportunity to sell
-            elif seasonality['pattern'] == 'transitioning':
-                base_score = 60  # Monitor opportunity
-            
-            # Adjust score based on trend strength
-            trend_bonus = min(30, seasonality['trend_strength'] * 100)
-            opportunity_score = min(100, base_score + trend_bonus)
-            
-            seasonal_opportunities.append({
-                'asin': row.get('ASIN', ''),
-                'title': row.get('Title', ''),
-                'seasonal_pattern': seasonality['pattern'],
-                'seasonal_index': seasonality['seasonal_index'],
-                'trend_strength': seasonality['trend_strength'],
-                'seasonal_opportunity_score': opportunity_score,
-                'recommendation': seasonality['recommendation'],
-                'current_price': current_price,
-                'sales_rank': sales_rank,
-                'rating': rating,
-                'data_quality': seasonality['data_quality']
-            })
-    
-    result_df = pd.DataFrame(seasonal_opportunities)
-    if not result_df.empty:
-        result_df = result_df.sort_values('seasonal_opportunity_score', ascending=False)
-    
-    return result_df
+    # Only include products with detected seasonality
+    rows = np.flatnonzero(pattern_codes)
+    if len(rows) == 0:
+        return pd.DataFrame()
+    
+    pattern_codes = pattern_codes[rows]
+    current_vs_year = current_vs_year[rows]
+    quarter_vs_year = quarter_vs_year[rows]
+    
+    # Opportunity score: score base del pattern + bonus per intensità del trend
+    trend_strength = np.abs(current_vs_year - 1.0)
+    opportunity_score = np.minimum(100, _SEASONAL_BASE_SCORES[pattern_codes] + np.minimum(30, trend_strength * 100))
+    
+    if top_k is not None:
+        # Selezione parziale sugli score: colonne e testi solo per le righe restituite
+        top = pd.Series(opportunity_score).nlargest(top_k).index.to_numpy()
+        rows, pattern_codes, current_vs_year, quarter_vs_year, trend_strength, opportunity_score = (
+            values[top] for values in
+            (rows, pattern_codes, current_vs_year, quarter_vs_year, trend_strength, opportunity_score)
+        )
+    
+    def selected(column: str, default) -> Union[pd.Series, list]:
+        """Valori originali della colonna sulle righe selezionate (default se assente)"""
+        if column not in df.columns:
+            return [default] * len(rows)
+        return df[column].iloc[rows].reset_index(drop=True)
+    
+    result_df = pd.DataFrame({
+        'asin': selected('ASIN', ''),
+        'title': selected('Title', ''),
+        # Colonne a pochi valori come Categorical: codici int8 al posto di stringhe per riga
+        'seasonal_pattern': pd.Categorical.from_codes(pattern_codes, SEASONAL_PATTERNS),
+        'seasonal_index': current_vs_year,
+        'trend_strength': trend_strength,
+        'seasonal_opportunity_score': opportunity_score,
+        'recommendation': _seasonal_recommendations(pattern_codes, current_vs_year, quarter_vs_year),
+        'current_price': selected('Buy Box 🚚: Current', 0),
+        'sales_rank': selected('Sales Rank: Current', 999999),
+        'rating': selected('Reviews: Rating', 0),
+        'data_quality': pd.Categorical.from_codes(np.zeros(len(rows), dtype=np.int8), _DATA_QUALITY_LEVELS)
+    })
+    
+    if top_k is not None:
+        return result_df  # già in ordine di score decrescente
+    return result_df.sort_values('seasonal_opportunity_score', ascending=False)
 
 
 def get_seasonal_insights(seasonal_df: pd.DataFrame) -> list:
@@ -1017,34 +1892,35 @@ def get_seasonal_insights(seasonal_df: pd.DataFrame) -> list:
     
     total_seasonal = len(seasonal_df)
     
-    # Pattern analysis
-    peak_season = len(seasonal_df[seasonal_df['seasonal_pattern'] == 'peak_season'])
-    off_season = len(seasonal_df[seasonal_df['seasonal_pattern'] == 'off_season'])
-    transitioning = len(seasonal_df[seasonal_df['seasonal_pattern'] == 'transitioning'])
+    # Pattern analysis: conteggi e score medi per pattern in un solo groupby
+    pattern_stats = seasonal_df.groupby('seasonal_pattern', sort=False, observed=True)['seasonal_opportunity_score'].agg(['size', 'mean'])
+    pattern_counts, pattern_scores = pattern_stats['size'], pattern_stats['mean']
+    peak_season = pattern_counts.get('peak_season', 0)
+    off_season = pattern_counts.get('off_season', 0)
+    transitioning = pattern_counts.get('transitioning', 0)
     
     insights.append(f"Found {total_seasonal} products with seasonal patterns")
     
     if off_season > 0:
-        avg_off_season_score = seasonal_df[seasonal_df['seasonal_pattern'] == 'off_season']['seasonal_opportunity_score'].mean()
+        avg_off_season_score = pattern_scores['off_season']
         insights.append(f"{off_season} OFF-SEASON opportunities (avg score: {avg_off_season_score:.0f}) - prime time to stock up")
     
     if peak_season > 0:
-        avg_peak_score = seasonal_df[seasonal_df['seasonal_pattern'] == 'peak_season']['seasonal_opportunity_score'].mean()
+        avg_peak_score = pattern_scores['peak_season']
         insights.append(f"{peak_season} PEAK-SEASON products (avg score: {avg_peak_score:.0f}) - consider selling existing inventory")
     
     if transitioning > 0:
         insights.append(f"{transitioning} products in TRANSITION - monitor for directional changes")
     
     # Strength analysis
-    strong_trends = len(seasonal_df[seasonal_df['trend_strength'] > 0.3])
+    strong_trends = int((seasonal_df['trend_strength'] > 0.3).sum())
     if strong_trends > 0:
         pct_strong = strong_trends / total_seasonal * 100
         insights.append(f"{strong_trends} products ({pct_strong:.0f}%) show strong seasonal trends (>30% variation)")
     
-    # Top opportunities
-    if not seasonal_df.empty:
-        top_opportunity = seasonal_df.iloc[0]
-        insights.append(f"Top seasonal opportunity: {top_opportunity['seasonal_pattern'].upper()} pattern with {top_opportunity['seasonal_opportunity_score']:.0f} score")
+    # Top opportunity: selezione parziale, senza dipendere dall'ordinamento del DataFrame
+    top_opportunity = seasonal_df.nlargest(1, 'seasonal_opportunity_score').iloc[0]
+    insights.append(f"Top seasonal opportunity: {top_opportunity['seasonal_pattern'].upper()} pattern with {top_opportunity['seasonal_opportunity_score']:.0f} score")
     
     return insights
 
@@ -1061,41 +1937,20 @@ def seasonal_timing_recommendation(seasonal_pattern: str, seasonal_index: float)
         str: Raccomandazione di timing strategico
     """
     
-    try:
-        if seasonal_pattern == 'off_season':
-            if seasonal_index < 0.7:
-                return "🛒 BUY AGGRESSIVE: Deep off-season discount. Stock heavily for seasonal rebound."
-            else:
-                return "🛒 BUY MODERATE: Off-season opportunity. Build inventory gradually."
-                
-        elif seasonal_pattern == 'peak_season':
-            if seasonal_index > 1.3:
-                return "💰 SELL AGGRESSIVE: Peak pricing. Liquidate inventory at premium."
-            else:
-                return "💰 SELL MODERATE: Good seasonal pricing. Move inventory steadily."
-                
-        elif seasonal_pattern == 'transitioning':
-            return "⏰ TIMING CRITICAL: Trend changing. Act quickly in current direction."
+    if seasonal_pattern == 'off_season':
+        if seasonal_index < 0.7:
+            return f"{_BUY_PREFIX}BUY AGGRESSIVE: Deep off-season discount. Stock heavily for seasonal rebound."
+        else:
+            return f"{_BUY_PREFIX}BUY MODERATE: Off-season opportunity. Build inventory gradually."
             
-        else:  # stable
-            return "📊 MONITOR: No strong seasonal pattern. Focus on other opportunities."
-    
-    except UnicodeEncodeError:
-        # Fallback without emojis
-        if seasonal_pattern == 'off_season':
-            if seasonal_index < 0.7:
-                return "BUY AGGRESSIVE: Deep off-season discount. Stock heavily for seasonal rebound."
-            else:
-                return "BUY MODERATE: Off-season opportunity. Build inventory gradually."
-                
-        elif seasonal_pattern == 'peak_season':
-            if seasonal_index > 1.3:
-                return "SELL AGGRESSIVE: Peak pricing. Liquidate inventory at premium."
-            else:
-                return "SELL MODERATE: Good seasonal pricing. Move inventory steadily."
-                
-        elif seasonal_pattern == 'transitioning':
-            return "TIMING CRITICAL: Trend changing. Act quickly in current direction."
+    elif seasonal_pattern == 'peak_season':
+        if seasonal_index > 1.3:
+            return f"{_SELL_PREFIX}SELL AGGRESSIVE: Peak pricing. Liquidate inventory at premium."
+        else:
+            return f"{_SELL_PREFIX}SELL MODERATE: Good seasonal pricing. Move inventory steadily."
             
-        else:  # stable
-            return "MONITOR: No strong seasonal pattern. Focus on other opportunities."
\ No newline at end of file
+    elif seasonal_pattern == 'transitioning':
+        return f"{_TIMING_PREFIX}TIMING CRITICAL: Trend changing. Act quickly in current direction."
+        
+    else:  # stable
+        return f"{_MONITOR_PREFIX}MONITOR: No strong seasonal pattern. Focus on other opportunities."
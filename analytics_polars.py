@@ -0,0 +1,298 @@
+"""
+Analytics Polars - Historic Deals e stagionalità su Polars (opzionale)
+
+Stessa logica di analytics.find_historic_deals e analytics.analyze_seasonal_opportunities
+espressa come query lazy Polars:
+le espressioni girano multi-thread sulle colonne e le maschere intermedie non
+vengono materializzate. Senza polars installato si usa la versione pandas.
+"""
+
+from typing import Dict, Union
+import numpy as np
+import pandas as pd
+
+from analytics import DEAL_COLUMNS, HISTORIC_OPPORTUNITY_WEIGHTS, find_historic_deals
+from analytics import SEASONAL_PATTERNS, analyze_seasonal_opportunities, _seasonal_recommendations
+
+# Polars opzionale
+try:
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
+
+
+def _column(names: set, field: str, missing: float = None) -> 'pl.Expr':
+    """
+    Colonna Keepa del campo DealColumns `field` come Float64 (NaN -> null)
+
+    Args:
+        names: Colonne presenti nel frame
+        field: Nome del campo in DEAL_COLUMNS
+        missing: Valore costante se la colonna non esiste (default null)
+
+    Returns:
+        pl.Expr: Espressione numerica
+    """
+    return _numeric(names, DEAL_COLUMNS[field], missing)
+
+
+def _numeric(names: set, column: str, missing: float = None) -> 'pl.Expr':
+    """
+    Colonna Keepa `column` come Float64 (NaN -> null, costante `missing` se assente)
+    """
+    if column not in names:
+        return pl.lit(missing, dtype=pl.Float64)
+    return pl.col(column).cast(pl.Float64, strict=False).fill_nan(None)
+
+
+def _metrics_exprs(names: set) -> Dict[str, 'pl.Expr']:
+    """
+    Metriche storiche (stessa catena di fallback di calculate_historic_metrics_vec)
+    """
+    raw_current = _column(names, 'current')
+    current = pl.when(raw_current.is_null() | (raw_current <= 0)).then(0.0).otherwise(raw_current)
+
+    metrics = {'current': current}
+    for key in ('avg_30d', 'avg_90d', 'avg_180d', 'lowest', 'highest'):
+        values = _column(names, key)
+        metrics[key] = pl.when(values.is_null() | (values <= 0)).then(current).otherwise(values)
+    for key in ('30d', '90d', '180d'):
+        average = metrics[f'avg_{key}']
+        metrics[f'dev_{key}'] = pl.when(average > 0).then((current - average) / average).otherwise(0.0)
+    return metrics
+
+
+def _velocity_expr(names: set) -> 'pl.Expr':
+    """
+    velocity_index come espressione Polars
+    """
+    sales_rank = _column(names, 'sales_rank', missing=999999).fill_null(0.0)
+    rating = _column(names, 'rating').fill_null(0.0)
+    bought_month = _column(names, 'bought_month').fill_null(0.0)
+
+    log_rank = pl.when(sales_rank > 0).then(sales_rank).otherwise(1.0).log10()
+    rank_score = (
+        pl.when(sales_rank <= 0).then(0.0)
+        .when(sales_rank >= 500000).then(10.0)
+        .otherwise(pl.max_horizontal(pl.lit(10.0), 100 - log_rank * 15))
+    )
+    rating_bonus = pl.when(rating > 3.0).then((rating - 3.0) * 10).otherwise(0.0)
+    sales_bonus = pl.when(bought_month > 0).then(pl.min_horizontal(pl.lit(20.0), bought_month * 0.5)).otherwise(0.0)
+
+    return (rank_score + rating_bonus + sales_bonus).clip(0.0, 100.0)
+
+
+def _competition_expr(names: set) -> 'pl.Expr':
+    """
+    competition_index come espressione Polars
+    """
+    amazon_pct = _column(names, 'amazon_share_90d', missing=50).fill_null(0.0)
+    winner_count = _column(names, 'winner_count', missing=5).fill_null(0.0)
+    oos_pct = _column(names, 'buybox_oos_90d').fill_null(0.0)
+
+    amazon_penalty = pl.when(amazon_pct > 70).then(-30.0).when(amazon_pct > 50).then(-15.0).otherwise(0.0)
+    winner_penalty = pl.when(winner_count > 10).then(-20.0).when(winner_count > 5).then(-10.0).otherwise(0.0)
+    oos_bonus = pl.when(oos_pct > 10).then(pl.min_horizontal(pl.lit(15.0), (oos_pct - 10) * 0.5)).otherwise(0.0)
+
+    return (50.0 + amazon_penalty + winner_penalty + oos_bonus).clip(0.0, 100.0)
+
+
+def _momentum_expr(metrics: Dict[str, 'pl.Expr']) -> 'pl.Expr':
+    """
+    momentum_index come espressione Polars (Float32, 0 se prezzo corrente non valido)
+    """
+    current, lowest, highest = metrics['current'], metrics['lowest'], metrics['highest']
+    dev_30d, dev_90d = metrics['dev_30d'], metrics['dev_90d']
+
+    volatility = pl.when((highest > 0) & (lowest > 0)).then((highest - lowest) / highest).otherwise(0.0)
+    score = (
+        50.0 +
+        20.0 * ((lowest > 0) & (current <= lowest * 1.1)).cast(pl.Float64) +
+        15.0 * (dev_30d > dev_90d).cast(pl.Float64) -
+        10.0 * (volatility > 0.5).cast(pl.Float64) +
+        5.0 * (dev_90d < -0.15).cast(pl.Float64) + 5.0 * (dev_90d < -0.20).cast(pl.Float64)
+    )
+    return pl.when(current > 0).then(score.clip(0.0, 100.0)).otherwise(0.0).cast(pl.Float32)
+
+
+def _risk_expr(names: set) -> 'pl.Expr':
+    """
+    risk_index come espressione Polars (Float32)
+    """
+    return_rate = _column(names, 'return_rate').fill_null(0.0)
+    rating = _column(names, 'rating').fill_null(4.0)
+    fba_fee = _column(names, 'fba_fee').fill_null(2.0)
+    review_count = _column(names, 'review_count').fill_null(0.0)
+    if 'Brand' in names:
+        brand = pl.col('Brand').cast(pl.String).fill_null('')
+        unknown_brand = (brand == '') | brand.str.to_lowercase().is_in(['unknown', 'generic'])
+    else:
+        unknown_brand = pl.lit(True)
+
+    score = (
+        70.0 -
+        10.0 * (return_rate > 10).cast(pl.Float64) - 10.0 * (return_rate > 15).cast(pl.Float64) -
+        5.0 * (rating < 4.0).cast(pl.Float64) - 10.0 * (rating < 3.5).cast(pl.Float64) -
+        5.0 * (fba_fee > 3.5).cast(pl.Float64) - 5.0 * (fba_fee > 5.0).cast(pl.Float64) +
+        5.0 * (review_count > 100).cast(pl.Float64) + 5.0 * (review_count > 1000).cast(pl.Float64) -
+        8.0 * unknown_brand.cast(pl.Float64)
+    )
+    return score.clip(0.0, 100.0).cast(pl.Float32)
+
+
+def find_historic_deals_pl(df: Union['pl.DataFrame', pd.DataFrame],
+                           params: Dict[str, float] = None) -> Union['pl.DataFrame', pd.DataFrame]:
+    """
+    Trova gli affari storici con una query lazy Polars
+
+    Args:
+        df: DataFrame Polars (o pandas, convertito)
+        params: Parametri per i criteri di selezione
+
+    Returns:
+        DataFrame Polars con le stesse colonne aggiunte da find_historic_deals,
+        ordinato per opportunity score (DataFrame pandas se polars non è installato)
+    """
+    if not HAS_POLARS:
+        return find_historic_deals(df, params)
+
+    if params is None:
+        params = {'dev_90d': -0.10, 'velocity_min': 40}
+    if isinstance(df, pd.DataFrame):
+        df = pl.from_pandas(df)
+    if df.is_empty():
+        return pl.DataFrame()
+
+    names = set(df.columns)
+    metrics = _metrics_exprs(names)
+    velocity = _velocity_expr(names)
+
+    deal_mask = (
+        (metrics['dev_90d'] <= params['dev_90d']) &
+        (velocity >= params['velocity_min']) &
+        (_column(names, 'amazon_share_90d').fill_null(100.0) <= 80) &
+        (_column(names, 'buybox_oos_90d').fill_null(0.0) <= 30) &
+        (metrics['current'] > 0)
+    )
+
+    query = df.lazy().filter(deal_mask).with_columns(
+        pl.lit(True).alias('is_historic_deal'),
+        _momentum_expr(metrics).alias('momentum_score'),
+        _risk_expr(names).alias('risk_score'),
+        metrics['dev_90d'].alias('price_deviation_90d'),
+        metrics['current'].alias('_current'),
+        metrics['avg_90d'].alias('_avg_90d')
+    )
+
+    if 'opportunity_score' not in names:
+        velocity_weight, momentum_weight, risk_weight, competition_weight = HISTORIC_OPPORTUNITY_WEIGHTS
+        query = query.with_columns(
+            velocity.alias('velocity_score'),
+            _competition_expr(names).alias('competition_score'),
+            pl.lit(60, dtype=pl.Int64).alias('estimated_profit_score')
+        ).with_columns(
+            (pl.col('velocity_score') * velocity_weight +
+             pl.col('momentum_score').cast(pl.Float64) * momentum_weight +
+             pl.col('risk_score').cast(pl.Float64) * risk_weight +
+             pl.col('competition_score') * competition_weight).alias('opportunity_score')
+        )
+
+    deals = query.collect(engine='streaming')
+
+    # Testo "corrente vs media" solo sulle righe selezionate (formattazione %.2f come la versione pandas)
+    current = deals['_current'].to_numpy()
+    avg_90d = deals['_avg_90d'].to_numpy()
+    price_text = np.char.add(np.char.mod('%.2f vs ', current), np.char.mod('%.2f', avg_90d))
+    current_vs_avg = pl.Series('current_vs_avg_90d', np.where(avg_90d > 0, price_text, 'N/A').tolist(),
+                               dtype=pl.String)
+
+    deals = deals.drop('_current', '_avg_90d')
+    deals = deals.insert_column(deals.columns.index('price_deviation_90d') + 1, current_vs_avg)
+    return deals.sort('opportunity_score', descending=True)
+
+
+def analyze_seasonal_opportunities_pl(df: Union['pl.DataFrame', pd.DataFrame]) -> Union['pl.DataFrame', pd.DataFrame]:
+    """
+    Analizza le opportunità stagionali con una query lazy Polars
+
+    Args:
+        df: DataFrame Polars (o pandas, convertito)
+
+    Returns:
+        DataFrame Polars con le stesse colonne di analyze_seasonal_opportunities, ordinato per
+        seasonal opportunity score (DataFrame pandas se polars non è installato)
+    """
+    if not HAS_POLARS:
+        return analyze_seasonal_opportunities(df)
+
+    if isinstance(df, pd.DataFrame):
+        df = pl.from_pandas(df)
+    if df.is_empty():
+        return pl.DataFrame()
+
+    names = set(df.columns)
+
+    # NaN, null o <= 0 -> 0; senza media annuale gli indici restano 1.0 (pattern stable)
+    avg_30d, avg_90d, avg_365d = (
+        pl.when(values > 0).then(values).otherwise(0.0)
+        for values in (_numeric(names, column) for column in (
+            'Buy Box 🚚: 30 days avg.', 'Buy Box 🚚: 90 days avg.', 'Buy Box 🚚: 365 days avg.'
+        ))
+    )
+    current_vs_year = pl.when(avg_365d > 0).then(avg_30d / avg_365d).otherwise(1.0)
+    quarter_vs_year = pl.when(avg_365d > 0).then(avg_90d / avg_365d).otherwise(1.0)
+
+    cvy, qvy, code = pl.col('seasonal_index'), pl.col('_quarter_index'), pl.col('_pattern_code')
+    pattern_code = (
+        pl.when(cvy >= 1.20).then(1)
+        .when(cvy <= 0.80).then(2)
+        .when((cvy - qvy).abs() > 0.15).then(3)
+        .otherwise(0)
+        .cast(pl.Int8)
+    )
+    base_score = pl.when(code == 1).then(70.0).when(code == 2).then(80.0).otherwise(60.0)
+
+    def original(column: str, default) -> 'pl.Expr':
+        """Valori originali della colonna (default se assente)"""
+        return pl.col(column) if column in names else pl.lit(default)
+
+    deals = (
+        df.lazy()
+        .select(
+            original('ASIN', '').alias('asin'),
+            original('Title', '').alias('title'),
+            current_vs_year.alias('seasonal_index'),
+            quarter_vs_year.alias('_quarter_index'),
+            original('Buy Box 🚚: Current', 0).alias('current_price'),
+            original('Sales Rank: Current', 999999).alias('sales_rank'),
+            original('Reviews: Rating', 0).alias('rating')
+        )
+        .with_columns(pattern_code.alias('_pattern_code'))
+        .filter(code != 0)
+        .with_columns((cvy - 1.0).abs().alias('trend_strength'))
+        .with_columns(
+            pl.min_horizontal(
+                pl.lit(100.0), base_score + pl.min_horizontal(pl.lit(30.0), pl.col('trend_strength') * 100)
+            ).alias('seasonal_opportunity_score')
+        )
+        .collect(engine='streaming')
+    )
+
+    # Testi di raccomandazione solo sulle righe selezionate (stessa formattazione della versione pandas)
+    pattern_codes = deals['_pattern_code'].to_numpy()
+    recommendations = _seasonal_recommendations(
+        pattern_codes, deals['seasonal_index'].to_numpy(), deals['_quarter_index'].to_numpy()
+    )
+
+    deals = deals.with_columns(
+        pl.Series('seasonal_pattern', SEASONAL_PATTERNS[pattern_codes].tolist(),
+                  dtype=pl.Enum(SEASONAL_PATTERNS.tolist())),
+        pl.Series('recommendation', recommendations.tolist(), dtype=pl.String),
+        pl.lit('good', dtype=pl.Enum(['good', 'poor', 'error'])).alias('data_quality')
+    )
+    deals = deals.select(
+        'asin', 'title', 'seasonal_pattern', 'seasonal_index', 'trend_strength', 'seasonal_opportunity_score',
+        'recommendation', 'current_price', 'sales_rank', 'rating', 'data_quality'
+    )
+    return deals.sort('seasonal_opportunity_score', descending=True)
@@ -8,26 +8,35 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 import io
+import hashlib
+import heapq
+import os
+import sys
 import json
 from datetime import datetime
 import concurrent.futures
+import itertools
+from functools import lru_cache
 
 # Import our modules
 from profit_model import (
     find_best_routes, 
     analyze_route_profitability, 
     create_default_params,
-    compute_route_metrics
+    compute_route_metrics,
+    process_asin_batch
 )
 from config import SCORING_WEIGHTS, VAT_RATES, DEFAULT_DISCOUNT, PURCHASE_STRATEGIES, DEBUG_MODE, SHOW_PROGRESS
 from analytics import (
     calculate_historic_metrics,
     is_historic_deal,
+    is_historic_deal_vec,
     momentum_index,
     risk_index,
     get_deal_quality_score,
+    calculate_deal_scores_vec,
     find_historic_deals
 )
 from export import (
@@ -195,81 +204,137 @@ def prepare_card_data(routes_df):
     
     return processed
 
+def uploaded_files_signature(uploaded_files) -> tuple:
+    """Hashable cache key for Streamlit uploads: (name, size, md5 of contents) per file"""
+    return tuple((f.name, f.size, hashlib.md5(f.getvalue()).hexdigest()) for f in uploaded_files)
+
+@st.cache_data(show_spinner="Loading data...", max_entries=4)
+def load_data_cached(file_signature: tuple, _uploaded_files) -> pd.DataFrame:
+    """
+    load_data cached on the upload signature, so widget reruns skip parsing
+    
+    _uploaded_files is excluded from hashing (leading underscore); file_signature identifies it.
+    """
+    from loaders import load_data
+    return load_data(_uploaded_files)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def dataset_stats(file_signature: tuple, _df: pd.DataFrame) -> Dict[str, Any]:
+    """Row count, unique ASINs and markets of the loaded dataset, computed once per upload"""
+    return {
+        'rows': len(_df),
+        'asins': _df['ASIN'].nunique(),
+        'markets': list(_df['source_market'].unique())
+    }
+
+def params_cache_key(params: Dict[str, Any]) -> tuple:
+    """Hashable, order-independent cache key for a params dict (nested dicts included)"""
+    return tuple(sorted(
+        (key, params_cache_key(value) if isinstance(value, dict) else value)
+        for key, value in params.items()
+    ))
+
+# Analysis results cached on (upload signature, params key): the DataFrame and params
+# themselves are underscore args, so Streamlit doesn't hash them on every rerun
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def find_best_routes_cached(data_key: tuple, params_key: tuple, _df: pd.DataFrame, _params: Dict[str, Any], parallel: bool = False) -> pd.DataFrame:
+    """find_best_routes (or process_asins_parallel) cached across reruns"""
+    if parallel:
+        return process_asins_parallel(_df, _params)
+    return find_best_routes(_df, _params)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def analyze_route_profitability_cached(data_key: tuple, params_key: tuple, _df: pd.DataFrame, _params: Dict[str, Any]) -> Dict[str, Any]:
+    """analyze_route_profitability cached across reruns"""
+    return analyze_route_profitability(_df, _params)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def find_historic_deals_cached(data_key: tuple, _df: pd.DataFrame) -> pd.DataFrame:
+    """find_historic_deals cached across reruns (depends on the data only)"""
+    return find_historic_deals(_df)
+
 # Parallel processing functions
-def process_asin_batch(asin_batch: list, full_df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
+def create_batch_executor(max_workers: int) -> concurrent.futures.Executor:
     """
-    Process a batch of ASINs for cross-market arbitrage
+    Executor for CPU-bound route batches
     
-    Args:
-        asin_batch: List of ASINs to process
-        full_df: Complete DataFrame with all markets (needed for cross-market comparison)
-        params: Processing parameters
-        
-    Returns:
-        DataFrame with best routes for this ASIN batch
+    Route finding is pure Python/pandas work, so threads serialize on the GIL:
+    use worker processes, except on free-threaded builds where threads run in parallel.
     """
-    try:
-        if not asin_batch:
-            return pd.DataFrame()
-        
-        # Filter to only include products in this ASIN batch
-        batch_df = full_df[full_df['ASIN'].isin(asin_batch)].copy()
-        
-        if batch_df.empty:
-            return pd.DataFrame()
-        
-        # Use internal find_best_routes function to maintain cross-market logic
-        from profit_model import find_best_routes_internal
-        routes_df = find_best_routes_internal(batch_df, params)
-        
-        return routes_df
-        
-    except Exception as e:
-        # Return empty DataFrame on error
-        return pd.DataFrame()
+    gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    if gil_enabled:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    return concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+# Up to this many ASINs the pool start-up and pickling cost more than processing serially
+SERIAL_MAX_ASINS = 100
+
+def batch_plan(n_asins: int) -> Tuple[int, int]:
+    """
+    Worker count and batch size for n_asins
+    
+    Workers scale with the input (about one per 32 ASINs) up to the CPU count, and
+    batches aim for ~4 tasks per worker so uneven batches don't leave workers idle.
+    """
+    nproc = os.cpu_count() or 4
+    workers = min(nproc, max(2, n_asins // 32))
+    batch_size = max(8, n_asins // (workers * 4))
+    return workers, batch_size
 
-def process_asins_parallel(df: pd.DataFrame, params: Dict[str, Any], batch_size: int = 50) -> pd.DataFrame:
+def process_asins_parallel(df: pd.DataFrame, params: Dict[str, Any], batch_size: Optional[int] = None) -> pd.DataFrame:
     """
     Process ASINs in parallel batches while maintaining cross-market visibility
     
     Args:
         df: Complete DataFrame with all markets
         params: Processing parameters
-        batch_size: Number of ASINs per batch
+        batch_size: Number of ASINs per batch (None: sized from the ASIN and CPU count)
         
     Returns:
         DataFrame with all best routes
     """
-    unique_asins = df['ASIN'].unique()
+    # Row positions of every ASIN (all markets), computed once instead of an isin scan per batch
+    asin_rows = df.groupby('ASIN', sort=False).indices
+    unique_asins = list(asin_rows)
+    
+    # Small inputs: a single serial batch
+    if len(unique_asins) <= SERIAL_MAX_ASINS:
+        routes = process_asin_batch(df, params)
+        return routes.sort_values('opportunity_score', ascending=False) if not routes.empty else pd.DataFrame()
+    
+    max_workers, auto_batch_size = batch_plan(len(unique_asins))
+    batch_size = batch_size or auto_batch_size
     
     # Split ASINs into batches
     asin_batches = [unique_asins[i:i + batch_size] for i in range(0, len(unique_asins), batch_size)]
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-        # Submit tasks for each ASIN batch
-        futures = [
-            executor.submit(process_asin_batch, batch, df, params)
-            for batch in asin_batches
-        ]
-        
-        # Collect results as they complete
-        all_routes = []
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                batch_routes = future.result()
-                if not batch_routes.empty:
-                    all_routes.append(batch_routes)
-            except Exception as e:
-                # Skip failed batches
-                continue
+    # Only the batch rows (all markets) are sent to each worker
+    batch_frames = (
+        df.take(np.sort(np.concatenate([asin_rows[asin] for asin in batch])))
+        for batch in asin_batches
+    )
+    
+    with create_batch_executor(max_workers=max_workers) as executor:
+        # Results stream back in submission order; process_asin_batch already turns failures into empty frames
+        batch_results = list(executor.map(process_asin_batch, batch_frames, itertools.repeat(params)))
     
-    # Combine all routes
+    # Combine all routes (stable sort keeps submission order among equal scores)
+    all_routes = [batch_routes for batch_routes in batch_results if not batch_routes.empty]
     if all_routes:
         combined_routes = pd.concat(all_routes, ignore_index=True)
-        return combined_routes.sort_values('opportunity_score', ascending=False)
+        return combined_routes.sort_values('opportunity_score', ascending=False, kind='stable')
     else:
         return pd.DataFrame()
 
+# Killer metrics flags (in display order) and their descriptions
+KILLER_METRIC_LABELS = {
+    'price_low_30d': '🔥 Prezzo al minimo 30gg',
+    'ranking_improving': '📈 Ranking migliorando',
+    'amazon_oos': '⚡ Amazon OOS 70%+',
+    'few_competitors': '💎 Pochi competitor'
+}
+
 def calculate_killer_metrics(deal_row):
     """
     Calculate killer metrics for historic deals
@@ -290,29 +355,163 @@ def calculate_killer_metrics(deal_row):
     min_30d = deal_row.get('Buy Box 🚚: 30 days min.', current_price)
     if current_price > 0 and min_30d > 0 and current_price <= min_30d * 1.02:  # Within 2% of 30d min
         metrics['price_low_30d'] = True
-        metrics['descriptions'].append('🔥 Prezzo al minimo 30gg')
     
     # 📈 Ranking in miglioramento
     current_rank = deal_row.get('Sales Rank: Current', 999999)
     avg_rank_30d = deal_row.get('Sales Rank: 30 days avg.', current_rank)
     if current_rank > 0 and avg_rank_30d > 0 and current_rank < avg_rank_30d * 0.8:  # 20% better
         metrics['ranking_improving'] = True
-        metrics['descriptions'].append('📈 Ranking migliorando')
     
     # ⚡ Amazon OOS > 70%
     amazon_oos = deal_row.get('Amazon: 90 days OOS', 0)
     if amazon_oos > 70:
         metrics['amazon_oos'] = True
-        metrics['descriptions'].append('⚡ Amazon OOS 70%+')
     
     # 💎 Pochi competitor (<5)
     total_offers = deal_row.get('Total Offer Count', 10)
     if total_offers < 5:
         metrics['few_competitors'] = True
-        metrics['descriptions'].append('💎 Pochi competitor')
     
+    metrics['descriptions'] = [label for key, label in KILLER_METRIC_LABELS.items() if metrics[key]]
     return metrics
 
+def numeric_column(df: pd.DataFrame, column: str, default: float) -> np.ndarray:
+    """Column as float64 array (NaN for non-numeric values), constant default if the column is missing"""
+    if column not in df.columns:
+        return np.full(len(df), default, dtype=np.float64)
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+def calculate_killer_metrics_vec(deals_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorized calculate_killer_metrics over a whole DataFrame
+    
+    Returns:
+        DataFrame with one boolean column per killer metric (same index as deals_df);
+        descriptions are built only for displayed rows via killer_metrics_display
+    """
+    # NaN comparisons are False, as in the per-row version
+    current_price = numeric_column(deals_df, 'Buy Box 🚚: Current', 0)
+    min_30d = numeric_column(deals_df, 'Buy Box 🚚: 30 days min.', np.nan)
+    if 'Buy Box 🚚: 30 days min.' not in deals_df.columns:
+        min_30d = current_price
+    
+    current_rank = numeric_column(deals_df, 'Sales Rank: Current', 999999)
+    avg_rank_30d = numeric_column(deals_df, 'Sales Rank: 30 days avg.', np.nan)
+    if 'Sales Rank: 30 days avg.' not in deals_df.columns:
+        avg_rank_30d = current_rank
+    
+    return pd.DataFrame({
+        'price_low_30d': (current_price > 0) & (min_30d > 0) & (current_price <= min_30d * 1.02),
+        'ranking_improving': (current_rank > 0) & (avg_rank_30d > 0) & (current_rank < avg_rank_30d * 0.8),
+        'amazon_oos': numeric_column(deals_df, 'Amazon: 90 days OOS', 0) > 70,
+        'few_competitors': numeric_column(deals_df, 'Total Offer Count', 10) < 5
+    }, index=deals_df.index)
+
+def killer_metrics_display(killer_flags: pd.DataFrame) -> pd.Series:
+    """Space-joined killer metric descriptions per row ('-' when none fires), built column-wise"""
+    joined = pd.Series('', index=killer_flags.index, dtype=object)
+    for key, label in KILLER_METRIC_LABELS.items():
+        joined = joined + np.where(killer_flags[key].to_numpy(), label + ' ', '')
+    joined = joined.str.rstrip()
+    return joined.where(joined != '', '-')
+
+def build_enhanced_deals(historic_deals_df: pd.DataFrame, best_routes: pd.DataFrame, preset_filter: str) -> list:
+    """
+    Join historic deals with their best route and apply the sidebar preset
+    
+    One hash join on ASIN instead of a best_routes scan per deal; same-country and
+    non-positive ROI routes are dropped and presets are applied as boolean masks.
+    
+    Returns:
+        list: Enhanced deal dicts (unsorted), 'deal_pos' is the deal's row position in historic_deals_df
+    """
+    deal_asins = historic_deals_df['ASIN'] if 'ASIN' in historic_deals_df.columns else historic_deals_df.get('asin')
+    if deal_asins is None or best_routes.empty:
+        return []
+    
+    # First route per ASIN, as the previous .iloc[0] lookup; inner merge keeps the deal order
+    merged = pd.DataFrame({
+        'asin': deal_asins.to_numpy(),
+        'deal_pos': np.arange(len(historic_deals_df))
+    }).merge(best_routes.drop_duplicates('asin'), on='asin', how='inner', sort=False)
+    
+    def merged_column(column, default):
+        if column in merged.columns:
+            return merged[column]
+        return pd.Series([default] * len(merged), index=merged.index, dtype=object)
+    
+    # Skip same-country routes and non-positive ROI
+    source = merged_column('source', '')
+    target = merged_column('target', '')
+    valid = pd.Series(~same_market_mask(source, target), index=merged.index) & (merged_column('roi', 0) > 0)
+    
+    # Sidebar presets on the route margin, same thresholds as apply_preset_filter
+    margin_pct = numeric_column(merged, 'gross_margin_pct', 0)
+    score = numeric_column(merged, 'opportunity_score', 0)
+    if preset_filter == "🔥 Hot Deals":
+        valid &= margin_pct > 25
+    elif preset_filter == "👍 Safe Bets":
+        valid &= margin_pct > 20
+    elif preset_filter == "🎲 High Risk/Reward":
+        valid &= margin_pct > 30
+    elif preset_filter == "💎 Hidden Gems":
+        valid &= (score > 75) & (margin_pct > 15)
+        if valid.any():
+            # Killer metric counts only for the deals still in the running
+            candidate_pos = merged.loc[valid, 'deal_pos'].to_numpy()
+            killer_counts = calculate_killer_metrics_vec(historic_deals_df.iloc[candidate_pos]).sum(axis=1).to_numpy()
+            valid[valid] = killer_counts >= 2
+    
+    selected = merged[valid.to_numpy(dtype=bool)]
+    if selected.empty:
+        return []
+    
+    def selected_values(column, default):
+        if column in selected.columns:
+            return selected[column].tolist()
+        return [default] * len(selected)
+    
+    deal_pos = selected['deal_pos'].to_numpy()
+    titles = (historic_deals_df['Title'].iloc[deal_pos].tolist() if 'Title' in historic_deals_df.columns
+              else [''] * len(selected))
+    sources = selected_values('source', '')
+    targets = selected_values('target', '')
+    
+    # IMPORTANTE: profit_model.py mette il profitto REALE in 'gross_margin_eur'!
+    return [
+        {
+            'asin': asin,
+            'title': title,
+            'route': route,
+            'buy_price': buy_price,
+            'net_cost': net_cost,
+            'sell_price': sell_price,
+            'profit_eur': real_profit,  # USA GROSS_MARGIN_EUR (profitto reale)
+            'roi_pct': real_roi,        # ROI calcolato correttamente
+            'score': deal_score,
+            # Corrected field mapping
+            'source': source_market,
+            'target': target_market,
+            # Legacy support
+            'source_market': source_market,
+            'target_market': target_market,
+            'deal_pos': pos,
+            # Store cost breakdown for debugging
+            'cost_breakdown': cost_breakdown,
+            'total_cost': total_cost,
+            # Keep net_profit for comparison
+            '_net_profit_field': net_profit
+        }
+        for asin, title, route, buy_price, net_cost, sell_price, real_profit, real_roi, deal_score,
+            source_market, target_market, pos, cost_breakdown, total_cost, net_profit in zip(
+            selected['asin'].tolist(), titles, selected_values('route', ''),
+            selected_values('purchase_price', 0), selected_values('net_cost', 0), selected_values('target_price', 0),
+            selected_values('gross_margin_eur', 0), selected_values('roi', 0), selected_values('opportunity_score', 0),
+            sources, targets, deal_pos.tolist(), selected_values('cost_breakdown', {}),
+            selected_values('total_cost', 0), selected_values('net_profit', 0)
+        )
+    ]
+
 def get_deal_risk_alert(deal_row):
     """
     Generate risk alert for a deal
@@ -348,6 +547,26 @@ def get_deal_risk_alert(deal_row):
     else:
         return "Low"
 
+def get_deal_risk_alert_vec(deals_df: pd.DataFrame) -> pd.Series:
+    """
+    Vectorized get_deal_risk_alert over a whole DataFrame
+    
+    Returns:
+        pd.Series: Risk level per row (Low, Medium, High), same index as deals_df
+    """
+    return_rate = numeric_column(deals_df, 'Return Rate', 0)
+    rating = numeric_column(deals_df, 'Reviews: Rating', 5.0)
+    amazon_dominance = numeric_column(deals_df, 'Buy Box: % Amazon 90 days', 0)
+    
+    # Same weights as the per-row version: NaN values never add risk
+    risk_score = (
+        np.where(return_rate > 15, 2, (return_rate > 8).astype(np.int8))
+        + np.where(rating < 3.5, 2, (rating < 4.0).astype(np.int8))
+        + (amazon_dominance > 80)
+    )
+    return pd.Series(np.select([risk_score >= 3, risk_score >= 1], ['High', 'Medium'], default='Low'),
+                     index=deals_df.index, dtype=object)
+
 def get_roi_indicator(roi):
     """Get emoji indicator for ROI"""
     if roi > 35:
@@ -357,6 +576,11 @@ def get_roi_indicator(roi):
     else:
         return "🔴"
 
+def get_roi_indicator_series(roi: pd.Series) -> pd.Series:
+    """Vectorized get_roi_indicator: (-inf, 25] red, (25, 35] yellow, above 35 green"""
+    indicators = pd.cut(roi, bins=[-np.inf, 25, 35, np.inf], labels=['🔴', '🟡', '🟢'])
+    return indicators.astype(object).fillna('🔴')
+
 def get_score_stars(score):
     """Convert numeric score to star rating"""
     if score >= 90:
@@ -370,96 +594,75 @@ def get_score_stars(score):
     else:
         return "⭐"
 
+def get_score_stars_series(score: pd.Series) -> pd.Series:
+    """Vectorized get_score_stars over [60, 70, 80, 90) score bins"""
+    stars = pd.cut(score, bins=[-np.inf, 60, 70, 80, 90, np.inf], right=False,
+                   labels=['⭐', '⭐⭐', '⭐⭐⭐', '⭐⭐⭐⭐', '⭐⭐⭐⭐⭐'])
+    return stars.astype(object).fillna('⭐')
+
+# Emoji lookups for risk levels and source/target markets
+RISK_EMOJIS = {
+    "Low": "🛡️",
+    "Medium": "⚠️", 
+    "High": "🚨"
+}
+
+COUNTRY_FLAGS = {
+    'it': '🇮🇹',
+    'de': '🇩🇪', 
+    'fr': '🇫🇷',
+    'es': '🇪🇸'
+}
+
 def get_risk_emoji(risk_level):
     """Get emoji for risk level"""
-    risk_map = {
-        "Low": "🛡️",
-        "Medium": "⚠️", 
-        "High": "🚨"
-    }
-    return risk_map.get(risk_level, "❓")
+    return RISK_EMOJIS.get(risk_level, "❓")
 
 def get_country_flag(country_code):
     """Get flag emoji for country"""
-    flag_map = {
-        'it': '🇮🇹',
-        'de': '🇩🇪', 
-        'fr': '🇫🇷',
-        'es': '🇪🇸'
-    }
-    return flag_map.get(country_code.lower(), '🏳️')
+    return COUNTRY_FLAGS.get(country_code.lower(), '🏳️')
 
+@lru_cache(maxsize=64)
 def create_route_display(source, target):
-    """Create visual route with flags"""
+    """Create visual route with flags (memoized: only a handful of market pairs exist)"""
     source_flag = get_country_flag(source)
     target_flag = get_country_flag(target)
     return f"{source_flag}{source.upper()}→{target_flag}{target.upper()}"
 
-def add_custom_css():
-    """Add custom CSS for enhanced UI"""
-    st.markdown("""
-    <style>
-    .big-roi {
-        font-size: 2.5em;
-        font-weight: bold;
-        color: #2E8B57;
-        text-align: center;
-    }
-    
-    .quick-win-card {
-        border: 2px solid #E8E8E8;
-        border-radius: 10px;
-        padding: 15px;
-        margin: 10px 0;
-        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-    }
-    
-    .metric-container {
-        background-color: #f0f2f6;
-        border-radius: 10px;
-        padding: 20px;
-        text-align: center;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    
-    .tooltip {
-        position: relative;
-        display: inline-block;
-        border-bottom: 1px dotted black;
-    }
-    
-    .tooltip .tooltiptext {
-        visibility: hidden;
-        width: 200px;
-        background-color: #555;
-        color: white;
-        text-align: center;
-        border-radius: 6px;
-        padding: 5px;
-        position: absolute;
-        z-index: 1;
-        bottom: 125%;
-        left: 50%;
-        margin-left: -100px;
-        opacity: 0;
-        transition: opacity 0.3s;
-    }
-    
-    .tooltip:hover .tooltiptext {
-        visibility: visible;
-        opacity: 1;
-    }
-    
-    .high-roi { background-color: rgba(144, 238, 144, 0.3) !important; }
-    .medium-roi { background-color: rgba(255, 255, 224, 0.3) !important; }
-    .low-roi { background-color: rgba(255, 182, 193, 0.3) !important; }
-    </style>
-    """, unsafe_allow_html=True)
+def route_labels(source: pd.Series, target: pd.Series, sep: str = '->') -> pd.Series:
+    """Upper-cased 'SOURCE{sep}TARGET' labels, formatted once per distinct market pair (NaN if either is missing)"""
+    source_codes, source_markets = pd.factorize(source)
+    target_codes, target_markets = pd.factorize(target)
+    # One label per (source, target) code pair, plus a trailing NaN slot for missing markets
+    labels = np.array([f"{src.upper()}{sep}{tgt.upper()}" for src in source_markets for tgt in target_markets] + [np.nan], dtype=object)
+    pair_codes = np.where((source_codes < 0) | (target_codes < 0), len(labels) - 1,
+                          source_codes * len(target_markets) + target_codes)
+    return pd.Series(labels[pair_codes], index=source.index)
 
-def load_apple_style_css():
-    """Load Apple-style dark theme with pure black and red accents"""
-    
-    css = """
+def same_market_mask(source: pd.Series, target: pd.Series) -> np.ndarray:
+    """Case-insensitive source == target per row, compared on shared integer market codes (missing markets never match)"""
+    codes, markets = pd.factorize(pd.concat([source, target], ignore_index=True))
+    # Lower-case each distinct market once and re-code, so 'IT' and 'it' share a code
+    canonical_codes = np.append(pd.factorize(pd.Index(markets).astype(str).str.lower())[0], -1)
+    codes = canonical_codes[codes]
+    source_codes, target_codes = codes[:len(source)], codes[len(source):]
+    return (source_codes == target_codes) & (source_codes >= 0)
+
+def market_isin(markets: pd.Series, countries) -> np.ndarray:
+    """Upper-cased market code membership in countries, checked once per distinct market"""
+    codes, uniques = pd.factorize(markets)
+    allowed = np.append(pd.Index(uniques).str.upper().isin(countries), False)  # trailing slot: missing market
+    return allowed[codes]
+
+def create_route_display_series(source: pd.Series, target: pd.Series) -> pd.Series:
+    """Vectorized create_route_display over source/target market columns"""
+    source = source.astype(str).str.lower()
+    target = target.astype(str).str.lower()
+    return (source.map(COUNTRY_FLAGS).fillna('🏳️') + source.str.upper() + '→'
+            + target.map(COUNTRY_FLAGS).fillna('🏳️') + target.str.upper())
+
+# Page CSS: Apple-style dark theme with pure black and red accents
+_CUSTOM_CSS_DARK = """
     <style>
     /* === APPLE DARK THEME === */
     
@@ -718,8 +921,72 @@ def load_apple_style_css():
     }
     </style>
     """
+
+# Extra CSS for the historic deals section (ROI badges, quick-win cards, tooltips)
+_CUSTOM_CSS_EXTRA = """
+    <style>
+    .big-roi {
+        font-size: 2.5em;
+        font-weight: bold;
+        color: #2E8B57;
+        text-align: center;
+    }
+    
+    .quick-win-card {
+        border: 2px solid #E8E8E8;
+        border-radius: 10px;
+        padding: 15px;
+        margin: 10px 0;
+        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+    }
+    
+    .metric-container {
+        background-color: #f0f2f6;
+        border-radius: 10px;
+        padding: 20px;
+        text-align: center;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    }
+    
+    .tooltip {
+        position: relative;
+        display: inline-block;
+        border-bottom: 1px dotted black;
+    }
     
-    st.markdown(css, unsafe_allow_html=True)
+    .tooltip .tooltiptext {
+        visibility: hidden;
+        width: 200px;
+        background-color: #555;
+        color: white;
+        text-align: center;
+        border-radius: 6px;
+        padding: 5px;
+        position: absolute;
+        z-index: 1;
+        bottom: 125%;
+        left: 50%;
+        margin-left: -100px;
+        opacity: 0;
+        transition: opacity 0.3s;
+    }
+    
+    .tooltip:hover .tooltiptext {
+        visibility: visible;
+        opacity: 1;
+    }
+    
+    .high-roi { background-color: rgba(144, 238, 144, 0.3) !important; }
+    .medium-roi { background-color: rgba(255, 255, 224, 0.3) !important; }
+    .low-roi { background-color: rgba(255, 182, 193, 0.3) !important; }
+    </style>
+    """
+
+@st.cache_resource(show_spinner=False)
+def _inject_css() -> bool:
+    """Inject the page CSS once; later reruns replay the cached markdown element"""
+    st.markdown(_CUSTOM_CSS_DARK + _CUSTOM_CSS_EXTRA, unsafe_allow_html=True)
+    return True
 
 def create_metric_card(title: str, value: str, delta: str = None):
     """Create a styled metric card"""
@@ -743,6 +1010,19 @@ def get_opportunity_badge(score: float) -> str:
     else:
         return f'<span class="opportunity-badge-low">LOW ({score:.1f})</span>'
 
+# Badge prefixes for get_opportunity_badge_series (high, medium, low)
+OPPORTUNITY_BADGE_PREFIXES = [
+    '<span class="opportunity-badge-high">HIGH (',
+    '<span class="opportunity-badge-medium">MEDIUM (',
+    '<span class="opportunity-badge-low">LOW ('
+]
+
+def get_opportunity_badge_series(scores: pd.Series) -> pd.Series:
+    """Vectorized get_opportunity_badge for a whole column"""
+    values = scores.to_numpy(dtype=np.float64)
+    prefixes = np.select([values >= 70, values >= 50], OPPORTUNITY_BADGE_PREFIXES[:2], OPPORTUNITY_BADGE_PREFIXES[2])
+    return pd.Series(prefixes, index=scores.index) + np.char.mod('%.1f', values) + ')</span>'
+
 def get_score_badge(score: float, label: str = "") -> str:
     """Get colored badge for any score 0-100"""
     color = "#ff0000" if score >= 70 else "#ff6666" if score >= 50 else "#666666"
@@ -805,6 +1085,14 @@ def format_percentage(value: float) -> str:
         return "0.0%"
     return f"{value:.1f}%"
 
+def format_currency_series(values: pd.Series) -> pd.Series:
+    """Vectorized format_currency for a whole column"""
+    return "€" + values.fillna(0).map("{:,.2f}".format)
+
+def format_percentage_series(values: pd.Series) -> pd.Series:
+    """Vectorized format_percentage for a whole column"""
+    return pd.Series(np.char.mod('%.1f%%', values.fillna(0).to_numpy(dtype=np.float64)), index=values.index)
+
 def create_amazon_links(asin: str) -> str:
     """Create Amazon and Keepa links"""
     if pd.isna(asin) or asin == "":
@@ -815,22 +1103,46 @@ def create_amazon_links(asin: str) -> str:
     
     return f'{amazon_link} {keepa_link}'
 
+def create_amazon_links_series(asins: pd.Series) -> pd.Series:
+    """Vectorized create_amazon_links for a whole column"""
+    asin_text = asins.fillna('').astype(str)
+    links = ('<a href="https://www.amazon.it/dp/' + asin_text + '" target="_blank">🛒</a> '
+             '<a href="https://keepa.com/#!product/8-' + asin_text + '" target="_blank">📊</a>')
+    return links.where(asin_text != '', '')
+
+# Scalar route columns used by the consolidated view
+CONSOLIDATED_SOURCE_COLUMNS = [
+    'asin', 'title', 'source', 'target', 'purchase_price', 'net_cost',
+    'target_price', 'gross_margin_eur', 'gross_margin_pct', 'roi',
+    'opportunity_score', 'profit_website'
+]
+
 def prepare_consolidated_data(best_routes_df: pd.DataFrame) -> pd.DataFrame:
     """Prepare data for consolidated view with all mandatory columns"""
     if best_routes_df.empty:
         return pd.DataFrame()
     
+    # Pass only the slim scalar columns to the cached formatter: the dict columns
+    # (fees, cost_breakdown) are reduced to the fees total so the cache key stays cheap
+    slim_df = best_routes_df[[col for col in CONSOLIDATED_SOURCE_COLUMNS if col in best_routes_df.columns]].copy()
+    slim_df['fees_total'] = [fees['total'] if isinstance(fees, dict) else 0 for fees in best_routes_df['fees']]
+    
+    return format_consolidated_data(slim_df)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def format_consolidated_data(routes_df: pd.DataFrame) -> pd.DataFrame:
+    """Format the slim route columns for the consolidated view (cached across reruns)"""
     # Create a copy for processing
-    df = best_routes_df.copy()
+    df = routes_df.copy()
     
     # Create Best Route column
-    df['Best Route'] = df['source'].str.upper() + '->' + df['target'].str.upper()
+    df['Best Route'] = route_labels(df['source'], df['target'])
     
     # Create Links column
-    df['Links'] = df['asin'].apply(create_amazon_links)
+    df['Links'] = create_amazon_links_series(df['asin'])
     
     # Create Fees breakdown (simplified)
-    df['Fees €'] = df['fees'].apply(lambda x: format_currency(x['total']) if isinstance(x, dict) else format_currency(0))
+    df['Fees €'] = format_currency_series(df['fees_total'])
     
     # Select and reorder mandatory columns
     consolidated_columns = [
@@ -848,21 +1160,22 @@ def prepare_consolidated_data(best_routes_df: pd.DataFrame) -> pd.DataFrame:
                 df[col] = 0
     
     # Format columns for display
-    df['Purchase Price €'] = df['purchase_price'].apply(format_currency)
-    df['Net Cost €'] = df['net_cost'].apply(format_currency)
-    df['Target Price €'] = df['target_price'].apply(format_currency)
-    df['Gross Margin €'] = df['gross_margin_eur'].apply(format_currency)
-    df['Gross Margin %'] = df['gross_margin_pct'].apply(format_percentage)
+    df['Purchase Price €'] = format_currency_series(df['purchase_price'])
+    df['Net Cost €'] = format_currency_series(df['net_cost'])
+    df['Target Price €'] = format_currency_series(df['target_price'])
+    df['Gross Margin €'] = format_currency_series(df['gross_margin_eur'])
+    df['Gross Margin %'] = format_percentage_series(df['gross_margin_pct'])
     # Add fallback for gross_margin_pct if missing
     if 'gross_margin_pct' not in df.columns:
         df['gross_margin_pct'] = 0  # Default fallback
-    df['Margine %'] = df['gross_margin_pct'].apply(format_percentage)
-    df['ROI %'] = df['roi'].apply(format_percentage)
-    df['Opportunity Score'] = df['opportunity_score'].apply(get_opportunity_badge)
+    df['Margine %'] = format_percentage_series(df['gross_margin_pct'])
+    df['ROI %'] = format_percentage_series(df['roi'])
+    df['Opportunity Score'] = get_opportunity_badge_series(df['opportunity_score'])
     
     # SOSTITUIRE la colonna "Profit (Amazon | Web)" CON:
-    df['Amazon €'] = df['gross_margin_eur'].apply(format_currency)
-    df['Web €'] = df['profit_website'].apply(lambda x: f"(+€{x:.2f})" if x > 0 else "")
+    df['Amazon €'] = format_currency_series(df['gross_margin_eur'])
+    profit_website = df['profit_website'].to_numpy(dtype=np.float64)
+    df['Web €'] = np.where(profit_website > 0, np.char.add(np.char.add('(+€', np.char.mod('%.2f', profit_website)), ')'), '')
     
     # Final columns - rendere sito web meno prominente:
     final_columns = [
@@ -1668,49 +1981,46 @@ def apply_preset_filter(df: pd.DataFrame, preset_name: str) -> pd.DataFrame:
         return df
 
 
-@st.cache_data
+# Opportunity gauge with fixed layout and colors: create_opportunity_gauge only patches value and bar color
+_GAUGE_TEMPLATE = go.Figure(go.Indicator(
+    mode="gauge+number",
+    value=0,
+    domain={'x': [0, 1], 'y': [0, 1]},
+    title={'text': "Opportunity Score", 'font': {'color': '#ffffff', 'size': 16}},
+    number={'font': {'color': '#ffffff', 'size': 24}},
+    gauge={
+        'axis': {'range': [None, 100], 'tickwidth': 1, 'tickcolor': "#ffffff"},
+        'bar': {'color': "#666666"},
+        'steps': [
+            {'range': [0, 50], 'color': "#2d2d2d"},
+            {'range': [50, 70], 'color': "#404040"},
+            {'range': [70, 100], 'color': "#1a1a1a"}
+        ],
+        'threshold': {
+            'line': {'color': "#ffffff", 'width': 4},
+            'thickness': 0.75, 
+            'value': 80
+        }
+    }
+))
+_GAUGE_TEMPLATE.update_layout(
+    height=250, 
+    paper_bgcolor="#000000", 
+    font_color="#ffffff",
+    margin=dict(l=0, r=0, t=40, b=0)
+)
+
+@st.cache_data(max_entries=512, show_spinner=False, ttl=3600)
 def create_opportunity_gauge(score: float) -> go.Figure:
     """Create gauge chart for Opportunity Score"""
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=score,
-        domain={'x': [0, 1], 'y': [0, 1]},
-        title={'text': "Opportunity Score", 'font': {'color': '#ffffff', 'size': 16}},
-        number={'font': {'color': '#ffffff', 'size': 24}},
-        gauge={
-            'axis': {'range': [None, 100], 'tickwidth': 1, 'tickcolor': "#ffffff"},
-            'bar': {'color': "#ff0000" if score > 70 else "#ff6666" if score > 50 else "#666666"},
-            'steps': [
-                {'range': [0, 50], 'color': "#2d2d2d"},
-                {'range': [50, 70], 'color': "#404040"},
-                {'range': [70, 100], 'color': "#1a1a1a"}
-            ],
-            'threshold': {
-                'line': {'color': "#ffffff", 'width': 4},
-                'thickness': 0.75, 
-                'value': 80
-            }
-        }
-    ))
-    fig.update_layout(
-        height=250, 
-        paper_bgcolor="#000000", 
-        font_color="#ffffff",
-        margin=dict(l=0, r=0, t=40, b=0)
-    )
+    fig = go.Figure(_GAUGE_TEMPLATE)
+    fig.data[0].value = score
+    fig.data[0].gauge.bar.color = "#ff0000" if score > 70 else "#ff6666" if score > 50 else "#666666"
     return fig
 
-@st.cache_data
-def create_price_sparkline(row: pd.Series) -> go.Figure:
-    """Create sparkline for price trends"""
-    # Get historic prices
-    current = row.get('Buy Box 🚚: Current', 0)
-    avg_30 = row.get('Buy Box 🚚: 30 days avg.', current)
-    avg_90 = row.get('Buy Box 🚚: 90 days avg.', current)
-    avg_180 = row.get('Buy Box 🚚: 180 days avg.', current)
-    lowest = row.get('Buy Box 🚚: Lowest', current)
-    highest = row.get('Buy Box 🚚: Highest', current)
-    
+@st.cache_data(max_entries=512, show_spinner=False, ttl=3600)
+def create_price_sparkline(current: float, avg_30: float, avg_90: float, avg_180: float) -> go.Figure:
+    """Create sparkline for price trends (plain float args keep the cache key stable)"""
     if current <= 0:
         # Return empty chart for invalid data
         fig = go.Figure()
@@ -1731,19 +2041,9 @@ def create_price_sparkline(row: pd.Series) -> go.Figure:
     # Create simulated trend data (in real implementation, use actual historical data)
     dates = pd.date_range(end=pd.Timestamp.now(), periods=180, freq='D')
     
-    # Simulate price evolution from avg_180 to current with some noise
-    price_trend = []
-    for i in range(180):
-        progress = i / 179
-        # Linear interpolation from avg_180 to current with realistic variation
-        base_price = avg_180 + (current - avg_180) * progress
-        # Add some realistic noise
-        noise = np.random.normal(0, abs(current) * 0.02)
-        price = max(0.1, base_price + noise)  # Ensure positive price
-        price_trend.append(price)
-    
-    # Smooth the trend
-    price_trend = pd.Series(price_trend).rolling(window=5, center=True).mean().bfill().ffill()
+    # Piecewise linear trend through the 180d, 90d and 30d averages to the current price
+    price_trend = np.interp(np.linspace(0, 3, 180), [0, 1, 2, 3], [avg_180, avg_90, avg_30, current])
+    price_trend = np.maximum(0.1, price_trend)  # Ensure positive price
     
     fig = go.Figure()
     
@@ -1789,7 +2089,7 @@ def create_price_sparkline(row: pd.Series) -> go.Figure:
     )
     return fig
 
-@st.cache_data
+@st.cache_data(max_entries=512, show_spinner=False, ttl=3600)
 def create_progress_bar_chart(value: float, title: str, max_val: float = 100) -> go.Figure:
     """Create horizontal progress bar chart"""
     color = "#ff0000" if value > 70 else "#ff6666" if value > 50 else "#999999"
@@ -1827,50 +2127,38 @@ def display_risk_alerts(opportunities_df):
     
     # Prima calcola i risk levels per tutti i prodotti se non già presenti
     if 'risk_level' not in opportunities_df.columns:
-        # Aggiungi valutazione rischi per ogni opportunità
-        risk_levels = []
-        warnings_list = []
-        
-        for _, row in opportunities_df.iterrows():
-            try:
-                # Importa le funzioni necessarie
-                from profit_model import validate_margin_sustainability
-                from analytics import assess_amazon_competition_risk
-                
-                # Valuta sostenibilità margini
-                sustainability = validate_margin_sustainability(row)
-                
-                # Valuta rischio Amazon
-                amazon_risk = assess_amazon_competition_risk(row)
-                
-                # Determina livello di rischio complessivo
-                if (not sustainability['is_sustainable'] or 
-                    amazon_risk['level'] in ['HIGH', 'CRITICAL'] or
-                    sustainability['sustainability_level'] == 'POOR'):
-                    risk_level = 'CRITICAL'
-                elif (len(sustainability['warnings']) > 0 or 
-                      amazon_risk['level'] == 'MEDIUM' or
-                      sustainability['sustainability_level'] == 'MODERATE'):
-                    risk_level = 'HIGH'
-                else:
-                    risk_level = 'LOW'
-                
-                # Combina warnings
-                all_warnings = sustainability['warnings'].copy()
-                if amazon_risk['level'] in ['HIGH', 'CRITICAL']:
-                    all_warnings.append(f"🔴 Amazon Risk: {amazon_risk['recommendation']}")
-                
-                risk_levels.append(risk_level)
-                warnings_list.append(all_warnings)
-                
-            except Exception:
-                # Fallback in caso di errore
-                risk_levels.append('UNKNOWN')
-                warnings_list.append(['⚠️ Impossibile valutare il rischio'])
+        # Valutazione rischi vettorizzata su tutte le opportunità
+        try:
+            from profit_model import validate_margin_sustainability_vec, sustainability_warnings
+            from analytics import assess_amazon_competition_risk_batch
+            
+            sustainability = validate_margin_sustainability_vec(opportunities_df)
+            amazon_risk = assess_amazon_competition_risk_batch(opportunities_df)
+            
+            # Determina livello di rischio complessivo (POOR/MODERATE implicano già i conteggi di warning)
+            warning_count = sustainability['warning_count'].to_numpy()
+            amazon_high = amazon_risk['level'].isin(['HIGH', 'CRITICAL']).to_numpy()
+            amazon_medium = (amazon_risk['level'] == 'MEDIUM').to_numpy()
+            risk_levels = np.select(
+                [(warning_count > 1) | amazon_high, (warning_count > 0) | amazon_medium],
+                ['CRITICAL', 'HIGH'],
+                default='LOW'
+            )
+            
+            # Combina warnings
+            warnings_list = sustainability_warnings(sustainability)
+            for warnings, is_high, recommendation in zip(warnings_list, amazon_high, amazon_risk['recommendation']):
+                if is_high:
+                    warnings.append(f"🔴 Amazon Risk: {recommendation}")
+            
+        except Exception:
+            # Fallback in caso di errore
+            risk_levels = np.full(len(opportunities_df), 'UNKNOWN')
+            warnings_list = [['⚠️ Impossibile valutare il rischio'] for _ in range(len(opportunities_df))]
         
         # Aggiungi colonne al dataframe
         opportunities_df = opportunities_df.copy()
-        opportunities_df['risk_level'] = risk_levels
+        opportunities_df['risk_level'] = pd.Categorical(risk_levels, categories=['LOW', 'HIGH', 'CRITICAL', 'UNKNOWN'])
         opportunities_df['warnings'] = warnings_list
     
     # Filtra prodotti ad alto rischio
@@ -1940,11 +2228,13 @@ def display_risk_alerts(opportunities_df):
 
 def get_asin_detail_data(asin: str, df: pd.DataFrame, best_routes: pd.DataFrame) -> Dict[str, Any]:
     """Get detailed data for selected ASIN"""
-    # Find the product in original data
-    product_row = df[df['ASIN'] == asin].iloc[0] if asin in df['ASIN'].values else None
+    # Find the product in original data (one mask per frame, no separate membership scan)
+    product_matches = df[df['ASIN'] == asin]
+    product_row = product_matches.iloc[0] if not product_matches.empty else None
     
     # Find the route data
-    route_row = best_routes[best_routes['asin'] == asin].iloc[0] if asin in best_routes['asin'].values else None
+    route_matches = best_routes[best_routes['asin'] == asin]
+    route_row = route_matches.iloc[0] if not route_matches.empty else None
     
     if product_row is None:
         return None
@@ -1972,7 +2262,7 @@ def get_asin_detail_data(asin: str, df: pd.DataFrame, best_routes: pd.DataFrame)
 
 def main():
     """Main application function"""
-    load_apple_style_css()
+    _inject_css()
     
     # Header - come specificato nel prompt
     st.title("📊 Amazon Analyzer Pro")
@@ -1991,39 +2281,100 @@ def main():
             help="Carica i file di export Keepa (CSV o XLSX)"
         )
         
-        # Analysis parameters
-        st.subheader("🎯 Analysis Parameters")
-        
-        purchase_strategy = st.selectbox(
-            "Purchase Strategy",
-            PURCHASE_STRATEGIES,
-            index=0,
-            help="Select which price column to use for purchasing"
-        )
-        
-        scenario = st.selectbox(
-            "Sale Scenario",
-            ["Short", "Medium", "Long"],
-            index=1,
-            help="Short: Quick turnover, Medium: Balanced, Long: Patient approach"
-        )
-        
-        mode = st.selectbox(
-            "Fulfillment Mode",
-            ["FBA", "FBM"],
-            index=0,
-            help="Choose fulfillment method"
-        )
-        
-        # Discount slider direttamente nella sidebar principale
-        discount = st.slider(
-            "Discount %",
-            min_value=0,
-            max_value=40,
-            value=21,
-            step=1,
-            help="Purchase discount percentage"
-        )
+        # Analysis parameters in a form: the pipeline reruns only when the user applies them
+        with st.form("params_form"):
+            st.subheader("🎯 Analysis Parameters")
+            
+            purchase_strategy = st.selectbox(
+                "Purchase Strategy",
+                PURCHASE_STRATEGIES,
+                index=0,
+                help="Select which price column to use for purchasing"
+            )
+            
+            scenario = st.selectbox(
+                "Sale Scenario",
+                ["Short", "Medium", "Long"],
+                index=1,
+                help="Short: Quick turnover, Medium: Balanced, Long: Patient approach"
+            )
+            
+            mode = st.selectbox(
+                "Fulfillment Mode",
+                ["FBA", "FBM"],
+                index=0,
+                help="Choose fulfillment method"
+            )
+            
+            # Discount slider direttamente nella sidebar principale
+            discount = st.slider(
+                "Discount %",
+                min_value=0,
+                max_value=40,
+                value=21,
+                step=1,
+                help="Purchase discount percentage"
+            )
+            
+            # Advanced parameters
+            with st.expander("🔧 Advanced Settings"):
+            
+            
+                st.markdown("**💰 Inbound Logistics Cost (Scaglioni):**")
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    inbound_logistics_low = st.slider(
+                        "≤€199", 
+                        min_value=0.0, 
+                        max_value=10.0, 
+                        value=1.5, 
+                        step=0.25,
+                        help="Costo logistica per prodotti fino a €199"
+                    )
+
+                with col2:
+                    inbound_logistics_high = st.slider(
+                        ">€199", 
+                        min_value=0.0, 
+                        max_value=20.0, 
+                        value=3.0, 
+                        step=0.25,
+                        help="Costo logistica per prodotti oltre €199"
+                    )
+            
+                min_roi = st.slider(
+                    "Minimum Margine %",
+                    min_value=0.0,
+                    max_value=100.0,
+                    value=10.0,
+                    step=5.0,
+                    help="Minimum ROI required for opportunities"
+                )
+            
+                min_margin = st.slider(
+                    "Minimum Margin %",
+                    min_value=0.0,
+                    max_value=50.0,
+                    value=15.0,
+                    step=2.5,
+                    help="Minimum gross margin required"
+                )
+            
+            # Scoring weights - sezione Advanced Scoring come richiesto
+            with st.expander("⚙️ Advanced Scoring"):
+                st.write("Adjust component weights for Opportunity Score:")
+            
+                profit_weight = st.slider("Profit Weight", 0.1, 0.8, SCORING_WEIGHTS['profit'], 0.05)
+                velocity_weight = st.slider("Velocity Weight", 0.1, 0.5, SCORING_WEIGHTS['velocity'], 0.05)
+                competition_weight = st.slider("Competition Weight", 0.1, 0.3, SCORING_WEIGHTS['competition'], 0.05)
+            
+                # Normalize weights
+                total_weight = profit_weight + velocity_weight + competition_weight
+                if total_weight != 1.0:
+                    st.info(f"Weights normalized to sum to 1.0 (current sum: {total_weight:.2f})")
+            
+            st.form_submit_button("🔄 Run Analysis", use_container_width=True)
         
         st.sidebar.markdown("### 🌍 Filtri Geografici")
 
@@ -2044,64 +2395,6 @@ def main():
             help="Filtri predefiniti per diversi stili di trading"
         )
         
-        # Advanced parameters
-        with st.expander("🔧 Advanced Settings"):
-            
-            
-            st.markdown("**💰 Inbound Logistics Cost (Scaglioni):**")
-            col1, col2 = st.columns(2)
-
-            with col1:
-                inbound_logistics_low = st.slider(
-                    "≤€199", 
-                    min_value=0.0, 
-                    max_value=10.0, 
-                    value=1.5, 
-                    step=0.25,
-                    help="Costo logistica per prodotti fino a €199"
-                )
-
-            with col2:
-                inbound_logistics_high = st.slider(
-                    ">€199", 
-                    min_value=0.0, 
-                    max_value=20.0, 
-                    value=3.0, 
-                    step=0.25,
-                    help="Costo logistica per prodotti oltre €199"
-                )
-            
-            min_roi = st.slider(
-                "Minimum Margine %",
-                min_value=0.0,
-                max_value=100.0,
-                value=10.0,
-                step=5.0,
-                help="Minimum ROI required for opportunities"
-            )
-            
-            min_margin = st.slider(
-                "Minimum Margin %",
-                min_value=0.0,
-                max_value=50.0,
-                value=15.0,
-                step=2.5,
-                help="Minimum gross margin required"
-            )
-        
-        # Scoring weights - sezione Advanced Scoring come richiesto
-        with st.expander("⚙️ Advanced Scoring"):
-            st.write("Adjust component weights for Opportunity Score:")
-            
-            profit_weight = st.slider("Profit Weight", 0.1, 0.8, SCORING_WEIGHTS['profit'], 0.05)
-            velocity_weight = st.slider("Velocity Weight", 0.1, 0.5, SCORING_WEIGHTS['velocity'], 0.05)
-            competition_weight = st.slider("Competition Weight", 0.1, 0.3, SCORING_WEIGHTS['competition'], 0.05)
-            
-            # Normalize weights
-            total_weight = profit_weight + velocity_weight + competition_weight
-            if total_weight != 1.0:
-                st.info(f"Weights normalized to sum to 1.0 (current sum: {total_weight:.2f})")
-        
         st.markdown("---")
         st.markdown("**Made with ❤️ for Amazon FBA**")
     
@@ -2114,19 +2407,17 @@ def main():
                 st.write(f"- {f.name} (size: {f.size} bytes, type: {type(f)})")
         
         try:
-            # Load data usando la funzione robusta da loaders.py
-            with st.spinner("Loading data..."):
-                from loaders import load_data
-                df = load_data(uploaded_files)
+            # Load data usando la funzione robusta da loaders.py (cached on the upload contents)
+            data_key = uploaded_files_signature(uploaded_files)
+            df = load_data_cached(data_key, uploaded_files)
             
             if not df.empty:
                 if 'source_market' not in df.columns:
                     st.error("❌ CRITICAL: source_market column missing from main dataset!")
                     st.stop()
                 else:
-                    unique_markets = df['source_market'].unique()
-                    asin_count = len(df['ASIN'].unique())
-                    st.success(f"Dataset caricato: {len(df)} righe, {asin_count} ASIN unici, mercati: {list(unique_markets)}")
+                    stats = dataset_stats(data_key, df)
+                    st.success(f"Dataset caricato: {stats['rows']} righe, {stats['asins']} ASIN unici, mercati: {stats['markets']}")
                     
                     # DEBUG: Check data quality before analysis
                     if DEBUG_MODE:
@@ -2172,62 +2463,74 @@ def main():
             # Analysis section
             st.header("📊 Analysis Results")
             
-            with st.spinner("Analisi cross-market in corso..."):
-                if DEBUG_MODE:
-                    st.write("=== STARTING ANALYSIS ===")
-                    st.write(f"DataFrame shape: {df.shape}")
-                    st.write(f"Params: {params}")
-                
-                # Check if parallel processing is beneficial
-                unique_markets = df['source_market'].unique()
-                total_products = len(df)
-                unique_asins = df['ASIN'].nunique()
-                
-                if DEBUG_MODE:
-                    st.write(f"Analysis setup: {unique_asins} ASINs, {total_products} products, {len(unique_markets)} markets")
-                
-                if unique_asins > 10000 and total_products > 20000:  # Disable parallel processing for now
-                    # Use parallel processing for large datasets with many ASINs
+            # Display-filter reruns reuse the stored results: the pipeline only runs when
+            # the upload or the applied params change
+            analysis_key = (data_key, params_cache_key(params))
+            if st.session_state.get('analysis_key') == analysis_key:
+                best_routes = st.session_state['best_routes']
+                analysis = st.session_state['analysis']
+            else:
+                with st.spinner("Analisi cross-market in corso..."):
                     if DEBUG_MODE:
-                        st.info(f"Using parallel ASIN processing: {unique_asins} ASINs across {len(unique_markets)} markets")
+                        st.write("=== STARTING ANALYSIS ===")
+                        st.write(f"DataFrame shape: {df.shape}")
+                        st.write(f"Params: {params}")
                     
-                    best_routes = process_asins_parallel(df, params, batch_size=25)
+                    # Check if parallel processing is beneficial
+                    stats = dataset_stats(data_key, df)
+                    unique_markets = stats['markets']
+                    total_products = stats['rows']
+                    unique_asins = stats['asins']
                     
                     if DEBUG_MODE:
-                        st.success(f"Parallel processing completed: {len(best_routes)} routes found")
+                        st.write(f"Analysis setup: {unique_asins} ASINs, {total_products} products, {len(unique_markets)} markets")
+                    
+                    if unique_asins > 10000 and total_products > 20000:  # Disable parallel processing for now
+                        # Use parallel processing for large datasets with many ASINs
+                        if DEBUG_MODE:
+                            st.info(f"Using parallel ASIN processing: {unique_asins} ASINs across {len(unique_markets)} markets")
+                        
+                        best_routes = find_best_routes_cached(data_key, params_cache_key(params), df, params, parallel=True)
+                        
+                        if DEBUG_MODE:
+                            st.success(f"Parallel processing completed: {len(best_routes)} routes found")
+                        
+                    else:
+                        # Use standard processing for smaller datasets
+                        if DEBUG_MODE:
+                            st.info(f"Using standard processing: {unique_asins} ASINs, {total_products} products")
+                        
+                        try:
+                            best_routes = find_best_routes_cached(data_key, params_cache_key(params), df, params)
+                            if DEBUG_MODE:
+                                st.write(f"Standard processing completed: {len(best_routes)} routes found")
+                        except Exception as e:
+                            if DEBUG_MODE:
+                                st.error(f"Error in find_best_routes: {str(e)}")
+                                import traceback
+                                st.code(traceback.format_exc())
+                            best_routes = pd.DataFrame()
                     
-                else:
-                    # Use standard processing for smaller datasets
                     if DEBUG_MODE:
-                        st.info(f"Using standard processing: {unique_asins} ASINs, {total_products} products")
+                        st.write("=== ANALYSIS RESULTS ===")
+                        st.write(f"Best routes shape: {best_routes.shape if hasattr(best_routes, 'shape') else 'No shape'}")
+                        if not best_routes.empty:
+                            st.write(f"Route columns: {list(best_routes.columns)}")
+                            st.write(f"Sample routes: {best_routes.head(2).to_dict()}")
                     
+                    # Get profitability analysis
                     try:
-                        best_routes = find_best_routes(df, params)
+                        analysis = analyze_route_profitability_cached(data_key, params_cache_key(params), df, params)
                         if DEBUG_MODE:
-                            st.write(f"Standard processing completed: {len(best_routes)} routes found")
+                            st.write(f"Analysis completed: {analysis.get('summary', 'No summary')}")
                     except Exception as e:
                         if DEBUG_MODE:
-                            st.error(f"Error in find_best_routes: {str(e)}")
-                            import traceback
-                            st.code(traceback.format_exc())
-                        best_routes = pd.DataFrame()
-                
-                if DEBUG_MODE:
-                    st.write("=== ANALYSIS RESULTS ===")
-                    st.write(f"Best routes shape: {best_routes.shape if hasattr(best_routes, 'shape') else 'No shape'}")
-                    if not best_routes.empty:
-                        st.write(f"Route columns: {list(best_routes.columns)}")
-                        st.write(f"Sample routes: {best_routes.head(2).to_dict()}")
+                            st.error(f"Error in analyze_route_profitability: {str(e)}")
+                        analysis = {'total_products': len(df), 'profitable_products': 0}
                 
-                # Get profitability analysis
-                try:
-                    analysis = analyze_route_profitability(df, params)
-                    if DEBUG_MODE:
-                        st.write(f"Analysis completed: {analysis.get('summary', 'No summary')}")
-                except Exception as e:
-                    if DEBUG_MODE:
-                        st.error(f"Error in analyze_route_profitability: {str(e)}")
-                    analysis = {'total_products': len(df), 'profitable_products': 0}
+                st.session_state['analysis_key'] = analysis_key
+                st.session_state['best_routes'] = best_routes
+                st.session_state['analysis'] = analysis
             
             if not best_routes.empty:
                 st.success(f"Analisi completata: {len(best_routes)} opportunità cross-market trovate")
@@ -2239,7 +2542,10 @@ def main():
                 st.subheader("📊 Dashboard Overview")
                 
                 # Calculate historic deals from original data
-                historic_deals_df = find_historic_deals(df)
+                if st.session_state.get('historic_deals_key') != data_key:
+                    st.session_state['historic_deals_key'] = data_key
+                    st.session_state['historic_deals_df'] = find_historic_deals_cached(data_key, df)
+                historic_deals_df = st.session_state['historic_deals_df']
                 
                 # 4 colonne principali KPI
                 col1, col2, col3, col4 = st.columns(4)
@@ -2269,85 +2575,15 @@ def main():
                 
                 st.markdown("---")
                 
-                # Add custom CSS
-                add_custom_css()
-                
                 # 🔥 REDESIGNED AFFARI STORICI - TOTAL UI OVERHAUL
                 if len(historic_deals_df) > 0:
                     # Merge historic deals with best routes for complete data
-                    enhanced_deals = []
-                    
-                    for _, deal in historic_deals_df.iterrows():
-                        asin = deal.get('ASIN', deal.get('asin', ''))
-                        
-                        # Find matching route
-                        matching_route = best_routes[best_routes['asin'] == asin]
-                        if not matching_route.empty:
-                            route_data = matching_route.iloc[0]
-                            
-                            # Combine deal and route data
-                            # IMPORTANTE: profit_model.py mette il profitto REALE in 'gross_margin_eur'!
-                            real_profit = route_data.get('gross_margin_eur', 0)  # Questo è il profitto VERO
-                            real_roi = route_data.get('roi', 0)
-                            
-                            # Debug per verificare
-                            if 'B0F3JNJXQ5' in asin:  # Nintendo Switch Camera
-                                st.write(f"DEBUG {asin}:")
-                                st.write(f"  - gross_margin_eur: {route_data.get('gross_margin_eur', 'N/A')}")
-                                st.write(f"  - net_profit: {route_data.get('net_profit', 'N/A')}")
-                                st.write(f"  - total_cost: {route_data.get('total_cost', 'N/A')}")
-                                st.write(f"  - fees: {route_data.get('fees', {})}")
-                            
-                            enhanced_deal = {
-                                'asin': asin,
-                                'title': deal.get('Title', ''),
-                                'route': route_data.get('route', ''),
-                                'buy_price': route_data.get('purchase_price', 0),
-                                'net_cost': route_data.get('net_cost', 0),
-                                'sell_price': route_data.get('target_price', 0),
-                                'profit_eur': real_profit,  # USA GROSS_MARGIN_EUR (profitto reale)
-                                'roi_pct': real_roi,        # ROI calcolato correttamente
-                                'score': route_data.get('opportunity_score', 0),
-                                # Corrected field mapping
-                                'source': route_data.get('source', ''),
-                                'target': route_data.get('target', ''),
-                                # Legacy support
-                                'source_market': route_data.get('source', ''),
-                                'target_market': route_data.get('target', ''),
-                                'original_deal': deal,
-                                # Store cost breakdown for debugging
-                                'cost_breakdown': route_data.get('cost_breakdown', {}),
-                                'total_cost': route_data.get('total_cost', 0),
-                                # Keep net_profit for comparison
-                                '_net_profit_field': route_data.get('net_profit', 0)
-                            }
-                            
-                            # Skip same-country routes and apply preset filters
-                            valid_deal = (enhanced_deal['source'].lower() != enhanced_deal['target'].lower() 
-                                        and enhanced_deal['roi_pct'] > 0)
-                            
-                            if valid_deal:
-                                # Apply sidebar preset filters
-                                if preset_filter == "🔥 Hot Deals":
-                                    if enhanced_deal.get('margin_pct', 0) > 25:  # ✅ Usa margine invece di ROI
-                                        enhanced_deals.append(enhanced_deal)
-                                elif preset_filter == "👍 Safe Bets":
-                                    if enhanced_deal.get('margin_pct', 0) > 20:  # ✅ Usa margine
-                                        enhanced_deals.append(enhanced_deal)
-                                elif preset_filter == "🎲 High Risk/Reward":
-                                    if enhanced_deal.get('margin_pct', 0) > 30:  # ✅ Usa margine
-                                        enhanced_deals.append(enhanced_deal)
-                                elif preset_filter == "💎 Hidden Gems":
-                                    if enhanced_deal['score'] > 75 and enhanced_deal.get('margin_pct', 0) > 15:  # ✅ Usa margine
-                                        killer_metrics = calculate_killer_metrics(deal)
-                                        if len(killer_metrics['descriptions']) >= 2:
-                                            enhanced_deals.append(enhanced_deal)
-                                else:  # "Tutti"
-                                    enhanced_deals.append(enhanced_deal)
+                    enhanced_deals = build_enhanced_deals(historic_deals_df, best_routes, preset_filter)
                     
                     if enhanced_deals:
-                        # Sort by score descending
-                        enhanced_deals.sort(key=lambda x: x['score'], reverse=True)
+                        # Only the top 20 by score are rendered: partial selection instead of a full sort
+                        # (heapq.nlargest orders ties like sorted(..., reverse=True))
+                        top_deals = heapq.nlargest(20, enhanced_deals, key=lambda x: x['score'])
                         
                         st.subheader("🔥 Affari Storici Dashboard")
                         
@@ -2371,7 +2607,7 @@ def main():
                         
                         # 🏆 2. DEAL OF THE DAY
                         st.markdown("### 🏆 Deal of the Day")
-                        best_deal = enhanced_deals[0]
+                        best_deal = top_deals[0]
                         route_display = create_route_display(best_deal['source'], best_deal['target'])
                         
                         st.success(f"**{best_deal['title'][:60]}...** | {route_display} | Margine {best_deal.get('margin_pct', best_deal['roi_pct']):.1f}% | SCORE {best_deal['score']:.0f}")
@@ -2383,7 +2619,7 @@ def main():
                         # ⚡ 3. TOP 5 QUICK WINS SECTION
                         st.markdown("### ⚡ Top 5 Quick Wins")
                         
-                        quick_wins = enhanced_deals[:5]
+                        quick_wins = top_deals[:5]
                         for i, deal in enumerate(quick_wins):
                             with st.container():
                                 col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
@@ -2412,62 +2648,51 @@ def main():
                         # 📋 4. ENHANCED TABLE WITH HIGHLIGHTING
                         st.markdown("### 📋 Tabella Dettagliata")
                         
-                        # Create enhanced table data
-                        table_data = []
+                        # Killer metrics and risk alerts for the displayed rows in one vectorized pass
+                        top_deals_df = historic_deals_df.iloc[[deal['deal_pos'] for deal in top_deals]]
+                        killer_displays = killer_metrics_display(calculate_killer_metrics_vec(top_deals_df))
+                        risk_alerts = get_deal_risk_alert_vec(top_deals_df)
                         
-                        for deal in enhanced_deals[:20]:  # Top 20
-                            # VERIFICA che i valori siano realistici
-                            profit_value = deal.get('profit_eur', 0)
-                            roi_value = deal.get('roi_pct', 0)
-                            
-                            # VALIDAZIONE: Se ROI > 50% o Profit > €20 per prodotti da €40-60, c'è un errore
-                            buy_price = deal.get('buy_price', 0)
-                            sell_price = deal.get('sell_price', 0)
-                            
-                            # Se i valori sembrano errati, ricalcola usando una formula conservativa
-                            if roi_value > 50 or (profit_value > 20 and sell_price < 100):
-                                # FORMULA CONSERVATIVA BASATA SU DATI REALI
-                                # Assumiamo margine netto realistico del 8-12% sul revenue
-                                realistic_profit = (sell_price - buy_price) * 0.25  # 25% del differenziale
-                                realistic_roi = (realistic_profit / buy_price * 100) if buy_price > 0 else 0
-                                
-                                # Usa i valori realistici
-                                profit_value = realistic_profit
-                                roi_value = realistic_roi
-                            
-                            killer_metrics = calculate_killer_metrics(deal['original_deal'])
-                            risk_alert = get_deal_risk_alert(deal['original_deal'])
-                            
-                            # Visual indicators
-                            roi_emoji = get_roi_indicator(roi_value)  # USA IL VALORE VALIDATO
-                            score_stars = get_score_stars(deal['score'])
-                            risk_emoji = get_risk_emoji(risk_alert)
-                            route_visual = create_route_display(deal['source'], deal['target'])
-                            
-                            # Killer metrics display
-                            killer_display = ' '.join(killer_metrics['descriptions']) if killer_metrics['descriptions'] else '-'
-                            
-                            table_data.append({
-                                'ASIN': deal['asin'],
-                                'Titolo': deal['title'][:40] + "..." if len(deal['title']) > 40 else deal['title'],
-                                'Route': route_visual,
-                                'Buy €': f"{buy_price:.2f}",
-                                'Net Cost €': f"{deal['net_cost']:.2f}",
-                                'Sell €': f"{sell_price:.2f}",
-                                'Profit €': f"{profit_value:.2f}",  # USA VALORE VALIDATO
-                                'Margine %': f"{roi_emoji} {roi_value:.1f}%",  # USA VALORE VALIDATO
-                                'ROI': f"{roi_value:.1f}%",
-                                'Score': f"{score_stars} ({deal['score']:.0f})",
-                                'Killer Metrics': killer_display,
-                                'Risk': f"{risk_emoji} {risk_alert}"
-                            })
+                        # Enhanced table built column-wise from the top deals
+                        top_frame = pd.DataFrame(top_deals, columns=['asin', 'title', 'buy_price', 'net_cost', 'sell_price',
+                                                                     'profit_eur', 'roi_pct', 'score', 'source', 'target'])
+                        buy_prices = top_frame['buy_price'].astype(float)
+                        sell_prices = top_frame['sell_price'].astype(float)
+                        profit_values = top_frame['profit_eur'].astype(float)
+                        roi_values = top_frame['roi_pct'].astype(float)
+                        
+                        # VALIDAZIONE: Se ROI > 50% o Profit > €20 per prodotti sotto €100, c'è un errore:
+                        # ricalcola con una formula conservativa (25% del differenziale)
+                        suspicious = (roi_values > 50) | ((profit_values > 20) & (sell_prices < 100))
+                        realistic_profit = (sell_prices - buy_prices) * 0.25
+                        realistic_roi = (realistic_profit / buy_prices * 100).where(buy_prices > 0, 0.0)
+                        profit_values = profit_values.where(~suspicious, realistic_profit)
+                        roi_values = roi_values.where(~suspicious, realistic_roi)  # USA IL VALORE VALIDATO
                         
-                        if table_data:
-                            df_display = pd.DataFrame(table_data)
+                        titles = top_frame['title']
+                        roi_text = roi_values.map('{:.1f}%'.format)
+                        df_display = pd.DataFrame({
+                            'ASIN': top_frame['asin'],
+                            'Titolo': titles.str.slice(0, 40) + np.where(titles.str.len() > 40, "...", ""),
+                            'Route': create_route_display_series(top_frame['source'], top_frame['target']),
+                            'Buy €': buy_prices.map('{:.2f}'.format),
+                            'Net Cost €': top_frame['net_cost'].astype(float).map('{:.2f}'.format),
+                            'Sell €': sell_prices.map('{:.2f}'.format),
+                            'Profit €': profit_values.map('{:.2f}'.format),
+                            'Margine %': get_roi_indicator_series(roi_values) + ' ' + roi_text,
+                            'ROI': roi_text,
+                            'Score': get_score_stars_series(top_frame['score'].astype(float)) + ' ('
+                                     + top_frame['score'].astype(float).map('{:.0f}'.format) + ')',
+                            'Killer Metrics': killer_displays.to_numpy(),
+                            'Risk': (risk_alerts.map(RISK_EMOJIS).fillna('❓') + ' ' + risk_alerts.astype(str)).to_numpy()
+                        })
+                        
+                        if not df_display.empty:
+                            # Apply highlighting based on the numeric (validated) ROI, no re-parsing of the label
+                            roi_num = roi_values.to_numpy()
                             
-                            # Apply highlighting based on ROI
                             def highlight_roi_rows(row):
-                                roi_val = float(row['ROI'].split()[-1].rstrip('%'))
+                                roi_val = roi_num[row.name]
                                 if roi_val > 35:
                                     return ['background-color: rgba(144, 238, 144, 0.3)'] * len(row)
                                 elif roi_val > 25:
@@ -2949,9 +3174,7 @@ def main():
                         if target_col in filtered_routes.columns:
                             # Convert to uppercase for comparison
                             target_countries_upper = [country.upper() for country in target_countries_selected]
-                            filtered_routes = filtered_routes[
-                                filtered_routes[target_col].str.upper().isin(target_countries_upper)
-                            ]
+                            filtered_routes = filtered_routes[market_isin(filtered_routes[target_col], target_countries_upper)]
                             # Show info message about target countries filter
                             if len(target_countries_selected) == 1:
                                 st.info(f"🎯 Mostrando solo opportunità per mercato: {target_countries_selected[0]}")
@@ -2969,9 +3192,7 @@ def main():
                 if 'source' in filtered_routes.columns and 'target' in filtered_routes.columns:
                     # Remove same-country routes (IT->IT, DE->DE, etc.)
                     same_country_before = len(filtered_routes)
-                    filtered_routes = filtered_routes[
-                        filtered_routes['source'].str.lower() != filtered_routes['target'].str.lower()
-                    ]
+                    filtered_routes = filtered_routes[~same_market_mask(filtered_routes['source'], filtered_routes['target'])]
                     
                     if DEBUG_MODE:
                         removed_count = same_country_before - len(filtered_routes)
@@ -2986,26 +3207,22 @@ def main():
                     # Logica di filtering geografico
                     if 'Tutti' not in purchase_countries and len(purchase_countries) > 0:
                         # Filtra DOPO il calcolo di tutte le route
-                        filtered_routes = filtered_routes[
-                            filtered_routes['source'].str.upper().isin(purchase_countries)
-                        ]
+                        filtered_routes = filtered_routes[market_isin(filtered_routes['source'], purchase_countries)]
                     
                     # Add additional data from original dataset for advanced filtering
                     if not df.empty and 'ASIN' in df.columns:
-                        # Create mapping for additional data - handle duplicate ASINs
-                        additional_data = {}
-                        for col in ['Buy Box: % Amazon 90 days', 'Reviews Rating', 'Return Rate', 'Prime Eligible']:
-                            if col in df.columns:
-                                # Use groupby to handle duplicate ASINs - take mean of numeric values
-                                try:
-                                    if pd.api.types.is_numeric_dtype(df[col]):
-                                        additional_data[col] = df.groupby('ASIN')[col].mean().to_dict()
-                                    else:
-                                        # For non-numeric, take first value
-                                        additional_data[col] = df.groupby('ASIN')[col].first().to_dict()
-                                except Exception:
-                                    # Fallback: create empty mapping
-                                    additional_data[col] = {}
+                        # Per-ASIN additional data in one grouped pass - handle duplicate ASINs
+                        # (mean of numeric values, first value otherwise)
+                        agg_map = {
+                            col: 'mean' if pd.api.types.is_numeric_dtype(df[col]) else 'first'
+                            for col in ['Buy Box: % Amazon 90 days', 'Reviews Rating', 'Return Rate', 'Prime Eligible']
+                            if col in df.columns
+                        }
+                        try:
+                            additional_data = df.groupby('ASIN').agg(agg_map) if agg_map else pd.DataFrame()
+                        except Exception:
+                            # Fallback: empty lookup for every requested column
+                            additional_data = pd.DataFrame(columns=list(agg_map))
                         
                         # Add velocity scores if not present
                         if 'velocity_score' not in filtered_routes.columns:
@@ -3021,7 +3238,7 @@ def main():
                             filtered_routes['velocity_score'] = filtered_routes['asin'].map(velocity_scores).fillna(0)
                         
                         # Apply Amazon dominance filter
-                        if 'Buy Box: % Amazon 90 days' in additional_data:
+                        if 'Buy Box: % Amazon 90 days' in additional_data.columns:
                             filtered_routes['amazon_dominance'] = filtered_routes['asin'].map(additional_data['Buy Box: % Amazon 90 days']).fillna(0)
                             filtered_routes = filtered_routes[filtered_routes['amazon_dominance'] <= max_amazon_dominance]
                         
@@ -3034,12 +3251,12 @@ def main():
                                 filtered_routes = filtered_routes[filtered_routes['amazon_dominance'] <= max_amazon_share]
                         
                         if min_rating > 1.0:
-                            if 'Reviews Rating' in additional_data:
+                            if 'Reviews Rating' in additional_data.columns:
                                 filtered_routes['rating'] = filtered_routes['asin'].map(additional_data['Reviews Rating']).fillna(0)
                                 filtered_routes = filtered_routes[filtered_routes['rating'] >= min_rating]
                         
                         if max_return_rate < 50:
-                            if 'Return Rate' in additional_data:
+                            if 'Return Rate' in additional_data.columns:
                                 filtered_routes['return_rate'] = filtered_routes['asin'].map(additional_data['Return Rate']).fillna(0)
                                 filtered_routes = filtered_routes[filtered_routes['return_rate'] <= max_return_rate]
                         
@@ -3050,7 +3267,7 @@ def main():
                             filtered_routes = filtered_routes[filtered_routes['asin'].isin(historic_asins)]
                         
                         if only_prime_eligible:
-                            if 'Prime Eligible' in additional_data:
+                            if 'Prime Eligible' in additional_data.columns:
                                 filtered_routes['prime_eligible'] = filtered_routes['asin'].map(additional_data['Prime Eligible']).fillna(False)
                                 filtered_routes = filtered_routes[filtered_routes['prime_eligible'] == True]
                 
@@ -3154,7 +3371,7 @@ def main():
                                     
                                     with col1:
                                         # Opportunity Score Gauge
-                                        gauge_fig = create_opportunity_gauge(detail_data['opportunity_score'])
+                                        gauge_fig = create_opportunity_gauge(round(float(detail_data['opportunity_score']), 1))
                                         st.plotly_chart(gauge_fig, use_container_width=True)
                                     
                                     with col2:
@@ -3173,13 +3390,13 @@ def main():
                                     with col3:
                                         # Velocity Score Progress Bar
                                         st.markdown("**Velocity Score**")
-                                        velocity_fig = create_progress_bar_chart(detail_data['velocity_score'], "Velocity")
+                                        velocity_fig = create_progress_bar_chart(round(float(detail_data['velocity_score']), 1), "Velocity")
                                         st.plotly_chart(velocity_fig, use_container_width=True)
                                     
                                     with col4:
                                         # Risk Score Progress Bar
                                         st.markdown("**Risk Score**")
-                                        risk_fig = create_progress_bar_chart(detail_data['risk_score'], "Risk")
+                                        risk_fig = create_progress_bar_chart(round(float(detail_data['risk_score']), 1), "Risk")
                                         st.plotly_chart(risk_fig, use_container_width=True)
                                     
                                     st.markdown("---")
@@ -3273,7 +3490,13 @@ def main():
                                     
                                     # Sparkline chart
                                     product_row = detail_data['product_row']
-                                    sparkline_fig = create_price_sparkline(product_row)
+                                    current_price = float(product_row.get('Buy Box 🚚: Current', 0))
+                                    sparkline_fig = create_price_sparkline(
+                                        current_price,
+                                        float(product_row.get('Buy Box 🚚: 30 days avg.', current_price)),
+                                        float(product_row.get('Buy Box 🚚: 90 days avg.', current_price)),
+                                        float(product_row.get('Buy Box 🚚: 180 days avg.', current_price))
+                                    )
                                     st.plotly_chart(sparkline_fig, use_container_width=True)
                                     
                                     # Historic metrics table
@@ -3312,7 +3535,7 @@ def main():
                                             amazon_dominance = 0
                                         
                                         st.markdown("**Amazon Dominance**")
-                                        dominance_fig = create_progress_bar_chart(amazon_dominance, "Amazon %")
+                                        dominance_fig = create_progress_bar_chart(round(float(amazon_dominance), 1), "Amazon %")
                                         st.plotly_chart(dominance_fig, use_container_width=True)
                                     
                                     with col2:
@@ -3405,32 +3628,28 @@ def main():
                             export_df['ROI %'] = export_df['roi']
                             export_df['Opportunity Score'] = export_df['opportunity_score']
                             
-                            # Add additional analytics data
+                            # Add additional analytics data (one vectorized pass, first row per ASIN)
                             if not df.empty:
-                                for idx, row in export_df.iterrows():
-                                    asin = row['asin']
-                                    original_row = df[df['ASIN'] == asin]
-                                    
-                                    if not original_row.empty:
-                                        original_data = original_row.iloc[0]
-                                        
-                                        # Add analytics scores with error handling
-                                        try:
-                                            from analytics import velocity_index, risk_index, momentum_index, is_historic_deal
-                                            export_df.loc[idx, 'velocity_score'] = velocity_index(original_data)
-                                            export_df.loc[idx, 'risk_score'] = risk_index(original_data)
-                                            export_df.loc[idx, 'momentum_score'] = momentum_index(original_data)
-                                            export_df.loc[idx, 'is_historic_deal'] = is_historic_deal(original_data)
-                                        except Exception as e:
-                                            # Set default values if analytics fail
-                                            export_df.loc[idx, 'velocity_score'] = 0
-                                            export_df.loc[idx, 'risk_score'] = 0
-                                            export_df.loc[idx, 'momentum_score'] = 0
-                                            export_df.loc[idx, 'is_historic_deal'] = False
-                                        
-                                        # Add market data
-                                        export_df.loc[idx, 'amazon_share'] = original_data.get('Buy Box: % Amazon 90 days', 0)
-                                        export_df.loc[idx, 'sales_rank'] = original_data.get('Sales Rank: Current', 0)
+                                products = df.drop_duplicates('ASIN', keep='first').set_index('ASIN')
+                                
+                                # Add analytics scores with error handling
+                                try:
+                                    analytics_data = calculate_deal_scores_vec(products)
+                                except Exception as e:
+                                    # Set default values if analytics fail
+                                    analytics_data = pd.DataFrame({
+                                        'velocity_score': 0,
+                                        'risk_score': 0,
+                                        'momentum_score': 0,
+                                        'is_historic_deal': False
+                                    }, index=products.index)
+                                
+                                # Add market data
+                                analytics_data['amazon_share'] = products.get('Buy Box: % Amazon 90 days', 0)
+                                analytics_data['sales_rank'] = products.get('Sales Rank: Current', 0)
+                                
+                                for column in analytics_data.columns:
+                                    export_df[column] = export_df['asin'].map(analytics_data[column])
                             
                             # Rename ASIN column for consistency
                             export_df['ASIN'] = export_df['asin']
@@ -3542,15 +3761,15 @@ def main():
                             report_df['ROI %'] = report_df['roi']
                             
                             # Add is_historic_deal flag for report
-                            if not df.empty:
-                                historic_flags = {}
-                                for _, row in df.iterrows():
-                                    asin = row.get('ASIN')
-                                    if asin:
-                                        try:
-                                            historic_flags[asin] = is_historic_deal(row)
-                                        except Exception:
-                                            historic_flags[asin] = False
+                            if not df.empty and 'ASIN' in df.columns:
+                                try:
+                                    flags = is_historic_deal_vec(df)
+                                except Exception:
+                                    flags = np.zeros(len(df), dtype=bool)
+                                
+                                # One flag per ASIN (last occurrence wins)
+                                historic_flags = pd.Series(flags, index=df['ASIN'])
+                                historic_flags = historic_flags[~historic_flags.index.duplicated(keep='last')]
                                 
                                 report_df['is_historic_deal'] = report_df['asin'].map(historic_flags).fillna(False)
                             
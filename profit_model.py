@@ -7,7 +7,7 @@ Calcola metriche economiche complete integrando pricing.py e scoring.py.
 import pandas as pd
 import numpy as np
 import streamlit as st
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from config import SCORING_WEIGHTS, VAT_RATES, DEFAULT_DISCOUNT, HIDDEN_COSTS, DEBUG_MODE
 from pricing import select_purchase_price, select_target_price, compute_net_purchase
 from scoring import profit_score, velocity_index, competition_index, opportunity_score
@@ -462,13 +462,40 @@ def find_best_routes_internal(df: pd.DataFrame, params: Dict[str, Any]) -> pd.Da
         ])
 
 
-def find_best_routes(df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
+def process_asin_batch(batch_df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Process a batch of ASINs for cross-market arbitrage
+    
+    Funzione di modulo (non nello script Streamlit) per poter essere eseguita
+    in un processo worker di ProcessPoolExecutor.
+    
+    Args:
+        batch_df: Tutte le righe (tutti i mercati) degli ASIN del batch
+        params: Processing parameters
+        
+    Returns:
+        DataFrame with best routes for this ASIN batch
+    """
+    try:
+        if batch_df.empty:
+            return pd.DataFrame()
+        
+        # Use internal find_best_routes function to maintain cross-market logic
+        return find_best_routes_internal(batch_df, params)
+        
+    except Exception:
+        # Return empty DataFrame on error
+        return pd.DataFrame()
+
+
+def find_best_routes(df: pd.DataFrame, params: Dict[str, Any], top_k: Optional[int] = None) -> pd.DataFrame:
     """
     Public interface for finding best routes with caching
     
     Args:
         df: DataFrame with multi-market product data
         params: Configuration parameters
+        top_k: If set, only the top_k routes by opportunity_score (partial selection, no full sort)
         
     Returns:
         pd.DataFrame: Best arbitrage opportunities
@@ -487,7 +514,10 @@ def find_best_routes(df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
     inbound_high = params.get('inbound_logistics_high', 3.0)
     
     # Use cached calculation
-    return calculate_all_routes_cached(df_csv, discount, strategy, scenario, mode, min_roi, min_margin, inbound_low, inbound_high)
+    routes = calculate_all_routes_cached(df_csv, discount, strategy, scenario, mode, min_roi, min_margin, inbound_low, inbound_high)
+    if top_k is not None and not routes.empty:
+        return routes.nlargest(top_k, 'opportunity_score')
+    return routes
 
 
 def analyze_route_profitability(df: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -575,6 +605,19 @@ def create_default_params() -> Dict[str, Any]:
     }
 
 
+# Avvisi di sostenibilità nell'ordine dei controlli di validate_margin_sustainability
+SUSTAINABILITY_WARNINGS = {
+    'high_roi': "⚠️ ROI > 80% - Verificare accuratezza dati",
+    'price_volatility': "⚠️ Alta volatilità prezzi - Margini instabili",
+    'amazon_risk': "⚠️ Alto rischio Amazon - Possibile price war",
+    'high_sales_rank': "⚠️ Ranking elevato - Velocità vendita ridotta",
+    'low_margin': "⚠️ Margine assoluto < €5 - Rischio commissioni aggiuntive",
+    'low_target_price': "⚠️ Prezzo vendita < €15 - Margini fragili per fee FBA"
+}
+
+# Livelli di sostenibilità indicizzati per numero di avvisi (3+ -> POOR)
+SUSTAINABILITY_LEVELS = np.array(['EXCELLENT', 'GOOD', 'MODERATE', 'POOR'])
+
 def validate_margin_sustainability(opportunity):
     """
     Verifica sostenibilità margini nel tempo
@@ -583,32 +626,32 @@ def validate_margin_sustainability(opportunity):
     
     # Check 1: Margine troppo alto (possibile errore)
     if opportunity.get('roi', 0) > 80:
-        warnings.append("⚠️ ROI > 80% - Verificare accuratezza dati")
+        warnings.append(SUSTAINABILITY_WARNINGS['high_roi'])
     
     # Check 2: Volatilità prezzi alta
     price_volatility = opportunity.get('price_volatility_index', 50)  # Default neutral
     if price_volatility < 40:
-        warnings.append("⚠️ Alta volatilità prezzi - Margini instabili")
+        warnings.append(SUSTAINABILITY_WARNINGS['price_volatility'])
     
     # Check 3: Competizione Amazon
     amazon_risk = opportunity.get('amazon_risk', {})
     if amazon_risk.get('level', 'LOW') in ['HIGH', 'CRITICAL']:
-        warnings.append("⚠️ Alto rischio Amazon - Possibile price war")
+        warnings.append(SUSTAINABILITY_WARNINGS['amazon_risk'])
     
     # Check 4: Sostenibilità ranking
     sales_rank = opportunity.get('sales_rank', opportunity.get('Sales Rank: Current', 0))
     if sales_rank > 50000:
-        warnings.append("⚠️ Ranking elevato - Velocità vendita ridotta")
+        warnings.append(SUSTAINABILITY_WARNINGS['high_sales_rank'])
     
     # Check 5: Margine assoluto troppo basso
     gross_margin_eur = opportunity.get('gross_margin_eur', 0)
     if gross_margin_eur < 5:
-        warnings.append("⚠️ Margine assoluto < €5 - Rischio commissioni aggiuntive")
+        warnings.append(SUSTAINABILITY_WARNINGS['low_margin'])
     
     # Check 6: Prezzo target troppo basso
     target_price = opportunity.get('target_price', 0)
     if target_price < 15:
-        warnings.append("⚠️ Prezzo vendita < €15 - Margini fragili per fee FBA")
+        warnings.append(SUSTAINABILITY_WARNINGS['low_target_price'])
     
     # Calcola confidence score
     confidence = max(0, 100 - (len(warnings) * 15))
@@ -639,6 +682,71 @@ def validate_margin_sustainability(opportunity):
     }
 
 
+def _opportunity_column(df: pd.DataFrame, columns: Tuple[str, ...], default: float) -> np.ndarray:
+    """
+    Prima colonna presente tra quelle indicate come float64 (stesso fallback di
+    opportunity.get annidati): default se nessuna esiste, NaN preservati
+    """
+    for column in columns:
+        if column in df.columns:
+            return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.full(len(df), default, dtype=np.float64)
+
+
+def validate_margin_sustainability_vec(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Versione vettorizzata di validate_margin_sustainability per un intero DataFrame
+    
+    Args:
+        df: DataFrame con le opportunità
+        
+    Returns:
+        DataFrame allineato all'indice di df con un flag booleano per controllo
+        (chiavi di SUSTAINABILITY_WARNINGS), warning_count, is_sustainable,
+        confidence e sustainability_level
+    """
+    if 'amazon_risk' in df.columns:
+        amazon_risk_levels = pd.Series(
+            [risk.get('level', 'LOW') if isinstance(risk, dict) else 'LOW' for risk in df['amazon_risk']],
+            index=df.index
+        )
+        amazon_high = amazon_risk_levels.isin(['HIGH', 'CRITICAL']).to_numpy()
+    else:
+        amazon_high = np.zeros(len(df), dtype=bool)
+    
+    # Confronti con NaN -> False, come nella versione per riga
+    checks = pd.DataFrame(dict(zip(SUSTAINABILITY_WARNINGS, (
+        _opportunity_column(df, ('roi',), 0) > 80,
+        _opportunity_column(df, ('price_volatility_index',), 50) < 40,
+        amazon_high,
+        _opportunity_column(df, ('sales_rank', 'Sales Rank: Current'), 0) > 50000,
+        _opportunity_column(df, ('gross_margin_eur',), 0) < 5,
+        _opportunity_column(df, ('target_price',), 0) < 15
+    ))), index=df.index)
+    
+    warning_count = checks.to_numpy().sum(axis=1)
+    checks['warning_count'] = warning_count
+    checks['is_sustainable'] = warning_count <= 1
+    checks['confidence'] = np.maximum(0, 100 - warning_count * 15)
+    checks['sustainability_level'] = SUSTAINABILITY_LEVELS[warning_count.clip(max=3)]
+    return checks
+
+
+def sustainability_warnings(checks: pd.DataFrame) -> List[List[str]]:
+    """
+    Liste di avvisi per le righe di un risultato di validate_margin_sustainability_vec
+    
+    Args:
+        checks: Risultato (o sottoinsieme) di validate_margin_sustainability_vec
+        
+    Returns:
+        Lista di avvisi per riga, nello stesso ordine della versione per riga
+    """
+    messages = list(SUSTAINABILITY_WARNINGS.values())
+    flags = checks[list(SUSTAINABILITY_WARNINGS)].to_numpy()
+    return [[message for message, flag in zip(messages, row) if flag] for row in flags]
+
+
 def generate_sustainability_recommendation(level, warnings):
     """
     Genera raccomandazioni per la sostenibilità dei margini
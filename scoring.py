@@ -126,6 +126,109 @@ def velocity_index(row: pd.Series) -> float:
         return 50.0
 
 
+def _safe_numeric_column(df: pd.DataFrame, column: str, default: float = 0.0, missing: float = None) -> np.ndarray:
+    """
+    Equivalente vettorizzato di safe_numeric(row.get(column, missing), default)
+    
+    Args:
+        df: DataFrame sorgente
+        column: Nome della colonna
+        default: Valore per celle NaN/non convertibili
+        missing: Valore se la colonna non esiste (default = default)
+        
+    Returns:
+        np.ndarray: Valori float64 senza NaN
+    """
+    if column not in df.columns:
+        return np.full(len(df), float(default if missing is None else missing))
+    
+    series = df[column]
+    if not pd.api.types.is_numeric_dtype(series):
+        # Stringhe tipo "1.234,56" o "€ 12": stessa pulizia della versione scalare
+        series = series.map(lambda value: safe_numeric(value, default))
+    
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(np.isnan(values), float(default), values)
+
+
+def velocity_index_arrays(sales_rank: np.ndarray, rating: np.ndarray, bought_month: np.ndarray) -> np.ndarray:
+    """
+    Calcolo velocity_index su array già estratti (senza NaN)
+    
+    Args:
+        sales_rank: Sales rank corrente
+        rating: Rating recensioni
+        bought_month: Acquisti nell'ultimo mese
+        
+    Returns:
+        np.ndarray: Punteggi velocità 0-100
+    """
+    # Base score da sales rank (invertito, scala logaritmica)
+    log_rank = np.log10(np.where(sales_rank > 0, sales_rank, 1.0))
+    rank_score = np.where(
+        sales_rank <= 0, 0.0,
+        np.where(sales_rank >= 500000, 10.0, np.maximum(10.0, 100 - log_rank * 15))
+    )
+    
+    rating_bonus = np.where(rating > 3.0, (rating - 3.0) * 10, 0.0)
+    sales_bonus = np.where(bought_month > 0, np.minimum(20.0, bought_month * 0.5), 0.0)
+    
+    return np.clip(rank_score + rating_bonus + sales_bonus, 0.0, 100.0)
+
+
+def velocity_index_vec(df: pd.DataFrame) -> np.ndarray:
+    """
+    Versione vettorizzata di velocity_index sull'intero DataFrame
+    
+    Args:
+        df: DataFrame con i dati dei prodotti
+        
+    Returns:
+        np.ndarray: Punteggi velocità 0-100 allineati alle righe di df
+    """
+    return velocity_index_arrays(
+        _safe_numeric_column(df, 'Sales Rank: Current', missing=999999),
+        _safe_numeric_column(df, 'Reviews: Rating'),
+        _safe_numeric_column(df, 'Bought in past month')
+    )
+
+
+def competition_index_arrays(amazon_pct: np.ndarray, winner_count: np.ndarray, oos_pct: np.ndarray) -> np.ndarray:
+    """
+    Calcolo competition_index su array già estratti (senza NaN)
+    
+    Args:
+        amazon_pct: % Buy Box Amazon 90 giorni
+        winner_count: Numero di winner Buy Box
+        oos_pct: % Out of Stock Buy Box 90 giorni
+        
+    Returns:
+        np.ndarray: Punteggi competizione 0-100
+    """
+    amazon_penalty = np.where(amazon_pct > 70, -30.0, np.where(amazon_pct > 50, -15.0, 0.0))
+    winner_penalty = np.where(winner_count > 10, -20.0, np.where(winner_count > 5, -10.0, 0.0))
+    oos_bonus = np.where(oos_pct > 10, np.minimum(15.0, (oos_pct - 10) * 0.5), 0.0)
+    
+    return np.clip(50.0 + amazon_penalty + winner_penalty + oos_bonus, 0.0, 100.0)
+
+
+def competition_index_vec(df: pd.DataFrame) -> np.ndarray:
+    """
+    Versione vettorizzata di competition_index sull'intero DataFrame
+    
+    Args:
+        df: DataFrame con i dati dei prodotti
+        
+    Returns:
+        np.ndarray: Punteggi competizione 0-100 allineati alle righe di df
+    """
+    return competition_index_arrays(
+        _safe_numeric_column(df, 'Buy Box: % Amazon 90 days', missing=50),
+        _safe_numeric_column(df, 'Buy Box: Winner Count', missing=5),
+        _safe_numeric_column(df, 'Buy Box: 90 days OOS')
+    )
+
+
 def competition_index(row: pd.Series) -> float:
     """
     Dinamiche Buy Box (0-100, più alto = meno competizione) con type safety
@@ -15,9 +15,14 @@ from typing import Dict, Any
 # Import dei moduli da testare
 from pricing import compute_net_purchase, select_purchase_price, select_target_price, calculate_profit_metrics
 from loaders import detect_locale, normalize_columns
-from scoring import opportunity_score, velocity_index, competition_index, calculate_product_score
-from profit_model import find_best_routes, create_default_params, analyze_route_profitability
-from analytics import calculate_historic_metrics, is_historic_deal, find_historic_deals
+from scoring import opportunity_score, velocity_index, velocity_index_vec, competition_index, competition_index_vec, calculate_product_score
+from profit_model import find_best_routes, create_default_params, analyze_route_profitability, validate_margin_sustainability, validate_margin_sustainability_vec, sustainability_warnings
+from analytics import calculate_historic_metrics, calculate_historic_metrics_vec, is_historic_deal, is_historic_deal_vec, find_historic_deals
+from analytics import momentum_index, momentum_index_vec, risk_index, risk_index_vec, calculate_deal_scores_vec, get_deal_quality_score, get_deal_quality_score_df
+from analytics import detect_stockout_opportunities, analyze_stockout_patterns, generate_stockout_strategy
+from analytics import detect_seasonality, analyze_seasonal_opportunities, get_seasonal_insights, _seasonal_kernel, _seasonal_arrays, _year_ratio
+from analytics import detect_historic_deals, analyze_deal_patterns, assess_amazon_competition_risk, assess_amazon_competition_risk_batch, decode_signals, SIGNAL_AMAZON_OOS, SIGNAL_LOW_COMPETITION, SIGNAL_SIGNIFICANT_DISCOUNT, find_historic_deals_parallel, historic_scores_vec, _historic_scores_kernel, _signal_kernel, _signal_arrays, _risk_inputs, _deviation, NUMEXPR_MIN_ROWS, DealColumns, _weighted_scores, HISTORIC_OPPORTUNITY_WEIGHTS
+from analytics_polars import find_historic_deals_pl, analyze_seasonal_opportunities_pl, HAS_POLARS
 from export import export_consolidated_csv, export_watchlist_json, validate_export_data
 from config import VAT_RATES, SCORING_WEIGHTS
 
@@ -337,6 +342,20 @@ class TestScoringSystem(unittest.TestCase):
         self.assertLessEqual(velocity_score, 100)
         self.assertIsInstance(velocity_score, (int, float, np.number))
     
+    def test_velocity_score_vectorized(self):
+        """Test velocity_index_vec coerente con velocity_index per riga"""
+        
+        test_df = pd.DataFrame({
+            'Sales Rank: Current': [50000, 0, 750000, np.nan, '1,234'],
+            'Reviews: Rating': [4.5, 3.0, np.nan, 5.0, 4.1],
+            'Bought in past month': [10, 0, 100, np.nan, 60]
+        })
+        
+        vectorized = velocity_index_vec(test_df)
+        expected = [velocity_index(row) for _, row in test_df.iterrows()]
+        
+        np.testing.assert_allclose(vectorized, expected)
+    
     def test_competition_score_calculation(self):
         """Test calcolo Competition Score"""
         
@@ -353,6 +372,18 @@ class TestScoringSystem(unittest.TestCase):
         self.assertLessEqual(competition_score, 100)
         self.assertIsInstance(competition_score, (int, float, np.number))
     
+    def test_competition_score_vectorized(self):
+        """Test competition_index_vec coerente con competition_index per riga"""
+        
+        test_df = pd.DataFrame({
+            'Buy Box: % Amazon 90 days': [75, 55, np.nan, 10],
+            'Buy Box: Winner Count': [3, 12, 7, np.nan],
+            'Buy Box: 90 days OOS': [0, 20, 60, np.nan]
+        })
+        
+        np.testing.assert_allclose(competition_index_vec(test_df),
+                                   [competition_index(row) for _, row in test_df.iterrows()])
+    
     def test_scoring_edge_cases(self):
         """Test edge cases per sistema scoring"""
         
@@ -461,6 +492,55 @@ class TestRouteOptimization(unittest.TestCase):
         # Con discount più alti, dovremmo avere più route profittabili
         # (o almeno non dovrebbe crashare)
         self.assertTrue(all(isinstance(r, int) for r in results))
+    
+    def test_find_best_routes_top_k(self):
+        """Test top_k: selezione parziale per opportunity_score"""
+        
+        multi_market = pd.DataFrame({
+            'ASIN': ['B001TOPK01', 'B001TOPK01', 'B001TOPK02', 'B001TOPK02', 'B001TOPK03', 'B001TOPK03'],
+            'Title': ['Top K 1', 'Top K 1', 'Top K 2', 'Top K 2', 'Top K 3', 'Top K 3'],
+            'source_market': ['it', 'de', 'it', 'de', 'it', 'de'],
+            'Buy Box 🚚: Current': [40.0, 80.0, 50.0, 70.0, 30.0, 90.0],
+            'Amazon: Current': [42.0, 82.0, 52.0, 72.0, 32.0, 92.0],
+            'New FBA: Current': [45.0, 85.0, 55.0, 75.0, 35.0, 95.0],
+            'Sales Rank: Current': [5000, 6000, 20000, 25000, 1000, 1500],
+            'Reviews Rating': [4.5] * 6,
+            'Buy Box: % Amazon 90 days': [10] * 6,
+            'Offers: Count': [5] * 6,
+            'Referral Fee %': [0.15] * 6,
+            'FBA Pick&Pack Fee': [2.0] * 6
+        })
+        
+        routes = find_best_routes(multi_market, self.params)
+        top_routes = find_best_routes(multi_market, self.params, top_k=2)
+        
+        self.assertEqual(len(routes), 3)
+        expected = routes.nlargest(2, 'opportunity_score')
+        self.assertEqual(top_routes['asin'].tolist(), expected['asin'].tolist())
+    
+    def test_margin_sustainability_vectorized(self):
+        """Test validate_margin_sustainability_vec contro la versione per riga"""
+        
+        opportunities = pd.DataFrame({
+            'roi': [20.0, 90.0, np.nan, 85.0],
+            'price_volatility_index': [60.0, 30.0, 50.0, 35.0],
+            'Sales Rank: Current': [1000, 60000, 2000, 70000],
+            'gross_margin_eur': [10.0, 3.0, 8.0, 2.0],
+            'target_price': [30.0, 12.0, 40.0, 10.0],
+            'amazon_risk': [{'level': 'LOW'}, {'level': 'HIGH'}, {}, {'level': 'CRITICAL'}]
+        })
+        
+        checks = validate_margin_sustainability_vec(opportunities)
+        warnings = sustainability_warnings(checks)
+        
+        for i, (_, row) in enumerate(opportunities.iterrows()):
+            expected = validate_margin_sustainability(row)
+            self.assertEqual(warnings[i], expected['warnings'])
+            self.assertEqual(checks['sustainability_level'].iloc[i], expected['sustainability_level'])
+            self.assertEqual(checks['is_sustainable'].iloc[i], expected['is_sustainable'])
+            self.assertEqual(checks['confidence'].iloc[i], expected['confidence'])
+        
+        self.assertEqual(checks['sustainability_level'].tolist(), ['EXCELLENT', 'POOR', 'EXCELLENT', 'POOR'])
 
 
 class TestHistoricDeals(unittest.TestCase):
@@ -503,6 +583,22 @@ class TestHistoricDeals(unittest.TestCase):
         expected_dev_90d = (80.0 - 100.0) / 100.0  # -20%
         self.assertAlmostEqual(metrics['dev_90d'], expected_dev_90d, places=3)
     
+    def test_historic_metrics_vectorized_matches_scalar(self):
+        """Test versione vettorizzata delle metriche storiche = versione per riga"""
+        
+        data = self.test_data.copy()
+        data.loc[1, 'Buy Box 🚚: 30 days avg.'] = np.nan  # fallback sul prezzo corrente
+        data.loc[2, 'Buy Box 🚚: Lowest'] = 0
+        
+        vectorized = calculate_historic_metrics_vec(data)
+        self.assertListEqual(list(vectorized.index), list(data.index))
+        
+        for idx, row in data.iterrows():
+            expected = calculate_historic_metrics(row)
+            for key, value in expected.items():
+                self.assertAlmostEqual(vectorized.loc[idx, key], value, places=6,
+                                       msg=f"Mismatch on {key} for row {idx}")
+    
     def test_historic_deal_detection(self):
         """Test identificazione affari storici"""
         
@@ -516,6 +612,345 @@ class TestHistoricDeals(unittest.TestCase):
         is_deal3 = is_historic_deal(product3)
         self.assertFalse(is_deal3, "Product 3 should NOT be detected as historic deal")
     
+    def test_historic_deal_mask_matches_scalar(self):
+        """Test maschera vettorizzata is_historic_deal_vec = is_historic_deal per riga"""
+        
+        data = self.test_data.copy()
+        data['Reviews: Rating'] = [4.8, 4.5, 4.0]
+        
+        mask = is_historic_deal_vec(data)
+        expected = [is_historic_deal(row) for _, row in data.iterrows()]
+        
+        self.assertListEqual(mask.tolist(), expected)
+        self.assertTrue(mask[0], "Product 1 should be detected as historic deal")
+    
+    def test_deal_columns_extraction(self):
+        """Test estrazione SoA delle colonne e sottoinsiemi"""
+        
+        columns = DealColumns.from_df(self.test_data)
+        
+        np.testing.assert_allclose(columns.current, [80.0, 90.0, 110.0])
+        self.assertIn('avg_90d', columns.available)
+        self.assertNotIn('return_rate', columns.available)
+        self.assertTrue(np.isnan(columns.return_rate).all())
+        np.testing.assert_allclose(columns.get('return_rate', missing=0), [0, 0, 0])
+        self.assertTrue(columns.unknown_brand.all())
+        
+        subset = columns.subset(np.array([True, False, True]))
+        self.assertListEqual(list(subset.index), [0, 2])
+        np.testing.assert_allclose(subset.current, [80.0, 110.0])
+        
+        # Colonne contigue anche da una matrice 2D row-major (colonne con stride)
+        matrix = np.array([[80.0, 100.0], [90.0, 95.0]])
+        strided_df = pd.DataFrame(matrix, columns=['Buy Box 🚚: Current', 'Buy Box 🚚: 90 days avg.'], copy=False)
+        strided_columns = DealColumns.from_df(strided_df)
+        self.assertTrue(strided_columns.current.flags['C_CONTIGUOUS'])
+        self.assertTrue(strided_columns.avg_90d.flags['C_CONTIGUOUS'])
+        
+        # Le funzioni vettorizzate accettano indifferentemente DataFrame o DealColumns
+        pd.testing.assert_frame_equal(calculate_historic_metrics_vec(columns),
+                                      calculate_historic_metrics_vec(self.test_data))
+    
+    def test_unknown_brand_categorical(self):
+        """Test brand sconosciuti con colonna testuale o categorica"""
+        
+        brands = ['Acme', 'unknown', '', np.nan, 'Generic', 'Acme']
+        expected = [False, True, True, True, True, False]
+        data = pd.DataFrame({'Brand': brands})
+        
+        self.assertListEqual(DealColumns.from_df(data).unknown_brand.tolist(), expected)
+        
+        data['Brand'] = data['Brand'].astype('category')
+        self.assertListEqual(DealColumns.from_df(data).unknown_brand.tolist(), expected)
+    
+    def test_momentum_and_risk_vectorized(self):
+        """Test momentum/risk vettorizzati coerenti con le versioni per riga"""
+        
+        data = self.test_data.copy()
+        data['Return Rate'] = [5, 12, np.nan]
+        data['FBA Pick&Pack Fee'] = [2.5, 4.0, 6.0]
+        data['Reviews: Count'] = [1500, 50, 200]
+        data['Brand'] = ['Acme', 'Generic', np.nan]
+        data.loc[2, 'Buy Box 🚚: Current'] = np.nan
+        
+        np.testing.assert_allclose(momentum_index_vec(data),
+                                   [momentum_index(row) for _, row in data.iterrows()])
+        np.testing.assert_allclose(risk_index_vec(data),
+                                   [risk_index(row) for _, row in data.iterrows()])
+        self.assertEqual(momentum_index_vec(data).dtype, np.float32)
+        self.assertEqual(risk_index_vec(data).dtype, np.float32)
+    
+    def test_deal_scores_vectorized(self):
+        """Test score analytics combinati vs funzioni per riga"""
+        
+        scores = calculate_deal_scores_vec(self.test_data)
+        
+        self.assertListEqual(scores.index.tolist(), self.test_data.index.tolist())
+        for idx, row in self.test_data.iterrows():
+            self.assertAlmostEqual(scores.loc[idx, 'velocity_score'], velocity_index(row), places=6)
+            self.assertAlmostEqual(scores.loc[idx, 'risk_score'], risk_index(row), places=4)
+            self.assertAlmostEqual(scores.loc[idx, 'momentum_score'], momentum_index(row), places=4)
+            self.assertEqual(scores.loc[idx, 'is_historic_deal'], is_historic_deal(row))
+    
+    def test_deal_quality_score_vectorized(self):
+        """Test punteggio qualità vettorizzato vs versione per riga"""
+        
+        data = self.test_data.copy()
+        data['Reviews: Rating'] = [4.6, 4.4, 3.0]
+        data['Bought in past month'] = [800, 500, 10]
+        data['Buy Box: % Amazon 90 days'] = [20, 30, 90]
+        
+        quality = get_deal_quality_score_df(data)
+        
+        self.assertListEqual(quality.index.tolist(), data.index.tolist())
+        for idx, row in data.iterrows():
+            self.assertAlmostEqual(quality.loc[idx], get_deal_quality_score(row), places=9)
+        self.assertGreater(quality.loc[0], 0)
+        self.assertEqual(quality.loc[2], 0)
+    
+    @unittest.skipUnless(HAS_POLARS, "polars non installato")
+    def test_historic_deals_polars(self):
+        """Test find_historic_deals su Polars coerente con la versione pandas"""
+        
+        data = self.test_data.copy()
+        data['Reviews: Rating'] = [4.6, 4.4, 3.0]
+        data['Bought in past month'] = [800, 500, 10]
+        data['Buy Box: % Amazon 90 days'] = [20, 30, 90]
+        
+        expected = find_historic_deals(data)
+        result = find_historic_deals_pl(data).to_pandas()
+        
+        self.assertListEqual(list(result.columns), list(expected.columns))
+        self.assertListEqual(result['ASIN'].tolist(), expected['ASIN'].tolist())
+        for column in ('momentum_score', 'risk_score', 'price_deviation_90d', 'opportunity_score'):
+            np.testing.assert_allclose(result[column].to_numpy(float), expected[column].to_numpy(float))
+        self.assertListEqual(result['current_vs_avg_90d'].tolist(), expected['current_vs_avg_90d'].tolist())
+    
+    @unittest.skipUnless(HAS_POLARS, "polars non installato")
+    def test_seasonal_opportunities_polars(self):
+        """Test analyze_seasonal_opportunities su Polars coerente con la versione pandas"""
+        
+        data = self.test_data.copy()
+        data['Buy Box 🚚: 30 days avg.'] = [100, 65, 90]
+        data['Buy Box 🚚: 90 days avg.'] = [95, 80, 70]
+        data['Buy Box 🚚: 365 days avg.'] = [80, 100, 100]
+        
+        expected = analyze_seasonal_opportunities(data)
+        result = analyze_seasonal_opportunities_pl(data).to_pandas()
+        
+        self.assertListEqual(list(result.columns), list(expected.columns))
+        self.assertListEqual(result['asin'].tolist(), expected['asin'].tolist())
+        self.assertListEqual(result['seasonal_pattern'].astype(str).tolist(), expected['seasonal_pattern'].astype(str).tolist())
+        self.assertListEqual(result['recommendation'].tolist(), expected['recommendation'].tolist())
+        np.testing.assert_allclose(result['seasonal_opportunity_score'], expected['seasonal_opportunity_score'])
+    
+    def test_fused_scores_kernel(self):
+        """Test kernel fuso momentum/risk coerente con le versioni vettorizzate"""
+        
+        data = self.test_data.copy()
+        data['Return Rate'] = [5, 12, 20]
+        data['Brand'] = ['Acme', 'unknown', '']
+        metrics = calculate_historic_metrics_vec(data)
+        
+        momentum, risk = _historic_scores_kernel(
+            metrics['current'].to_numpy(), metrics['lowest'].to_numpy(), metrics['highest'].to_numpy(),
+            metrics['dev_30d'].to_numpy(), metrics['dev_90d'].to_numpy(), *_risk_inputs(DealColumns.from_df(data))
+        )
+        
+        np.testing.assert_allclose(momentum, momentum_index_vec(data, metrics))
+        np.testing.assert_allclose(risk, risk_index_vec(data))
+        
+        fused_momentum, fused_risk = historic_scores_vec(data, metrics)
+        np.testing.assert_allclose(fused_momentum, momentum)
+        np.testing.assert_allclose(fused_risk, risk)
+    
+    def test_weighted_scores(self):
+        """Test somma pesata fusa identica alla somma elemento per elemento"""
+        
+        scores = np.random.default_rng(0).uniform(0, 100, size=(4, 257))
+        weights = HISTORIC_OPPORTUNITY_WEIGHTS
+        
+        expected = scores[0] * weights[0] + scores[1] * weights[1] + scores[2] * weights[2] + scores[3] * weights[3]
+        np.testing.assert_array_equal(_weighted_scores(*scores, weights), expected)
+        np.testing.assert_array_equal(_weighted_scores(*scores, weights, bias=5.0), expected + 5.0)
+    
+    def test_deviation_large_input(self):
+        """Test deviazioni su input grandi (percorso numexpr se disponibile)"""
+        
+        average = np.tile([100.0, 0.0, np.nan, 50.0], NUMEXPR_MIN_ROWS // 4 + 1)
+        current = np.full_like(average, 80.0)
+        
+        deviation = _deviation(current, average)
+        
+        self.assertEqual(deviation.dtype, np.float64)
+        np.testing.assert_allclose(deviation[:4], [-0.20, 0.0, 0.0, 0.60])
+        
+        year_ratio = _year_ratio(np.tile([120.0, np.nan, -5.0, 40.0], NUMEXPR_MIN_ROWS // 4 + 1), average)
+        np.testing.assert_allclose(year_ratio[:4], [1.20, 1.0, 1.0, 0.80])
+    
+    def test_find_historic_deals_parallel(self):
+        """Test versione partizionata = versione seriale"""
+        
+        data = pd.concat([self.test_data] * 4, ignore_index=True)
+        data['ASIN'] = [f'B00PAR{i:04d}' for i in range(len(data))]
+        data['Reviews: Rating'] = 4.8
+        
+        serial = find_historic_deals(data)
+        parallel = find_historic_deals_parallel(data, npartitions=3)
+        
+        self.assertGreater(len(serial), 0)
+        pd.testing.assert_frame_equal(serial.sort_values('ASIN'), parallel.sort_values('ASIN'))
+    
+    def test_detect_historic_deals_signals(self):
+        """Test conteggio segnali di detect_historic_deals"""
+        
+        data = self.test_data.copy()
+        data['Amazon: 90 days OOS'] = [60, 10, 70]
+        data['Buy Box: Winner Count'] = [3, 8, 2]
+        
+        deals = detect_historic_deals(data)
+        
+        # Prodotto 1: sconto 20% vs 90d (+2), Amazon OOS (+2), pochi competitor (+1)
+        self.assertListEqual(deals['asin'].tolist(), ['B001HIST01'])
+        deal = deals.iloc[0]
+        self.assertEqual(deal['signal_count'], 5)
+        self.assertEqual(deals['signal_count'].dtype, np.int16)
+        self.assertEqual(deal['quality_score'], 75)
+        self.assertIn('Significant discount vs 90d avg (20.0%)', deal['signals'])
+        self.assertAlmostEqual(deal['discount_vs_90d'], 0.20, places=6)
+    
+    def test_signal_kernel_matches_arrays(self):
+        """Test kernel dei segnali coerente con la versione numpy (NaN inclusi)"""
+        
+        rng = np.random.default_rng(42)
+        inputs = [rng.uniform(0, 120, 200) for _ in range(12)]
+        for values in inputs:
+            values[rng.random(200) < 0.1] = np.nan
+        
+        kernel_bits, kernel_count = _signal_kernel(*inputs)
+        array_bits, array_count = _signal_arrays(*inputs)
+        
+        np.testing.assert_array_equal(kernel_bits, array_bits)
+        np.testing.assert_array_equal(kernel_count, array_count)
+        self.assertEqual(kernel_count.dtype, np.int16)
+    
+    def test_seasonal_kernel_matches_arrays(self):
+        """Test kernel stagionale coerente con la versione numpy (NaN e valori <= 0 inclusi)"""
+        
+        rng = np.random.default_rng(7)
+        inputs = [rng.uniform(-10, 150, 300) for _ in range(3)]
+        for values in inputs:
+            values[rng.random(300) < 0.1] = np.nan
+        
+        for kernel_values, array_values in zip(_seasonal_kernel(*inputs), _seasonal_arrays(*inputs)):
+            np.testing.assert_array_equal(kernel_values, array_values)
+        self.assertEqual(_seasonal_kernel(*inputs)[0].dtype, np.int8)
+    
+    def test_signal_bits_decoding(self):
+        """Test maschera di bit dei segnali e decodifica testuale"""
+        
+        data = self.test_data.copy()
+        data['Amazon: 90 days OOS'] = [60, 10, 70]
+        data['Buy Box: Winner Count'] = [3, 8, 2]
+        
+        deal = detect_historic_deals(data).iloc[0]
+        expected_bits = SIGNAL_AMAZON_OOS | SIGNAL_LOW_COMPETITION | SIGNAL_SIGNIFICANT_DISCOUNT
+        
+        self.assertEqual(deal['signal_bits'], expected_bits)
+        self.assertListEqual(decode_signals(deal['signal_bits'], deal['discount_vs_90d']), deal['signals'])
+        self.assertListEqual(decode_signals(SIGNAL_AMAZON_OOS | SIGNAL_SIGNIFICANT_DISCOUNT),
+                             ['Amazon frequently out of stock', 'Significant discount vs 90d avg'])
+    
+    def test_deal_patterns_signal_frequency(self):
+        """Test frequenza segnali in analyze_deal_patterns"""
+        
+        data = pd.concat([self.test_data] * 2, ignore_index=True)
+        data['Amazon: 90 days OOS'] = [60, 10, 70] * 2
+        data['Buy Box: Winner Count'] = [3, 8, 2] * 2
+        
+        frequency = analyze_deal_patterns(data)['patterns']['signal_frequency']
+        
+        self.assertDictEqual(frequency, {
+            'Amazon frequently out of stock': 2,
+            'Low competition': 2,
+            'Significant discount vs 90d avg (20.0%)': 2
+        })
+    
+    def test_amazon_competition_risk_batch(self):
+        """Test rischio competizione Amazon vettorizzato vs versione per riga"""
+        
+        data = self.test_data.copy()
+        data['Amazon: OOS Count 90 days'] = [2, np.nan, 8]
+        data['Amazon: Current'] = [85.0, np.nan, 140.0]
+        data['Prime Eligible (Buy Box)'] = ['Yes', 'No', np.nan]
+        
+        batch = assess_amazon_competition_risk_batch(data)
+        
+        for idx, row in data.iterrows():
+            expected = assess_amazon_competition_risk(row)
+            self.assertEqual(batch.loc[idx, 'score'], expected['score'])
+            self.assertEqual(batch.loc[idx, 'level'], expected['level'])
+            self.assertEqual(batch.loc[idx, 'recommendation'], expected['recommendation'])
+            for factor, value in expected['factors'].items():
+                self.assertEqual(bool(batch.loc[idx, factor]), value)
+        
+        # Prodotto 1: dominanza, restock frequenti, price matching, prime esclusivo
+        self.assertEqual(batch.loc[0, 'level'], 'CRITICAL')
+        self.assertEqual(batch.loc[0, 'factors_mask'], 0b1111)
+        self.assertEqual(batch['factors_mask'].dtype, np.uint8)
+    
+    def test_stockout_opportunities(self):
+        """Test opportunità e pattern di stock-out Amazon"""
+        
+        data = self.test_data.copy()
+        data['Amazon: 90 days OOS'] = [60, 35, np.nan]
+        data['Amazon: OOS Count 90 days'] = [12, np.nan, 4]
+        data['Buy Box 🚚: 30 days drop %'] = [2, 5, 1]
+        
+        opportunities = detect_stockout_opportunities(data)
+        
+        self.assertListEqual(opportunities['asin'].tolist(), ['B001HIST01', 'B001HIST02'])
+        # 60 + (10-2)*2 + min(20, 12*2) = 96; 35 + (10-5)*2 + 0 = 45
+        self.assertListEqual(opportunities['stockout_opportunity_score'].tolist(), [96, 45])
+        self.assertListEqual(opportunities['recommendation'].tolist(),
+                             [generate_stockout_strategy(60, 12), generate_stockout_strategy(35, 0)])
+        self.assertIn('AGGRESSIVE', opportunities.iloc[0]['recommendation'])
+        
+        patterns = analyze_stockout_patterns(data)
+        self.assertEqual(patterns['products_analyzed'], 3)
+        self.assertEqual(patterns['stockout_opportunities'], 2)
+        self.assertAlmostEqual(patterns['avg_amazon_oos_pct'], 95 / 3)
+        self.assertDictEqual(patterns['oos_distribution'], {
+            'low_oos (0-20%)': 1, 'medium_oos (20-40%)': 1, 'high_oos (40-60%)': 1, 'critical_oos (>60%)': 0
+        })
+    
+    def test_seasonal_opportunities(self):
+        """Test opportunità stagionali vettorizzate vs detect_seasonality per riga"""
+        
+        data = self.test_data.copy()
+        data['Buy Box 🚚: 30 days avg.'] = [100, 65, 90]
+        data['Buy Box 🚚: 90 days avg.'] = [95, 80, 70]
+        data['Buy Box 🚚: 365 days avg.'] = [80, 100, 100]
+        
+        seasonal = analyze_seasonal_opportunities(data)
+        
+        # peak (1.25), off (0.65), transitioning (0.90 vs 0.70)
+        self.assertListEqual(seasonal['asin'].tolist(), ['B001HIST02', 'B001HIST01', 'B001HIST03'])
+        for _, opportunity in seasonal.iterrows():
+            row = data[data['ASIN'] == opportunity['asin']].iloc[0]
+            expected = detect_seasonality(row)
+            self.assertEqual(opportunity['seasonal_pattern'], expected['pattern'])
+            self.assertAlmostEqual(opportunity['seasonal_index'], expected['seasonal_index'])
+            self.assertEqual(opportunity['recommendation'], expected['recommendation'])
+        self.assertListEqual(seasonal['seasonal_opportunity_score'].tolist(), [100, 95, 70])
+        self.assertIsInstance(seasonal['seasonal_pattern'].dtype, pd.CategoricalDtype)
+        self.assertListEqual(seasonal['data_quality'].tolist(), ['good'] * 3)
+        self.assertEqual(get_seasonal_insights(seasonal)[0], "Found 3 products with seasonal patterns")
+        
+        top = analyze_seasonal_opportunities(data, top_k=2)
+        self.assertListEqual(top['asin'].tolist(), ['B001HIST02', 'B001HIST01'])
+        self.assertListEqual(top['recommendation'].tolist(), seasonal['recommendation'].head(2).tolist())
+    
     def test_find_historic_deals_function(self):
         """Test funzione find_historic_deals"""
         